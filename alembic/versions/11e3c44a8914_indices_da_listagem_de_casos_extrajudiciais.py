@@ -0,0 +1,38 @@
+"""Índices da listagem de casos extrajudiciais
+
+Revision ID: 11e3c44a8914
+Revises: 4bdbc89cfb4f
+Create Date: 2026-10-17 16:02:41.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '11e3c44a8914'
+down_revision: Union[str, Sequence[str], None] = '4bdbc89cfb4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_extrajudicial_cases_owner_id_created_at_id', 'extrajudicial_cases', ['owner_id', 'created_at', 'id']),
+    ('ix_extrajudicial_cases_owner_id_updated_at_id', 'extrajudicial_cases', ['owner_id', 'updated_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,65 @@
+"""Hash de conteúdo dos andamentos (ingestão idempotente)
+
+Revision ID: 2bbeffc5e7f9
+Revises: d6cdbe8366d6
+Create Date: 2026-10-17 18:05:21.640317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2bbeffc5e7f9'
+down_revision: Union[str, Sequence[str], None] = 'd6cdbe8366d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_process_updates_process_id_content_hash', 'process_updates', ['process_id', 'content_hash']),
+]
+
+# Mesmo cálculo de app.core.normalization.process_update_hash: data/hora
+# até os segundos e descrição com espaços ASCII normalizados, separadas
+# por \x1f, em SHA-256 hex
+BACKFILL = r"""
+    UPDATE process_updates
+    SET content_hash = encode(sha256(convert_to(
+        to_char(date, 'YYYY-MM-DD"T"HH24:MI:SS') || chr(31)
+        || btrim(regexp_replace(description, '[ \t\n\r\f\v]+', ' ', 'g'), ' '),
+        'UTF8'
+    )), 'hex')
+"""
+
+# Andamentos já duplicados: fica o mais antigo (menor id)
+DELETE_DUPLICATES = """
+    DELETE FROM process_updates AS duplicate
+    USING process_updates AS original
+    WHERE duplicate.process_id = original.process_id
+      AND duplicate.content_hash = original.content_hash
+      AND duplicate.id > original.id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('process_updates', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.execute(BACKFILL)
+    op.execute(DELETE_DUPLICATES)
+    op.alter_column('process_updates', 'content_hash', nullable=False)
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=True, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    op.drop_column('process_updates', 'content_hash')
@@ -0,0 +1,54 @@
+"""Busca de clientes por trigramas (pg_trgm + unaccent)
+
+Revision ID: 4bdbc89cfb4f
+Revises: 57fc2c0683e1
+Create Date: 2026-10-17 15:21:08.337105
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4bdbc89cfb4f'
+down_revision: Union[str, Sequence[str], None] = '57fc2c0683e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# As expressões precisam ser idênticas às usadas em crud.client.search_user_clients
+INDEXES = {
+    'ix_clients_full_name_trgm': "f_unaccent(lower(full_name)) gin_trgm_ops",
+    'ix_clients_email_trgm': "lower(email) gin_trgm_ops",
+    'ix_clients_cpf_digits_trgm': "regexp_replace(cpf, '[^0-9]', '', 'g') gin_trgm_ops",
+    'ix_clients_phone_digits_trgm': "regexp_replace(phone, '[^0-9]', '', 'g') gin_trgm_ops",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() é STABLE (depende do search_path) e não pode ser usada em
+    # índices; o wrapper fixa o dicionário e pode ser declarado IMMUTABLE
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        for name, expression in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON clients USING gin ({expression})")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
@@ -0,0 +1,42 @@
+"""Índices de paginação por cursor em clientes e processos
+
+Revision ID: 57fc2c0683e1
+Revises: dc9650740ec0
+Create Date: 2026-10-17 14:03:27.804512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '57fc2c0683e1'
+down_revision: Union[str, Sequence[str], None] = 'dc9650740ec0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_clients_owner_id_created_at_id', 'clients', ['owner_id', 'created_at', 'id']),
+    ('ix_clients_owner_id_full_name_id', 'clients', ['owner_id', 'full_name', 'id']),
+    ('ix_processes_owner_id_id', 'processes', ['owner_id', 'id']),
+    ('ix_processes_owner_id_number', 'processes', ['owner_id', 'number']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY não bloqueia escritas nas tabelas durante a criação,
+    # mas não pode rodar dentro de uma transação
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
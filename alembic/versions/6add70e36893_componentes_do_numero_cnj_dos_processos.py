@@ -0,0 +1,70 @@
+"""Componentes do número CNJ dos processos
+
+Revision ID: 6add70e36893
+Revises: 11e3c44a8914
+Create Date: 2026-10-17 16:48:12.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6add70e36893'
+down_revision: Union[str, Sequence[str], None] = '11e3c44a8914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = [
+    ('cnj_sequential', sa.Integer()),
+    ('cnj_year', sa.SmallInteger()),
+    ('cnj_segment', sa.SmallInteger()),
+    ('cnj_tribunal', sa.SmallInteger()),
+    ('cnj_origin', sa.SmallInteger()),
+]
+
+INDEXES = [
+    ('ix_processes_owner_id_cnj_court_year', 'processes', ['owner_id', 'cnj_segment', 'cnj_tribunal', 'cnj_year']),
+    ('ix_processes_owner_id_cnj_year', 'processes', ['owner_id', 'cnj_year']),
+]
+
+# Preenche os componentes dos números no padrão CNJ (20 dígitos com
+# dígitos verificadores válidos: NNNNNNN AAAA J TR OOOO DD mod 97 = 1)
+BACKFILL = """
+    UPDATE processes
+    SET cnj_sequential = substr(n.d, 1, 7)::integer,
+        cnj_year = substr(n.d, 10, 4)::smallint,
+        cnj_segment = substr(n.d, 14, 1)::smallint,
+        cnj_tribunal = substr(n.d, 15, 2)::smallint,
+        cnj_origin = substr(n.d, 17, 4)::smallint
+    FROM (
+        SELECT id, regexp_replace(number, '[^0-9]', '', 'g') AS d FROM processes
+    ) AS n
+    WHERE processes.id = n.id
+      AND length(n.d) = 20
+      AND (substr(n.d, 1, 7) || substr(n.d, 10, 11) || substr(n.d, 8, 2))::numeric % 97 = 1
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, type_ in COLUMNS:
+        op.add_column('processes', sa.Column(name, type_, nullable=True))
+    op.execute(BACKFILL)
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    for name, _ in reversed(COLUMNS):
+        op.drop_column('processes', name)
@@ -0,0 +1,71 @@
+"""Normaliza o CPF dos clientes
+
+Revision ID: 70b1468b8a16
+Revises: b3d94a0e6c21
+Create Date: 2026-10-17 23:02:47.518930
+
+Reescreve clients.cpf no formato canônico "000.000.000-00" (ver
+app.core.normalization.normalize_cpf), o mesmo gravado pelos schemas e
+usado no ON CONFLICT (cpf) da importação. CPFs vazios viram NULL; valores
+que não têm 11 dígitos ficam como estão.
+
+Colisões: quando mais de um cliente tem o mesmo CPF escrito de formas
+diferentes, só um recebe o formato canônico: o que já estava nele ou,
+se nenhum estava, o mais antigo. Os demais mantêm o valor original e
+aparecem em GET /api/v1/clients/duplicates (que compara só os dígitos)
+para a mesclagem manual.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '70b1468b8a16'
+down_revision: Union[str, Sequence[str], None] = 'b3d94a0e6c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NORMALIZE = r"""
+    WITH digits AS (
+        SELECT id, cpf, created_at, regexp_replace(cpf, '\D', '', 'g') AS value
+        FROM clients
+        WHERE cpf IS NOT NULL
+    ),
+    canonical AS (
+        SELECT id, cpf, created_at, value,
+               CASE WHEN value <> '' THEN
+                   substr(value, 1, 3) || '.' || substr(value, 4, 3) || '.'
+                   || substr(value, 7, 3) || '-' || substr(value, 10, 2)
+               END AS cpf_canonical
+        FROM digits
+        WHERE value = '' OR length(value) = 11
+    ),
+    ranked AS (
+        SELECT id, cpf, cpf_canonical,
+               row_number() OVER (
+                   PARTITION BY value
+                   ORDER BY cpf = cpf_canonical DESC, created_at NULLS LAST, id
+               ) AS position
+        FROM canonical
+    )
+    UPDATE clients
+    SET cpf = ranked.cpf_canonical
+    FROM ranked
+    WHERE clients.id = ranked.id
+      AND (ranked.cpf_canonical IS NULL OR ranked.position = 1)
+      AND ranked.cpf IS DISTINCT FROM ranked.cpf_canonical
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(NORMALIZE)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # O formato original de cada CPF não é guardado: nada a desfazer
+    pass
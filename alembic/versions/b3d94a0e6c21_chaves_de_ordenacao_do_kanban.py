@@ -0,0 +1,82 @@
+"""Chaves de ordenação fracionárias do Kanban
+
+Revision ID: b3d94a0e6c21
+Revises: e0a1c52f7b93
+Create Date: 2026-10-17 22:14:05.631877
+
+Substitui task_columns.position por `rank` e adiciona `rank` a
+task_cards (ver app.core.ranking). As chaves iniciais seguem a ordem
+atual: colunas por position, cartões por id.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d94a0e6c21'
+down_revision: Union[str, Sequence[str], None] = 'e0a1c52f7b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# app.crud.kanban.REBALANCED_RANK_WIDTH / REBALANCED_RANK_SUFFIX: as
+# chaves nunca terminam em "0" (000001i, ..., 000010i)
+RANK_WIDTH = 6
+RANK_SUFFIX = 'i'
+
+INDEXES = [
+    ('ix_task_columns_owner_id_rank', 'task_columns', ['owner_id', 'rank']),
+    ('ix_task_cards_column_id_rank', 'task_cards', ['column_id', 'rank']),
+]
+
+# (tabela, grupo, ordem atual)
+TABLES = [
+    ('task_columns', 'owner_id', 'position, id'),
+    ('task_cards', 'column_id', 'id'),
+]
+
+BACKFILL = """
+    UPDATE {table}
+    SET rank = r.new_rank
+    FROM (
+        SELECT id, lpad(row_number() OVER (PARTITION BY {partition} ORDER BY {order})::text, {width}, '0') || '{suffix}' AS new_rank
+        FROM {table}
+    ) AS r
+    WHERE {table}.id = r.id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, partition, order in TABLES:
+        op.add_column(table, sa.Column('rank', sa.String(), nullable=True))
+        op.execute(BACKFILL.format(table=table, partition=partition, order=order, width=RANK_WIDTH, suffix=RANK_SUFFIX))
+        op.alter_column(table, 'rank', nullable=False)
+    op.drop_column('task_columns', 'position')
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    op.add_column('task_columns', sa.Column('position', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE task_columns
+        SET position = r.position
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY owner_id ORDER BY rank, id) - 1 AS position
+            FROM task_columns
+        ) AS r
+        WHERE task_columns.id = r.id
+    """)
+    op.alter_column('task_columns', 'position', nullable=False)
+    for table, _, _ in reversed(TABLES):
+        op.drop_column(table, 'rank')
@@ -0,0 +1,41 @@
+"""Índice da ordenação por nome dos clientes com nome nulo
+
+Revision ID: bd31899a0f88
+Revises: 70b1468b8a16
+Create Date: 2026-10-17 23:41:12.305718
+
+A ordenação da listagem por nome passa a usar coalesce(full_name, '')
+(ver app.crud.client.CLIENT_SORT_OPTIONS): com NULL, a comparação por
+tupla do cursor descartava linhas. O índice acompanha a expressão.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bd31899a0f88'
+down_revision: Union[str, Sequence[str], None] = '70b1468b8a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NEW_INDEX = ('ix_clients_owner_id_full_name_sort_id', 'clients', ['owner_id', sa.text("coalesce(full_name, '')"), 'id'])
+OLD_INDEX = ('ix_clients_owner_id_full_name_id', 'clients', ['owner_id', 'full_name', 'id'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        name, table, columns = NEW_INDEX
+        op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index(OLD_INDEX[0], table_name=OLD_INDEX[1], postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        name, table, columns = OLD_INDEX
+        op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index(NEW_INDEX[0], table_name=NEW_INDEX[1], postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,39 @@
+"""Índices da listagem de processos (último andamento e situação)
+
+Revision ID: d6cdbe8366d6
+Revises: 6add70e36893
+Create Date: 2026-10-17 17:32:40.118205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6cdbe8366d6'
+down_revision: Union[str, Sequence[str], None] = '6add70e36893'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    # Andamento mais recente de cada processo (LATERAL ... ORDER BY date DESC, id DESC LIMIT 1)
+    ('ix_process_updates_process_id_date', 'process_updates', ['process_id', sa.text('date DESC'), sa.text('id DESC')]),
+    ('ix_processes_owner_id_status', 'processes', ['owner_id', 'status']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,50 @@
+"""Cria tabelas de revogação de refresh tokens
+
+Revision ID: dc9650740ec0
+Revises: 686e38194ff1
+Create Date: 2026-10-17 09:12:41.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dc9650740ec0'
+down_revision: Union[str, Sequence[str], None] = '686e38194ff1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('revoked_refresh_tokens',
+    sa.Column('jti', sa.String(), nullable=False),
+    sa.Column('family_id', sa.String(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index(op.f('ix_revoked_refresh_tokens_family_id'), 'revoked_refresh_tokens', ['family_id'], unique=False)
+    op.create_index(op.f('ix_revoked_refresh_tokens_expires_at'), 'revoked_refresh_tokens', ['expires_at'], unique=False)
+    op.create_table('revoked_token_families',
+    sa.Column('family_id', sa.String(), nullable=False),
+    sa.Column('reason', sa.String(), nullable=True),
+    sa.Column('revoked_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('family_id')
+    )
+    op.create_index(op.f('ix_revoked_token_families_revoked_at'), 'revoked_token_families', ['revoked_at'], unique=False)
+    op.create_index(op.f('ix_revoked_token_families_expires_at'), 'revoked_token_families', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_revoked_token_families_expires_at'), table_name='revoked_token_families')
+    op.drop_index(op.f('ix_revoked_token_families_revoked_at'), table_name='revoked_token_families')
+    op.drop_table('revoked_token_families')
+    op.drop_index(op.f('ix_revoked_refresh_tokens_expires_at'), table_name='revoked_refresh_tokens')
+    op.drop_index(op.f('ix_revoked_refresh_tokens_family_id'), table_name='revoked_refresh_tokens')
+    op.drop_table('revoked_refresh_tokens')
@@ -0,0 +1,183 @@
+"""Contadores do painel inicial
+
+Revision ID: e0a1c52f7b93
+Revises: f631f29d8a8c
+Create Date: 2026-10-17 21:03:41.118204
+
+Cria dashboard_counters, (user_id, metric, bucket) -> count, e os
+triggers que a mantêm a cada escrita em processes, extrajudicial_cases,
+task_cards e intimations (ver app.crud.dashboard). Os contadores atuais
+são calculados na própria migração.
+
+Os contadores por dia ignoram datas anteriores à janela mantida
+(CARD_DUE_LOOKBACK_DAYS / INTIMATION_LOOKBACK_DAYS em app.crud.dashboard).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e0a1c52f7b93'
+down_revision: Union[str, Sequence[str], None] = 'f631f29d8a8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CARD_DUE_LOOKBACK_DAYS = 7
+INTIMATION_LOOKBACK_DAYS = 31
+
+# app.crud.dashboard.CLOSED_CASE_STATUSES
+CLOSED_CASE_STATUSES = "'Completed', 'Concluído', 'Finalizado', 'Cancelado', 'Arquivado'"
+OPEN_CASE = "({row}.status IS NULL OR {row}.status NOT IN (" + CLOSED_CASE_STATUSES + "))"
+
+FUNCTIONS = [
+    # Soma `delta` a um contador, criando-o se preciso (bucket NULL: ignora)
+    """
+    CREATE OR REPLACE FUNCTION dashboard_counter_add(p_user uuid, p_metric text, p_bucket text, p_delta integer)
+    RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        IF p_user IS NULL OR p_bucket IS NULL THEN
+            RETURN;
+        END IF;
+        INSERT INTO dashboard_counters AS counter (user_id, metric, bucket, count)
+        VALUES (p_user, p_metric, p_bucket, p_delta)
+        ON CONFLICT (user_id, metric, bucket) DO UPDATE SET count = counter.count + EXCLUDED.count;
+    END $$
+    """,
+    # Dia (AAAA-MM-DD) de uma data, ou NULL se anterior à janela mantida
+    """
+    CREATE OR REPLACE FUNCTION dashboard_day_bucket(p_value timestamp, p_lookback_days integer)
+    RETURNS text LANGUAGE sql STABLE AS $$
+        SELECT CASE WHEN p_value >= (now() AT TIME ZONE 'utc')::date - p_lookback_days
+                    THEN to_char(p_value, 'YYYY-MM-DD') END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION dashboard_processes_counters() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM dashboard_counter_add(OLD.owner_id, 'process_status', OLD.status, -1);
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM dashboard_counter_add(NEW.owner_id, 'process_status', NEW.status, 1);
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION dashboard_extrajudicial_cases_counters() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' AND {OPEN_CASE.format(row='OLD')} THEN
+            PERFORM dashboard_counter_add(OLD.owner_id, 'open_cases', '', -1);
+        END IF;
+        IF TG_OP <> 'DELETE' AND {OPEN_CASE.format(row='NEW')} THEN
+            PERFORM dashboard_counter_add(NEW.owner_id, 'open_cases', '', 1);
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION dashboard_task_cards_counters() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM dashboard_counter_add(
+                (SELECT owner_id FROM task_columns WHERE id = OLD.column_id),
+                'cards_due', dashboard_day_bucket(OLD.due_date, {CARD_DUE_LOOKBACK_DAYS}), -1
+            );
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM dashboard_counter_add(
+                (SELECT owner_id FROM task_columns WHERE id = NEW.column_id),
+                'cards_due', dashboard_day_bucket(NEW.due_date, {CARD_DUE_LOOKBACK_DAYS}), 1
+            );
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION dashboard_intimations_counters() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM dashboard_counter_add(
+                OLD.owner_id, 'intimations', dashboard_day_bucket(OLD.publication_date, {INTIMATION_LOOKBACK_DAYS}), -1
+            );
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM dashboard_counter_add(
+                NEW.owner_id, 'intimations', dashboard_day_bucket(NEW.publication_date, {INTIMATION_LOOKBACK_DAYS}), 1
+            );
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+]
+
+# tabela -> (função, colunas que alteram os contadores)
+TRIGGERS = {
+    'processes': ('dashboard_processes_counters', ['owner_id', 'status']),
+    'extrajudicial_cases': ('dashboard_extrajudicial_cases_counters', ['owner_id', 'status']),
+    'task_cards': ('dashboard_task_cards_counters', ['column_id', 'due_date']),
+    'intimations': ('dashboard_intimations_counters', ['owner_id', 'publication_date']),
+}
+
+BACKFILL = f"""
+INSERT INTO dashboard_counters (user_id, metric, bucket, count)
+SELECT owner_id, 'process_status', status, count(*)
+FROM processes WHERE status IS NOT NULL GROUP BY owner_id, status
+UNION ALL
+SELECT owner_id, 'open_cases', '', count(*)
+FROM extrajudicial_cases WHERE {OPEN_CASE.format(row='extrajudicial_cases')} GROUP BY owner_id
+UNION ALL
+SELECT task_columns.owner_id, 'cards_due', to_char(task_cards.due_date, 'YYYY-MM-DD'), count(*)
+FROM task_cards JOIN task_columns ON task_columns.id = task_cards.column_id
+WHERE task_cards.due_date >= (now() AT TIME ZONE 'utc')::date - {CARD_DUE_LOOKBACK_DAYS}
+GROUP BY task_columns.owner_id, to_char(task_cards.due_date, 'YYYY-MM-DD')
+UNION ALL
+SELECT owner_id, 'intimations', to_char(publication_date, 'YYYY-MM-DD'), count(*)
+FROM intimations
+WHERE publication_date >= (now() AT TIME ZONE 'utc')::date - {INTIMATION_LOOKBACK_DAYS}
+GROUP BY owner_id, to_char(publication_date, 'YYYY-MM-DD')
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'dashboard_counters',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('metric', sa.String(), nullable=False),
+        sa.Column('bucket', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id', 'metric', 'bucket'),
+    )
+    for function in FUNCTIONS:
+        op.execute(function)
+
+    # Bloqueia as escritas até os triggers existirem e a carga inicial
+    # terminar, para nenhum ajuste ser perdido ou contado duas vezes
+    op.execute("LOCK TABLE processes, extrajudicial_cases, task_cards, task_columns, intimations IN SHARE MODE")
+    for table, (function, columns) in TRIGGERS.items():
+        changed = " OR ".join(f"OLD.{column} IS DISTINCT FROM NEW.{column}" for column in columns)
+        op.execute(
+            f"CREATE TRIGGER dashboard_counters AFTER INSERT OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {function}()"
+        )
+        op.execute(
+            f"CREATE TRIGGER dashboard_counters_update AFTER UPDATE OF {', '.join(columns)} ON {table} "
+            f"FOR EACH ROW WHEN ({changed}) EXECUTE FUNCTION {function}()"
+        )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (function, _) in TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS dashboard_counters_update ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS dashboard_counters ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+    op.execute("DROP FUNCTION IF EXISTS dashboard_day_bucket(timestamp, integer)")
+    op.execute("DROP FUNCTION IF EXISTS dashboard_counter_add(uuid, text, text, integer)")
+    op.drop_table('dashboard_counters')
@@ -0,0 +1,135 @@
+"""Particiona andamentos e intimações por mês
+
+Revision ID: f631f29d8a8c
+Revises: 2bbeffc5e7f9
+Create Date: 2026-10-17 19:12:08.527940
+
+Converte process_updates (por `date`) e intimations (por
+`publication_date`) em tabelas particionadas por intervalo mensal:
+
+- `<tabela>_pAAAAMM` para os últimos HISTORY_MONTHS meses e os
+  PREMAKE_MONTHS seguintes (os próximos são criados por
+  app.services.partitions);
+- `<tabela>_historic` com os dados anteriores;
+- `<tabela>_default` para datas sem partição.
+
+No PostgreSQL, chaves primárias e índices únicos de tabelas
+particionadas precisam incluir a coluna de partição: a chave passa a
+ser (id, <coluna>) e o índice único de andamentos inclui `date`.
+
+Os dados são copiados para a nova tabela dentro da transação da
+migração, com as tabelas originais bloqueadas durante a cópia.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f631f29d8a8c'
+down_revision: Union[str, Sequence[str], None] = '2bbeffc5e7f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+HISTORY_MONTHS = 24
+PREMAKE_MONTHS = 3
+
+TABLES = [
+    {
+        'name': 'process_updates',
+        'column': 'date',
+        'sequence': 'process_updates_id_seq',
+        'foreign_keys': [('process_updates_process_id_fkey', 'process_id', 'processes(id)')],
+        'indexes': [
+            ('ix_process_updates_process_id_date', 'process_id, date DESC, id DESC', False),
+            ('ix_process_updates_process_id_content_hash', 'process_id, content_hash, date', True),
+        ],
+        'previous_indexes': [
+            ('ix_process_updates_process_id_date', 'process_id, date DESC, id DESC', False),
+            ('ix_process_updates_process_id_content_hash', 'process_id, content_hash', True),
+        ],
+    },
+    {
+        'name': 'intimations',
+        'column': 'publication_date',
+        'sequence': None,
+        'foreign_keys': [('intimations_owner_id_fkey', 'owner_id', 'users(id)')],
+        'indexes': [
+            ('ix_intimations_owner_id_publication_date', 'owner_id, publication_date', False),
+            ('ix_intimations_process_number', 'process_number', False),
+        ],
+        'previous_indexes': [
+            ('ix_intimations_process_number', 'process_number', False),
+            ('ix_intimations_publication_date', 'publication_date', False),
+        ],
+    },
+]
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _replace_table(table: dict, new_table: str, indexes: list) -> None:
+    """Copia os dados para `new_table` e a coloca no lugar da tabela original."""
+    name = table['name']
+    op.execute(f"INSERT INTO {new_table} SELECT * FROM {name}")
+    if table['sequence']:
+        # A sequência do id pertence à coluna da tabela antiga e seria apagada com ela
+        op.execute(f"ALTER SEQUENCE {table['sequence']} OWNED BY NONE")
+    op.execute(f"DROP TABLE {name}")
+    op.execute(f"ALTER TABLE {new_table} RENAME TO {name}")
+    op.execute(f"ALTER TABLE {name} RENAME CONSTRAINT {new_table}_pkey TO {name}_pkey")
+    if table['sequence']:
+        op.execute(f"ALTER SEQUENCE {table['sequence']} OWNED BY {name}.id")
+    for index_name, columns, unique in indexes:
+        op.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX {index_name} ON {name} ({columns})")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    first_month = _add_months(date.today().replace(day=1), -HISTORY_MONTHS)
+    for table in TABLES:
+        name, column = table['name'], table['column']
+        new_table = f"{name}_partitioned"
+
+        op.execute(
+            f"CREATE TABLE {new_table} (LIKE {name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({column})"
+        )
+        op.execute(f"ALTER TABLE {new_table} ADD CONSTRAINT {new_table}_pkey PRIMARY KEY (id, {column})")
+        for constraint, columns, target in table['foreign_keys']:
+            op.execute(f"ALTER TABLE {new_table} ADD CONSTRAINT {constraint} FOREIGN KEY ({columns}) REFERENCES {target}")
+
+        op.execute(
+            f"CREATE TABLE {name}_historic PARTITION OF {new_table} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{first_month.isoformat()}')"
+        )
+        for offset in range(HISTORY_MONTHS + PREMAKE_MONTHS + 1):
+            month = _add_months(first_month, offset)
+            op.execute(
+                f"CREATE TABLE {name}_p{month:%Y%m} PARTITION OF {new_table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+        op.execute(f"CREATE TABLE {name}_default PARTITION OF {new_table} DEFAULT")
+
+        _replace_table(table, new_table, table['indexes'])
+        op.execute(f"ANALYZE {name}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(TABLES):
+        name = table['name']
+        new_table = f"{name}_plain"
+
+        op.execute(f"CREATE TABLE {new_table} (LIKE {name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        op.execute(f"ALTER TABLE {new_table} ADD CONSTRAINT {new_table}_pkey PRIMARY KEY (id)")
+        for constraint, columns, target in table['foreign_keys']:
+            op.execute(f"ALTER TABLE {new_table} ADD CONSTRAINT {constraint} FOREIGN KEY ({columns}) REFERENCES {target}")
+
+        # Apaga também todas as partições
+        _replace_table(table, new_table, table['previous_indexes'])
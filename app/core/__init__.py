@@ -6,6 +6,7 @@ from app.core.config import settings, get_settings
 from app.core.security import (
     verify_password,
     get_password_hash,
+    password_needs_rehash,
     create_access_token,
     create_refresh_token,
     decode_access_token,
@@ -17,6 +18,7 @@ __all__ = [
     "get_settings",
     "verify_password",
     "get_password_hash",
+    "password_needs_rehash",
     "create_access_token",
     "create_refresh_token",
     "decode_access_token",
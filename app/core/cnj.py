@@ -0,0 +1,164 @@
+"""
+Numeração única de processos do CNJ (Resolução CNJ 65/2008).
+
+Formato: NNNNNNN-DD.AAAA.J.TR.OOOO
+- NNNNNNN: número sequencial do processo na origem
+- DD: dígitos verificadores (ISO 7064, módulo 97)
+- AAAA: ano de ajuizamento
+- J: segmento do Judiciário (8 = Justiça Estadual, 5 = Trabalho, ...)
+- TR: tribunal dentro do segmento (na Justiça Estadual, 26 = TJSP)
+- OOOO: unidade de origem
+
+Os dígitos verificadores satisfazem int(N A J TR O DD) mod 97 == 1.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_NON_DIGITS = re.compile(r"\D")
+
+SEGMENTS: Dict[int, str] = {
+    1: "Supremo Tribunal Federal",
+    2: "Conselho Nacional de Justiça",
+    3: "Superior Tribunal de Justiça",
+    4: "Justiça Federal",
+    5: "Justiça do Trabalho",
+    6: "Justiça Eleitoral",
+    7: "Justiça Militar da União",
+    8: "Justiça Estadual",
+    9: "Justiça Militar Estadual",
+}
+
+# Código TR dos tribunais estaduais (segmento 8) e eleitorais (6), por UF
+STATE_CODES: Dict[int, str] = {
+    1: "AC", 2: "AL", 3: "AP", 4: "AM", 5: "BA", 6: "CE", 7: "DF", 8: "ES", 9: "GO",
+    10: "MA", 11: "MT", 12: "MS", 13: "MG", 14: "PA", 15: "PB", 16: "PR", 17: "PE",
+    18: "PI", 19: "RJ", 20: "RN", 21: "RS", 22: "RO", 23: "RR", 24: "SC", 25: "SE",
+    26: "SP", 27: "TO",
+}
+
+
+class InvalidCNJNumberError(ValueError):
+    """Número fora do formato CNJ ou com dígitos verificadores errados."""
+
+
+@dataclass(frozen=True)
+class CNJNumber:
+    """Componentes de um número CNJ válido."""
+
+    sequential: int
+    check_digits: int
+    year: int
+    segment: int
+    tribunal: int
+    origin: int
+
+    @property
+    def formatted(self) -> str:
+        return (
+            f"{self.sequential:07d}-{self.check_digits:02d}.{self.year:04d}."
+            f"{self.segment}.{self.tribunal:02d}.{self.origin:04d}"
+        )
+
+    @property
+    def court(self) -> Optional[str]:
+        """Sigla do tribunal (ex: "TJSP", "TRF3", "TRT2"), quando conhecida."""
+        return court_acronym(self.segment, self.tribunal)
+
+
+def compute_check_digits(sequential: int, year: int, segment: int, tribunal: int, origin: int) -> int:
+    """Dígitos verificadores (DD) para os demais componentes."""
+    base = int(f"{sequential:07d}{year:04d}{segment}{tribunal:02d}{origin:04d}")
+    return 98 - (base * 100) % 97
+
+
+def _split(digits: str) -> CNJNumber:
+    return CNJNumber(
+        sequential=int(digits[0:7]),
+        check_digits=int(digits[7:9]),
+        year=int(digits[9:13]),
+        segment=int(digits[13]),
+        tribunal=int(digits[14:16]),
+        origin=int(digits[16:20]),
+    )
+
+
+def _is_valid(digits: str) -> bool:
+    # NNNNNNN AAAA J TR OOOO DD: o número inteiro com os DD ao final deixa resto 1
+    return int(digits[0:7] + digits[9:20] + digits[7:9]) % 97 == 1
+
+
+def parse_cnj(value: str) -> CNJNumber:
+    """
+    Lê um número CNJ, com ou sem pontuação.
+
+    Raises:
+        InvalidCNJNumberError: não tem 20 dígitos ou os dígitos
+            verificadores não conferem.
+    """
+    digits = _NON_DIGITS.sub("", value or "")
+    if len(digits) != 20:
+        raise InvalidCNJNumberError("Número de processo fora do padrão CNJ (20 dígitos).")
+    if not _is_valid(digits):
+        raise InvalidCNJNumberError("Número de processo inválido: dígitos verificadores não conferem.")
+    return _split(digits)
+
+
+def normalize_cnj(value: str) -> str:
+    """Número CNJ no formato canônico NNNNNNN-DD.AAAA.J.TR.OOOO."""
+    return parse_cnj(value).formatted
+
+
+def parse_cnj_batch(values: Iterable[Optional[str]]) -> List[Optional[CNJNumber]]:
+    """
+    Valida vários números de uma vez (importações): uma única passada,
+    sem exceções por item. Números inválidos viram None.
+    """
+    digits_list = [_NON_DIGITS.sub("", value or "") for value in values]
+    return [
+        _split(digits) if len(digits) == 20 and _is_valid(digits) else None
+        for digits in digits_list
+    ]
+
+
+def court_acronym(segment: int, tribunal: int) -> Optional[str]:
+    """Sigla do tribunal a partir do segmento (J) e do código TR."""
+    if segment == 8 and tribunal in STATE_CODES:
+        return f"TJ{STATE_CODES[tribunal]}"
+    if segment == 6 and tribunal in STATE_CODES:
+        return f"TRE{STATE_CODES[tribunal]}"
+    if segment == 4 and 1 <= tribunal <= 6:
+        return f"TRF{tribunal}"
+    if segment == 5 and 1 <= tribunal <= 24:
+        return f"TRT{tribunal}"
+    if segment == 9 and tribunal in (13, 21, 26):
+        return f"TJM{STATE_CODES[tribunal]}"
+    return {1: "STF", 2: "CNJ", 3: "STJ", 7: "STM"}.get(segment)
+
+
+def parse_court(acronym: str) -> Tuple[int, Optional[int]]:
+    """
+    Segmento e código TR de uma sigla de tribunal ("TJSP" -> (8, 26)).
+    Tribunais superiores retornam TR None (qualquer código).
+
+    Raises:
+        InvalidCNJNumberError: sigla desconhecida.
+    """
+    acronym = acronym.strip().upper()
+    superior = {"STF": 1, "CNJ": 2, "STJ": 3, "STM": 7}
+    if acronym in superior:
+        return superior[acronym], None
+
+    states = {uf: code for code, uf in STATE_CODES.items()}
+    for prefix, segment in (("TJM", 9), ("TRE", 6), ("TJ", 8)):
+        if acronym.startswith(prefix) and acronym[len(prefix):] in states:
+            code = states[acronym[len(prefix):]]
+            if court_acronym(segment, code) == acronym:
+                return segment, code
+    for prefix, segment in (("TRF", 4), ("TRT", 5)):
+        if acronym.startswith(prefix) and acronym[len(prefix):].isdigit():
+            code = int(acronym[len(prefix):])
+            if court_acronym(segment, code) == acronym:
+                return segment, code
+    raise InvalidCNJNumberError(f"Tribunal desconhecido: {acronym}")
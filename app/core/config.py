@@ -12,6 +12,14 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _asyncpg_url(url: str) -> str:
+    """Troca o driver de uma URL PostgreSQL por asyncpg."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
 class Settings(BaseSettings):
     """
     Configurações da aplicação carregadas de variáveis de ambiente.
@@ -28,9 +36,96 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
-    
+
+    # Revogação de refresh tokens: intervalo de sincronização do filtro
+    # de Bloom entre workers e capacidade do filtro
+    TOKEN_REVOCATION_SYNC_SECONDS: int = int(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "30"))
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = int(os.getenv("TOKEN_REVOCATION_BLOOM_CAPACITY", "100000"))
+    # Limpeza periódica dos tokens e famílias revogados já expirados
+    TOKEN_REVOCATION_PURGE_ENABLED: bool = os.getenv("TOKEN_REVOCATION_PURGE_ENABLED", "true").lower() == "true"
+    TOKEN_REVOCATION_PURGE_INTERVAL_HOURS: float = float(os.getenv("TOKEN_REVOCATION_PURGE_INTERVAL_HOURS", "24"))
+
+    # Cache de identidades autenticadas (0 desativa). A invalidação é
+    # local ao processo: com vários workers, um usuário excluído ou
+    # alterado pode continuar em cache nos demais por até o TTL
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+    AUTH_CACHE_MAX_SIZE: int = int(os.getenv("AUTH_CACHE_MAX_SIZE", "1024"))
+
+    # Hash de senhas: "bcrypt" ou "argon2id". Hashes com parâmetros
+    # diferentes são refeitos no próximo login bem-sucedido.
+    # Calibre o custo com: python -m app.core.security <ms alvo>
+    PASSWORD_HASH_ALGORITHM: str = os.getenv("PASSWORD_HASH_ALGORITHM", "bcrypt")
+    PASSWORD_BCRYPT_ROUNDS: int = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "2"))
+
+    # Executor dedicado ao bcrypt (login, cadastro e troca de senha)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+    # Token para acessar /internal/* (vazio = endpoints internos fechados)
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
     # === DATABASE ===
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+
+    # Caminho assíncrono (AsyncSession + asyncpg) para todas as rotas
+    DB_ASYNC_ENABLED: bool = os.getenv("DB_ASYNC_ENABLED", "false").lower() == "true"
+
+    @property
+    def DATABASE_ASYNC_URL(self) -> str:
+        """
+        URL do banco com o driver asyncpg (derivada de DATABASE_URL).
+        """
+        return _asyncpg_url(os.getenv("DATABASE_ASYNC_URL") or self.DATABASE_URL)
+
+    # Réplica de leitura (vazio = desativada). Leituras voltam ao primário
+    # quando o atraso de replicação passa de DB_REPLICA_MAX_LAG_SECONDS.
+    DATABASE_REPLICA_URL: str = os.getenv("DATABASE_REPLICA_URL", "")
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+    DB_REPLICA_LAG_CHECK_SECONDS: float = float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS", "2"))
+
+    @property
+    def DATABASE_REPLICA_ASYNC_URL(self) -> str:
+        """
+        URL da réplica com o driver asyncpg (derivada de DATABASE_REPLICA_URL).
+        """
+        return _asyncpg_url(os.getenv("DATABASE_REPLICA_ASYNC_URL") or self.DATABASE_REPLICA_URL)
+
+    # Pool de conexões
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Recicla conexões antes que proxies/firewalls as derrubem por ociosidade
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # pgbouncer em modo transação: o pooling fica a cargo do proxy
+    DB_PGBOUNCER_MODE: bool = os.getenv("DB_PGBOUNCER_MODE", "false").lower() == "true"
+    
+    # Instrumentação de SQL por requisição (contagem, N+1, queries lentas)
+    DB_QUERY_STATS_ENABLED: bool = os.getenv("DB_QUERY_STATS_ENABLED", "true").lower() == "true"
+    DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+    DB_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5"))
+    # Cabeçalhos X-DB-Query-Count / X-DB-Time-Ms nas respostas
+    DB_QUERY_STATS_HEADERS: bool = os.getenv(
+        "DB_QUERY_STATS_HEADERS", "false" if ENVIRONMENT == "production" else "true"
+    ).lower() == "true"
+    # Falha a requisição (exceção) quando uma rota excede o orçamento declarado
+    DB_QUERY_BUDGET_STRICT: bool = os.getenv("DB_QUERY_BUDGET_STRICT", "false").lower() == "true"
+    # Partições mensais de process_updates e intimations (app.services.partitions):
+    # meses criados com antecedência e retenção em meses (0 = sem retenção)
+    PARTITION_MAINTENANCE_ENABLED: bool = os.getenv("PARTITION_MAINTENANCE_ENABLED", "true").lower() == "true"
+    PARTITION_MAINTENANCE_INTERVAL_HOURS: float = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL_HOURS", "24"))
+    PARTITION_PREMAKE_MONTHS: int = int(os.getenv("PARTITION_PREMAKE_MONTHS", "3"))
+    PROCESS_UPDATES_RETENTION_MONTHS: int = int(os.getenv("PROCESS_UPDATES_RETENTION_MONTHS", "0"))
+    INTIMATIONS_RETENTION_MONTHS: int = int(os.getenv("INTIMATIONS_RETENTION_MONTHS", "0"))
+    # Reconciliação periódica dos contadores do painel (app.services.dashboard)
+    DASHBOARD_RECONCILE_ENABLED: bool = os.getenv("DASHBOARD_RECONCILE_ENABLED", "true").lower() == "true"
+    DASHBOARD_RECONCILE_INTERVAL_HOURS: float = float(os.getenv("DASHBOARD_RECONCILE_INTERVAL_HOURS", "6"))
+    # Rebalanceamento periódico das chaves de ordenação do Kanban (app.services.kanban_ranks)
+    KANBAN_REBALANCE_ENABLED: bool = os.getenv("KANBAN_REBALANCE_ENABLED", "true").lower() == "true"
+    KANBAN_REBALANCE_INTERVAL_HOURS: float = float(os.getenv("KANBAN_REBALANCE_INTERVAL_HOURS", "24"))
     
     # === CORS ===
     @property
@@ -53,11 +148,36 @@ class Settings(BaseSettings):
     # === APIS EXTERNAS ===
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
     DATAJUD_API_KEY: str = os.getenv("DATAJUD_API_KEY", "")
+    DATAJUD_BASE_URL: str = os.getenv("DATAJUD_BASE_URL", "https://api-publica.datajud.cnj.jus.br")
+    DATAJUD_TIMEOUT_SECONDS: float = float(os.getenv("DATAJUD_TIMEOUT_SECONDS", "30"))
+    # Sincronização de andamentos: requisições simultâneas ao DataJud e
+    # novas tentativas (backoff exponencial) em falhas temporárias
+    DATAJUD_SYNC_CONCURRENCY: int = int(os.getenv("DATAJUD_SYNC_CONCURRENCY", "4"))
+    DATAJUD_SYNC_MAX_RETRIES: int = int(os.getenv("DATAJUD_SYNC_MAX_RETRIES", "3"))
+    DATAJUD_SYNC_BACKOFF_SECONDS: float = float(os.getenv("DATAJUD_SYNC_BACKOFF_SECONDS", "0.5"))
     BROWSERLESS_URL: str = os.getenv("BROWSERLESS_URL", "")
     
     # === RATE LIMITING ===
     RATE_LIMIT_ENABLED: bool = ENVIRONMENT == "production"
-    RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+    # Limite por IP (escritórios costumam compartilhar o mesmo IP)
+    RATE_LIMIT_IP_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "180"))
+    # "memory" (por processo) ou "redis" (compartilhado entre workers)
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_REDIS_URL: str = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    # Tempo máximo de uma ida ao Redis antes de contar como falha
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS: float = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT_SECONDS", "0.2"))
+    # Com o backend indisponível: true = deixa passar (sem limite), false = 503
+    RATE_LIMIT_FAIL_OPEN: bool = os.getenv("RATE_LIMIT_FAIL_OPEN", "true").lower() == "true"
+    # Proxies confiáveis à frente da API (Render = 1) para ler o X-Forwarded-For
+    RATE_LIMIT_PROXY_HOPS: int = int(os.getenv("RATE_LIMIT_PROXY_HOPS", "1" if ENVIRONMENT == "production" else "0"))
+
+    # === HTTP ===
+    # ETag / 304 para respostas GET (If-None-Match)
+    HTTP_ETAG_ENABLED: bool = os.getenv("HTTP_ETAG_ENABLED", "true").lower() == "true"
+    # Compressão (brotli/gzip) de respostas acima do tamanho mínimo
+    HTTP_COMPRESSION_ENABLED: bool = os.getenv("HTTP_COMPRESSION_ENABLED", "true").lower() == "true"
+    HTTP_COMPRESSION_MIN_BYTES: int = int(os.getenv("HTTP_COMPRESSION_MIN_BYTES", "1024"))
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,126 @@
+"""
+Instrumentação do pool de conexões do SQLAlchemy.
+
+Mede o tempo de espera por uma conexão (histograma), timeouts de
+checkout e o estado atual do pool (em uso, overflow, ociosas).
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import exc
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+class PoolMetrics:
+    """Contadores e histograma de espera por conexão (thread-safe)."""
+
+    # Limites superiores dos buckets, em milissegundos
+    BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self._bucket_counts = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def observe_wait(self, seconds: float) -> None:
+        wait_ms = seconds * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self._bucket_counts[bisect.bisect_left(self.BUCKETS_MS, wait_ms)] += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def record_connect(self, *args: Any) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidate(self, *args: Any) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        """Estado atual do pool + métricas acumuladas."""
+        with self._lock:
+            labels = [f"le_{bound:g}ms" for bound in self.BUCKETS_MS] + ["le_inf"]
+            histogram = dict(zip(labels, self._bucket_counts))
+            data = {
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_histogram": histogram,
+            }
+
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+            })
+        return data
+
+
+def instrumented_pool_class(base, metrics: PoolMetrics):
+    """
+    Cria uma subclasse do pool que mede o tempo de espera em cada
+    checkout e conta os timeouts (pool esgotado).
+    """
+
+    class InstrumentedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record_timeout()
+                raise
+            metrics.observe_wait(time.perf_counter() - started)
+            return conn
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+# Métricas do engine principal
+pool_metrics = PoolMetrics()
+
+
+def pool_options(settings, metrics: PoolMetrics, base=QueuePool) -> Dict[str, Any]:
+    """
+    Opções de pool para create_engine a partir das configurações.
+
+    No modo pgbouncer (pool em modo transação à frente do Postgres) o
+    pooling fica a cargo do pgbouncer: usamos NullPool, sem conexões
+    paradas no processo que o proxy possa derrubar.
+    """
+    if settings.DB_PGBOUNCER_MODE:
+        return {"poolclass": instrumented_pool_class(NullPool, metrics)}
+
+    return {
+        "poolclass": instrumented_pool_class(base, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
@@ -0,0 +1,145 @@
+"""
+Requisições condicionais (ETag / If-None-Match -> 304).
+
+- Rotas com uma "versão" barata dos dados (ex: COUNT + MAX(updated_at))
+  usam `not_modified_response`: o ETag vem da versão e, se o cliente
+  já tem essa versão, a rota responde 304 antes de carregar e
+  serializar os dados.
+- As demais respostas GET 200 recebem do ConditionalRequestMiddleware
+  um ETag forte calculado do corpo (SHA-256); o 304 economiza a
+  transferência, mas não o trabalho da rota.
+
+O ETag forte identifica a representação exata: quando a resposta é
+comprimida (app.core.compression), o ETag recebe o sufixo da
+codificação ("-gzip", "-br"), removido aqui na comparação.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+# Sufixos que a compressão acrescenta ao ETag
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def make_etag(*parts: Any) -> str:
+    """ETag forte a partir de valores arbitrários (versão, filtros, usuário...)."""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def body_etag(body: bytes) -> str:
+    """ETag forte a partir do corpo da resposta."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag da representação comprimida ('"abc"' -> '"abc-gzip"')."""
+    if etag.startswith('"') and etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+def _strip_encoding(etag: str) -> str:
+    etag = etag.strip()
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if etag.endswith(f'{suffix}"'):
+            return etag[:-len(suffix) - 1] + '"'
+    return etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True se o cabeçalho If-None-Match contém o ETag (comparação fraca,
+    como exige a RFC 9110 para If-None-Match).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _strip_encoding(etag)
+    return any(_strip_encoding(candidate) == target for candidate in if_none_match.split(","))
+
+
+def not_modified_response(request, response, *version: Any) -> Optional[Response]:
+    """
+    Define o ETag da resposta a partir da versão dos dados (e da URL) e
+    retorna uma resposta 304 se o cliente já tem essa versão. Uso:
+
+        version = await crud.aio.get_user_clients_version(db=db, user_id=user.id)
+        not_modified = not_modified_response(request, response, user.id, *version)
+        if not_modified is not None:
+            return not_modified
+    """
+    etag = make_etag(request.url.path, request.url.query, *version)
+    response.headers["ETag"] = etag
+    response.headers.setdefault("Cache-Control", "private, no-cache")
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": response.headers["Cache-Control"]},
+        )
+    return None
+
+
+class ConditionalRequestMiddleware:
+    """
+    Middleware ASGI que acrescenta ETag (hash do corpo) às respostas GET
+    200 que ainda não têm um e responde 304 quando o If-None-Match do
+    cliente corresponde. Respostas em streaming passam sem alteração.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # HEAD fica de fora: o corpo vazio geraria um ETag diferente do GET
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message = None
+
+        async def send_with_etag(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                if message["status"] != 200 or "etag" in headers:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            if message["type"] != "http.response.body" or message.get("more_body", False):
+                # Streaming: o corpo não está inteiro em memória
+                await send(start)
+                await send(message)
+                return
+
+            etag = body_etag(message.get("body", b""))
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            headers["ETag"] = etag
+            if "cache-control" not in headers:
+                headers["Cache-Control"] = "private, no-cache"
+
+            if etag_matches(if_none_match, etag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send({**start, "headers": headers.raw})
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
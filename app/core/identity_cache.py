@@ -0,0 +1,108 @@
+"""
+Cache de identidades autenticadas.
+
+Evita uma consulta ao banco em cada requisição autenticada: o usuário
+resolvido a partir do `sub` do JWT fica em memória por um tempo limitado.
+
+A invalidação (`invalidate_identity`, na exclusão e nas alterações do
+usuário) vale só para o processo que fez a alteração. Com vários
+workers, os demais podem servir a identidade antiga por até
+AUTH_CACHE_TTL_SECONDS; por isso o TTL padrão é curto.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """
+    Cache LRU limitado em tamanho, com expiração por tempo (TTL).
+
+    Thread-safe: endpoints síncronos rodam no threadpool do anyio.
+    Mantém contadores de hits/misses/evictions para monitoramento.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor se presente e não expirado, senão None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Armazena um valor, removendo o menos usado se o cache estiver cheio."""
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove uma entrada (ex: após alteração do usuário)."""
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Esvazia o cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna contadores para monitoramento."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Instância global, chaveada pelo `sub` (email) do token
+identity_cache = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_identity(email: Optional[str]) -> None:
+    """Invalida a identidade em cache de um usuário."""
+    if email:
+        identity_cache.invalidate(email)
@@ -0,0 +1,102 @@
+"""
+Normalização de documentos e dados pessoais (CPF, nomes, emails) e
+identidade de conteúdo dos andamentos de processos.
+"""
+
+import hashlib
+import re
+import unicodedata
+from datetime import datetime, timezone
+from typing import Optional
+
+_NON_DIGITS = re.compile(r"\D")
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+_SPACES = re.compile(r"\s+")
+# Só espaços ASCII: a mesma classe é usada no SQL (migração 2bbeffc5e7f9)
+_ASCII_SPACES = re.compile(r"[ \t\n\r\f\v]+")
+
+
+def _cpf_check_digit(digits: str) -> str:
+    weight = len(digits) + 1
+    total = sum(int(digit) * (weight - index) for index, digit in enumerate(digits))
+    remainder = total % 11
+    return "0" if remainder < 2 else str(11 - remainder)
+
+
+def format_cpf(value: Optional[str]) -> Optional[str]:
+    """
+    Formato canônico "000.000.000-00" de um CPF com 11 dígitos, sem
+    validar os dígitos verificadores. Outros valores voltam como vieram
+    (sem espaços nas pontas); vazio vira None.
+    """
+    if value is None:
+        return None
+    digits = _NON_DIGITS.sub("", value)
+    if not digits:
+        return None
+    if len(digits) != 11:
+        return value.strip()
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def normalize_cpf(value: Optional[str]) -> Optional[str]:
+    """
+    Valida um CPF e o devolve no formato canônico "000.000.000-00",
+    aceitando qualquer pontuação na entrada. Vazio vira None.
+
+    Raises:
+        ValueError: CPF com tamanho ou dígitos verificadores inválidos.
+    """
+    if value is None:
+        return None
+    digits = _NON_DIGITS.sub("", value)
+    if not digits:
+        return None
+    if len(digits) != 11 or digits == digits[0] * 11:
+        raise ValueError("CPF inválido.")
+    if digits[9] != _cpf_check_digit(digits[:9]) or digits[10] != _cpf_check_digit(digits[:10]):
+        raise ValueError("CPF inválido: dígitos verificadores não conferem.")
+    return format_cpf(digits)
+
+
+def only_digits(value: Optional[str]) -> str:
+    """Mantém apenas os dígitos (CPF, telefone), sem validar."""
+    return _NON_DIGITS.sub("", value or "")
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """
+    Forma de comparação de um nome: sem acentos, minúsculo, sem
+    pontuação e com espaços simples ("  José  da Silva." -> "jose da silva").
+    """
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    ascii_name = "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", ascii_name)).strip()
+
+
+def normalize_email(value: Optional[str]) -> str:
+    """Forma de comparação de um email (sem espaços, minúsculo)."""
+    return (value or "").strip().lower()
+
+
+def utc_now() -> datetime:
+    """Agora em UTC, sem fuso, como gravado nas colunas DateTime."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def normalize_timestamp(value: datetime) -> datetime:
+    """Data/hora sem fuso (UTC), como gravada nas colunas DateTime."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def process_update_hash(date: datetime, description: str) -> str:
+    """
+    Hash (SHA-256, hex) que identifica um andamento dentro do processo:
+    data/hora até os segundos e descrição com espaços normalizados. O
+    mesmo andamento lido de novo da fonte gera o mesmo hash.
+    """
+    description = _ASCII_SPACES.sub(" ", description).strip(" ")
+    content = f"{normalize_timestamp(date):%Y-%m-%dT%H:%M:%S}\x1f{description}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
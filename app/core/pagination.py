@@ -0,0 +1,124 @@
+"""
+Paginação por cursor (keyset).
+
+Em vez de OFFSET, cada página continua a partir da última linha da
+anterior: `WHERE (col1, col2) > (:v1, :v2) ORDER BY col1, col2 LIMIT n`.
+O custo não cresce com a profundidade da página e inserções concorrentes
+não deslocam resultados. O cursor é opaco para o cliente (JSON em
+base64 com a ordenação e os valores da última linha).
+"""
+
+import base64
+import binascii
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, TypeVar
+
+from sqlalchemy import tuple_
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """Cursor malformado ou gerado para outra ordenação."""
+
+
+@dataclass
+class Page(Generic[T]):
+    """Uma página de resultados."""
+
+    items: List[T]
+    next_cursor: Optional[str]
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _from_json(value: Any, python_type: type) -> Any:
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Serializa a posição (valores das colunas de ordenação) em um cursor opaco."""
+    payload = json.dumps({"s": sort, "v": [_to_json(value) for value in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Lê um cursor gerado por encode_cursor para a mesma ordenação.
+
+    Raises:
+        InvalidCursorError: cursor malformado ou de outra ordenação.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["s"] != sort or len(payload["v"]) != len(columns):
+            raise InvalidCursorError("Cursor não corresponde à ordenação solicitada.")
+        return [_from_json(value, column.type.python_type) for value, column in zip(payload["v"], columns)]
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursorError("Cursor inválido.") from exc
+
+
+def keyset_paginate(
+    query,
+    sort: str,
+    sort_options: Dict[str, Sequence[Any]],
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Page:
+    """
+    Aplica ordenação e cursor a uma query do ORM e busca `limit + 1`
+    linhas: a linha extra só indica se há próxima página (sem COUNT).
+
+    Args:
+        sort: nome da ordenação; prefixo "-" para decrescente.
+        sort_options: ordenações permitidas -> colunas (a última deve
+            ser única, ex: id, para desempatar).
+    """
+    descending = sort.startswith("-")
+    columns = sort_options.get(sort.lstrip("-"))
+    if columns is None:
+        raise InvalidCursorError(f"Ordenação inválida: {sort}")
+
+    if cursor:
+        values = decode_cursor(cursor, sort, columns)
+        position = tuple_(*columns)
+        query = query.filter(position < tuple_(*values) if descending else position > tuple_(*values))
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, [getattr(last, column.key) for column in columns])
+    return Page(items=rows, next_cursor=next_cursor)
+
+
+def set_page_headers(response, page: Page) -> None:
+    """Expõe o cursor da próxima página nos cabeçalhos da resposta."""
+    response.headers["X-Has-More"] = "true" if page.has_more else "false"
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
@@ -0,0 +1,256 @@
+"""
+Instrumentação de SQL por requisição.
+
+Eventos do SQLAlchemy contam as queries e o tempo de banco de cada
+requisição (via ContextVar, que acompanha o threadpool e o run_sync),
+agrupando os statements por "fingerprint" (SQL sem literais). Ao fim da
+requisição:
+
+- fingerprints repetidos DB_N_PLUS_ONE_THRESHOLD vezes ou mais são
+  registrados no log como candidatos a N+1;
+- queries acima de DB_SLOW_QUERY_MS vão para o log de queries lentas,
+  com os parâmetros mascarados (dados pessoais não chegam ao log);
+- rotas com orçamento declarado (`query_budget`) que o ultrapassam são
+  registradas no log, ou falham com DB_QUERY_BUDGET_STRICT (testes).
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceededError(AssertionError):
+    """Lançada (modo estrito) quando uma rota excede seu orçamento de queries."""
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# ":nome" não pode vir depois de outro ":" (casts do PostgreSQL: "x::text")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normaliza um statement para agrupar queries de mesma forma:
+    literais e parâmetros viram "?" e listas de IN viram "(?)".
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def fingerprint_id(normalized: str) -> str:
+    """Identificador curto de um fingerprint, para correlacionar logs."""
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """
+    Mascara os parâmetros de uma query para o log: mantém apenas
+    números, booleanos e None; textos viram <str len=N>.
+    """
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) for value in parameters]
+    if parameters is None or isinstance(parameters, (bool, int, float)):
+        return parameters
+    if isinstance(parameters, (str, bytes)):
+        return f"<{type(parameters).__name__} len={len(parameters)}>"
+    return f"<{type(parameters).__name__}>"
+
+
+class QueryStats:
+    """Queries executadas em uma requisição (ou bloco de `capture_queries`)."""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.total_seconds = 0.0
+        self.fingerprints: Counter = Counter()
+        self.budget: Optional[int] = None
+
+    def record(self, normalized: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.fingerprints[normalized] += 1
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """Fingerprints executados `threshold` vezes ou mais (candidatos a N+1)."""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count >= threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Totais do processo, expostos em /internal/metrics
+_totals_lock = threading.Lock()
+_totals: Dict[str, int] = {
+    "requests": 0,
+    "queries": 0,
+    "slow_queries": 0,
+    "n_plus_one_flags": 0,
+    "budget_violations": 0,
+}
+
+
+def _increment(key: str, amount: int = 1) -> None:
+    with _totals_lock:
+        _totals[key] += amount
+
+
+def query_stats_totals() -> Dict[str, int]:
+    """Contadores acumulados para monitoramento."""
+    with _totals_lock:
+        return dict(_totals)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Estatísticas da requisição em andamento, se houver."""
+    return _current_stats.get()
+
+
+# --- Eventos do SQLAlchemy ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    elapsed = time.perf_counter() - started
+    normalized = fingerprint(statement)
+
+    _increment("queries")
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(normalized, elapsed)
+
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        _increment("slow_queries")
+        logger.warning(
+            "Query lenta (%.1f ms) [%s] %s params=%s rota=%s",
+            elapsed * 1000,
+            fingerprint_id(normalized),
+            _WHITESPACE.sub(" ", statement).strip(),
+            redact_parameters(parameters),
+            stats.label if stats else "-",
+        )
+
+
+def _handle_error(exception_context):
+    # Query com erro não chega ao after_cursor_execute: descarta o início
+    # empilhado em _before_cursor_execute. Sem execution_context, o erro
+    # ocorreu antes do cursor e nada foi empilhado.
+    conn = exception_context.connection
+    if conn is not None and exception_context.execution_context is not None:
+        started = conn.info.get("query_started_at")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine) -> None:
+    """Registra os eventos de instrumentação em um engine síncrono."""
+    if not settings.DB_QUERY_STATS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# --- Orçamento de queries ---
+
+def query_budget(max_queries: int):
+    """
+    Dependência que declara o número máximo de queries de uma rota
+    (incluindo as da autenticação: até 2, com o cache de identidade frio
+    e a sincronização de revogações). Uso:
+
+        @router.get("/board/", dependencies=[Depends(query_budget(4))])
+    """
+    def declare_budget() -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = max_queries
+    return declare_budget
+
+
+def finish_request(stats: QueryStats) -> None:
+    """Analisa as queries de uma requisição concluída."""
+    _increment("requests")
+
+    for normalized, count in stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD):
+        _increment("n_plus_one_flags")
+        logger.warning(
+            "Possível N+1 em %s: %dx [%s] %s",
+            stats.label, count, fingerprint_id(normalized), normalized[:300],
+        )
+
+    if stats.budget is not None and stats.count > stats.budget:
+        _increment("budget_violations")
+        message = (
+            f"{stats.label} executou {stats.count} queries "
+            f"(orçamento: {stats.budget}): {dict(stats.fingerprints)}"
+        )
+        if settings.DB_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceededError(message)
+        logger.warning("Orçamento de queries excedido: %s", message)
+
+
+@contextmanager
+def capture_queries(label: str = "capture") -> Iterator[QueryStats]:
+    """Conta as queries executadas dentro do bloco (útil em testes)."""
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI que abre as estatísticas de cada requisição e, com
+    DB_QUERY_STATS_HEADERS, devolve X-DB-Query-Count e X-DB-Time-Ms.
+    """
+
+    def __init__(self, app, expose_headers: Optional[bool] = None):
+        self.app = app
+        self.expose_headers = settings.DB_QUERY_STATS_HEADERS if expose_headers is None else expose_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message):
+            if self.expose_headers and message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.total_seconds * 1000:.1f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+        finish_request(stats)
@@ -0,0 +1,73 @@
+"""
+Chaves de ordenação fracionárias (rank) para listas ordenadas pelo usuário.
+
+Cada item guarda uma string e a lista é ordenada por ela. Uma chave é
+a parte fracionária de um número em base 36 ("i" = 0.5): entre duas
+chaves sempre existe outra, então mover um item altera só a sua linha,
+sem renumerar os vizinhos.
+
+- O alfabeto (0-9, a-z) ordena igual em qualquer collation do banco.
+- As chaves geradas nunca terminam em "0". Assim nenhuma chave é
+  prefixo "com zeros" da seguinte e sempre há espaço entre duas delas.
+- Inserções repetidas no mesmo ponto alongam as chaves. O rebalanceamento
+  (crud.kanban.rebalance_ranks) as reescreve com tamanho fixo.
+"""
+
+from typing import Optional
+
+ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(ALPHABET)
+_DIGITS = {char: value for value, char in enumerate(ALPHABET)}
+
+
+class InvalidRankError(ValueError):
+    """Chaves vizinhas fora de ordem (o quadro mudou desde a leitura)."""
+
+
+def _digit(key: Optional[str], index: int) -> int:
+    if key is None or index >= len(key):
+        return 0
+    return _DIGITS[key[index]]
+
+
+def is_valid_rank(key: str) -> bool:
+    return bool(key) and key[-1] != "0" and all(char in _DIGITS for char in key)
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Chave estritamente entre `before` e `after`. None é o início
+    (`before`) ou o fim (`after`) da lista.
+
+    No fim da lista (só `before`) usa o dígito seguinte, e no início (só
+    `after`) o anterior, em vez do dígito do meio: acrescentar itens nas
+    pontas alonga as chaves bem mais devagar.
+
+    Raises:
+        InvalidRankError: se `before` não for menor que `after`, ou se
+            `after` só tiver zeros (não existe chave menor).
+    """
+    if before is not None and after is not None and before >= after:
+        raise InvalidRankError(f"Chaves fora de ordem: {before!r} >= {after!r}.")
+    if after is not None and not after.strip("0"):
+        raise InvalidRankError(f"Não existe chave antes de {after!r}.")
+
+    prefix = ""
+    upper_open = after is None
+    index = 0
+    while True:
+        low = _digit(before, index)
+        high = BASE if upper_open else _digit(after, index)
+        if high - low > 1:
+            if after is None and before is not None:
+                digit = low + 1
+            elif before is None and after is not None:
+                digit = high - 1
+            else:
+                digit = (low + high) // 2
+            return prefix + ALPHABET[digit]
+        prefix += ALPHABET[low]
+        if high - low == 1:
+            # Daqui em diante qualquer sufixo fica abaixo de `after`
+            upper_open = True
+        index += 1
@@ -0,0 +1,317 @@
+"""
+Rate limiting por token bucket (por usuário e por IP).
+
+O middleware consome tokens de dois baldes a cada requisição: um por IP
+e, quando há um JWT válido, um por usuário. Rotas caras (bcrypt, IA,
+DataJud, geração de documentos) custam mais tokens.
+
+Backends:
+- "memory": baldes no próprio processo (padrão, um worker).
+- "redis": baldes compartilhados via script Lua atômico, para que o
+  limite valha entre vários workers do uvicorn. Qualquer servidor que
+  fale o protocolo Redis serve (inclusive um stand-in local). O cliente
+  é assíncrono (redis.asyncio), com timeout curto: o Redis lento ou fora
+  do ar não trava o event loop.
+
+Se o backend falhar, a requisição passa sem limite (RATE_LIMIT_FAIL_OPEN,
+padrão) ou recebe 503. O custo de uma rota nunca passa da capacidade do
+balde, senão ela nunca seria permitida.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+# Custo (em tokens) de rotas caras; as demais custam 1
+ROUTE_COSTS: Dict[Tuple[str, str], int] = {
+    ("POST", "/token"): 5,
+    ("POST", "/users/"): 5,
+    ("PATCH", "/users/me/password"): 5,
+    ("POST", "/ai/generate-petition"): 10,
+    ("POST", "/ai/api/v1/jurisprudence/search"): 5,
+    ("POST", "/api/v1/documents/generate"): 5,
+    ("POST", "/api/v1/clients/import"): 10,
+    ("GET", "/api/v1/clients/duplicates"): 5,
+    ("POST", "/processes/updates/bulk"): 10,
+    ("POST", "/processes/sync"): 20,
+}
+
+# Rotas que nunca são limitadas
+EXEMPT_PREFIXES = ("/health", "/static", "/docs", "/redoc", "/openapi.json", "/internal")
+
+
+class RateLimitBackend:
+    """
+    Interface dos backends.
+
+    consume() retira `cost` tokens do balde `key` (capacidade `capacity`,
+    reposição de `refill_per_second`) e retorna
+    (permitido, tokens_restantes, segundos_até_liberar). O middleware
+    chama aconsume(), que backends com E/S sobrescrevem.
+    """
+
+    def consume(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Tuple[bool, float, float]:
+        raise NotImplementedError
+
+    async def aconsume(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Tuple[bool, float, float]:
+        return self.consume(key, cost, capacity, refill_per_second)
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Baldes em memória: O(1) por chave (tokens + timestamp).
+
+    Um balde parado por tempo suficiente para encher de novo é idêntico a
+    um balde novo, então é descartado (evicção por ociosidade). As chaves
+    ficam em ordem de último acesso, então a evicção só olha o início.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Tuple[bool, float, float]:
+        now = self._clock()
+        with self._lock:
+            self._evict_idle(now)
+
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens, last, _ = bucket
+                tokens = min(capacity, tokens + (now - last) * refill_per_second)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+
+            idle_ttl = capacity / refill_per_second if refill_per_second > 0 else math.inf
+            self._buckets[key] = (tokens, now, idle_ttl)
+
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        retry_after = 0.0 if allowed else (cost - tokens) / refill_per_second
+        return allowed, tokens, retry_after
+
+    def _evict_idle(self, now: float) -> None:
+        """Remove os baldes mais antigos que já estariam cheios."""
+        while self._buckets:
+            key, (_, last, idle_ttl) = next(iter(self._buckets.items()))
+            if now - last < idle_ttl:
+                break
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Token bucket atômico no Redis. KEYS[1] = balde;
+# ARGV = capacidade, reposição/s, custo, agora (s), ttl (ms)
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+  tokens = capacity
+else
+  tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+end
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], ARGV[5])
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Baldes compartilhados entre processos via Redis.
+
+    Cada chave é um hash (tokens, ts) com TTL igual ao tempo de reposição
+    completa, então chaves ociosas somem sozinhas.
+    """
+
+    def __init__(self, url: str, prefix: str = "ritum:ratelimit:", client=None, timeout: Optional[float] = None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("A biblioteca 'redis' não está instalada.")
+            timeout = settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS if timeout is None else timeout
+            client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._client = client
+        self._prefix = prefix
+        self._script = client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def aconsume(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Tuple[bool, float, float]:
+        ttl_ms = int(math.ceil(capacity / refill_per_second * 1000)) if refill_per_second > 0 else 86_400_000
+        allowed, tokens = await self._script(
+            keys=[self._prefix + key],
+            args=[capacity, refill_per_second, cost, time.time(), ttl_ms],
+        )
+        tokens = float(tokens)
+        allowed = bool(int(allowed))
+        retry_after = 0.0 if allowed else (cost - tokens) / refill_per_second
+        return allowed, tokens, retry_after
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """Cria o backend configurado em RATE_LIMIT_BACKEND."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL)
+    return InMemoryRateLimitBackend()
+
+
+def route_cost(method: str, path: str) -> int:
+    """Custo em tokens de uma rota."""
+    return ROUTE_COSTS.get((method, path), 1)
+
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI que aplica os limites antes de qualquer trabalho da rota.
+    Responde 429 com Retry-After quando algum dos baldes está vazio, e
+    503 se o backend falhar com fail_open desligado.
+    """
+
+    def __init__(
+        self,
+        app,
+        backend: Optional[RateLimitBackend] = None,
+        per_minute: Optional[int] = None,
+        ip_per_minute: Optional[int] = None,
+        proxy_hops: Optional[int] = None,
+        fail_open: Optional[bool] = None,
+    ):
+        self.app = app
+        # `is None`: um InMemoryRateLimitBackend vazio é falso (__len__ == 0)
+        self.backend = backend if backend is not None else get_rate_limit_backend()
+        self.per_minute = per_minute or settings.RATE_LIMIT_PER_MINUTE
+        self.ip_per_minute = ip_per_minute or settings.RATE_LIMIT_IP_PER_MINUTE
+        self.proxy_hops = settings.RATE_LIMIT_PROXY_HOPS if proxy_hops is None else proxy_hops
+        self.fail_open = settings.RATE_LIMIT_FAIL_OPEN if fail_open is None else fail_open
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES) or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        headers = _headers(scope)
+        cost = route_cost(scope["method"], scope["path"])
+        checks = [(f"ip:{self._client_ip(scope, headers)}", self.ip_per_minute)]
+        subject = _token_subject(headers.get("authorization"))
+        if subject:
+            checks.append((f"user:{subject}", self.per_minute))
+
+        remaining = None
+        for key, per_minute in checks:
+            try:
+                # Custo acima da capacidade nunca seria permitido: vale o balde cheio
+                allowed, tokens, retry_after = await self.backend.aconsume(
+                    key, min(cost, per_minute), per_minute, per_minute / 60
+                )
+            except Exception:
+                logger.warning("Backend de rate limiting indisponível.", exc_info=True)
+                if self.fail_open:
+                    await self.app(scope, receive, send)
+                else:
+                    await _send_error(send, 503, "Serviço temporariamente indisponível.")
+                return
+            if not allowed:
+                await _send_too_many_requests(send, per_minute, retry_after)
+                return
+            remaining = tokens if remaining is None else min(remaining, tokens)
+
+        limit = min(per_minute for _, per_minute in checks)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-ratelimit-limit", str(limit).encode()),
+                    (b"x-ratelimit-remaining", str(int(remaining)).encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    def _client_ip(self, scope, headers: Dict[str, str]) -> str:
+        """
+        IP do cliente. Atrás de proxies (Render), usa a entrada do
+        X-Forwarded-For adicionada pelo proxy mais próximo — as anteriores
+        podem ter sido forjadas pelo cliente.
+        """
+        forwarded = headers.get("x-forwarded-for")
+        if self.proxy_hops > 0 and forwarded:
+            hops = [part.strip() for part in forwarded.split(",") if part.strip()]
+            if hops:
+                return hops[-min(self.proxy_hops, len(hops))]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+
+def _headers(scope) -> Dict[str, str]:
+    return {name.decode("latin-1"): value.decode("latin-1") for name, value in scope.get("headers", [])}
+
+
+def _token_subject(authorization: Optional[str]) -> Optional[str]:
+    """Extrai o `sub` de um Bearer token válido, sem acessar o banco."""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    try:
+        payload = jwt.decode(
+            authorization.split(" ", 1)[1],
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+        )
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+async def _send_error(send, status: int, detail: str, headers=()) -> None:
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_too_many_requests(send, limit: int, retry_after: float) -> None:
+    await _send_error(send, 429, "Muitas requisições. Tente novamente em instantes.", [
+        (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        (b"x-ratelimit-limit", str(limit).encode()),
+        (b"x-ratelimit-remaining", b"0"),
+    ])
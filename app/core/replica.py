@@ -0,0 +1,145 @@
+"""
+Roteamento de leituras para a réplica do banco.
+
+Rotas somente-leitura usam a réplica (DATABASE_REPLICA_URL) enquanto:
+- o atraso de replicação medido estiver abaixo de DB_REPLICA_MAX_LAG_SECONDS
+  (a medição é cacheada por DB_REPLICA_LAG_CHECK_SECONDS); e
+- o usuário não tiver feito uma escrita há menos desse mesmo intervalo
+  (leia-suas-escritas). A marcação é por processo: com vários workers,
+  o limite de atraso continua sendo a garantia.
+
+Escritas, e a resposta das próprias rotas de escrita, usam sempre o primário.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Atraso de replicação em segundos (0 quando a réplica já aplicou todo o WAL recebido)
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """Decide, por requisição, se uma leitura pode ir para a réplica."""
+
+    def __init__(
+        self,
+        max_lag_seconds: float,
+        check_interval: float,
+        max_tracked_writers: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.max_tracked_writers = max_tracked_writers
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._lag: Optional[float] = None
+        self._checked_at = -float("inf")
+        self._recent_writers: "OrderedDict[Hashable, float]" = OrderedDict()
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+        self.lag_check_errors = 0
+
+    # --- Atraso de replicação ---
+
+    def _lag_is_stale(self) -> bool:
+        """True se a medição expirou; marca a renovação para evitar rajadas."""
+        now = self._clock()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+            return True
+
+    def record_lag(self, connection) -> None:
+        """Mede o atraso em uma conexão da réplica (síncrona)."""
+        try:
+            lag = float(connection.execute(REPLICA_LAG_QUERY).scalar() or 0)
+        except Exception:
+            logger.warning("Falha ao medir o atraso da réplica; usando o primário.", exc_info=True)
+            self.lag_check_errors += 1
+            lag = None
+        with self._lock:
+            self._lag = lag
+
+    def replica_is_fresh(self, engine) -> bool:
+        """Verifica o atraso usando um engine síncrono."""
+        if self._lag_is_stale():
+            try:
+                with engine.connect() as connection:
+                    self.record_lag(connection)
+            except Exception:
+                logger.warning("Réplica indisponível; usando o primário.", exc_info=True)
+                self.lag_check_errors += 1
+                self._lag = None
+        return self._lag is not None and self._lag <= self.max_lag_seconds
+
+    async def replica_is_fresh_async(self, engine) -> bool:
+        """Verifica o atraso usando um AsyncEngine."""
+        if self._lag_is_stale():
+            try:
+                async with engine.connect() as connection:
+                    await connection.run_sync(self.record_lag)
+            except Exception:
+                logger.warning("Réplica indisponível; usando o primário.", exc_info=True)
+                self.lag_check_errors += 1
+                self._lag = None
+        return self._lag is not None and self._lag <= self.max_lag_seconds
+
+    # --- Leia-suas-escritas ---
+
+    def note_write(self, user_id: Hashable) -> None:
+        """Registra que o usuário iniciou uma escrita agora."""
+        with self._lock:
+            self._recent_writers.pop(user_id, None)
+            self._recent_writers[user_id] = self._clock()
+            while len(self._recent_writers) > self.max_tracked_writers:
+                self._recent_writers.popitem(last=False)
+
+    def recently_wrote(self, user_id: Hashable) -> bool:
+        """True se o usuário escreveu dentro da janela de atraso tolerado."""
+        now = self._clock()
+        with self._lock:
+            # Entradas em ordem de escrita: as antigas saem pelo início
+            while self._recent_writers:
+                oldest, written_at = next(iter(self._recent_writers.items()))
+                if now - written_at < self.max_lag_seconds:
+                    break
+                del self._recent_writers[oldest]
+            return user_id in self._recent_writers
+
+    # --- Decisão ---
+
+    def record_decision(self, use_replica: bool) -> bool:
+        """Contabiliza a decisão tomada e a retorna."""
+        if use_replica:
+            self.replica_reads += 1
+        else:
+            self.primary_fallbacks += 1
+        return use_replica
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores para monitoramento."""
+        return {
+            "lag_seconds": self._lag,
+            "max_lag_seconds": self.max_lag_seconds,
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+            "lag_check_errors": self.lag_check_errors,
+            "tracked_writers": len(self._recent_writers),
+        }
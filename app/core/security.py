@@ -2,25 +2,73 @@
 Módulo de segurança - Autenticação, criptografia e JWT.
 """
 
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import bcrypt
 from jose import JWTError, jwt
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 
 from app.core.config import settings
 
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:
+    PasswordHasher = None
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """Lançada quando a fila de hashing de senhas está cheia."""
+
+
+# Executor dedicado ao bcrypt: isola o custo de CPU do login do
+# threadpool compartilhado do anyio usado pelos endpoints síncronos.
+# Criado no primeiro uso e recriado após shutdown_password_executor
+# (um novo lifespan no mesmo processo, como nos testes).
+_password_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending_lock = threading.Lock()
+_pending_tasks = 0
+_rejected_tasks = 0
+
+
+# Algoritmo e custo ficam codificados no próprio hash (formato "modular
+# crypt": "$2b$12$..." para bcrypt, "$argon2id$v=19$m=...,t=...,p=...$..."
+# para argon2id), então cada hash no banco carrega seus parâmetros.
+_argon2_hasher = (
+    PasswordHasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    )
+    if PasswordHasher
+    else None
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verifica uma senha em texto plano contra um hash bcrypt.
+    Verifica uma senha em texto plano contra um hash bcrypt ou argon2id.
     
     Args:
         plain_password: Senha em texto plano
-        hashed_password: Hash bcrypt da senha
+        hashed_password: Hash armazenado (o algoritmo é detectado pelo prefixo)
         
     Returns:
         True se a senha corresponder ao hash, False caso contrário
     """
+    if hashed_password.startswith("$argon2"):
+        if _argon2_hasher is None:
+            raise RuntimeError("A biblioteca 'argon2-cffi' não está instalada.")
+        try:
+            return _argon2_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+
     return bcrypt.checkpw(
         plain_password.encode('utf-8'),
         hashed_password.encode('utf-8')
@@ -29,21 +77,157 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """
-    Gera o hash de uma senha usando bcrypt com 12 rounds.
+    Gera o hash de uma senha com o algoritmo e custo configurados
+    (PASSWORD_HASH_ALGORITHM / PASSWORD_BCRYPT_ROUNDS).
     
     Args:
         password: Senha em texto plano
         
     Returns:
-        Hash bcrypt da senha
+        Hash da senha (com algoritmo e custo embutidos)
     """
+    if settings.PASSWORD_HASH_ALGORITHM == "argon2id":
+        if _argon2_hasher is None:
+            raise RuntimeError("A biblioteca 'argon2-cffi' não está instalada.")
+        return _argon2_hasher.hash(password)
+
     hashed_bytes = bcrypt.hashpw(
         password.encode('utf-8'),
-        bcrypt.gensalt(rounds=12)  # Explícito: 12 rounds
+        bcrypt.gensalt(rounds=settings.PASSWORD_BCRYPT_ROUNDS)
     )
     return hashed_bytes.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Indica se um hash foi gerado com algoritmo ou custo diferentes dos
+    configurados atualmente (usado para rehash transparente no login).
+    """
+    if settings.PASSWORD_HASH_ALGORITHM == "argon2id":
+        if _argon2_hasher is None:
+            return False
+        if not hashed_password.startswith("$argon2id$"):
+            return True
+        return _argon2_hasher.check_needs_rehash(hashed_password)
+
+    # bcrypt: "$2b$<custo>$<salt+hash>"
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[1].startswith("2"):
+        return True
+    try:
+        return int(parts[2]) != settings.PASSWORD_BCRYPT_ROUNDS
+    except ValueError:
+        return True
+
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = 10, max_rounds: int = 16) -> Dict[str, float]:
+    """
+    Escolhe o maior custo bcrypt cuja verificação fica abaixo de `target_ms`
+    nesta máquina. Cada round a mais dobra o tempo: o custo mínimo é
+    medido e extrapolado para estimar o candidato, que é então medido;
+    se a medição passar do alvo, desce um round e mede de novo.
+
+    Returns:
+        {"rounds": custo escolhido, "measured_ms": tempo medido desse custo}
+    """
+    def measure(rounds: int, samples: int = 3) -> float:
+        hashed = bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+        started = time.perf_counter()
+        for _ in range(samples):
+            bcrypt.checkpw(b"calibration-password", hashed)
+        return (time.perf_counter() - started) / samples * 1000
+
+    base_ms = measure(min_rounds)
+    rounds = min_rounds
+    while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+        rounds += 1
+
+    measured_ms = base_ms if rounds == min_rounds else measure(rounds)
+    while measured_ms > target_ms and rounds > min_rounds:
+        rounds -= 1
+        measured_ms = base_ms if rounds == min_rounds else measure(rounds)
+
+    return {"rounds": rounds, "measured_ms": round(measured_ms, 1)}
+
+
+def _get_password_executor() -> ThreadPoolExecutor:
+    global _password_executor
+    with _executor_lock:
+        if _password_executor is None:
+            _password_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+        return _password_executor
+
+
+async def _run_password_task(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Executa uma operação de bcrypt no executor dedicado.
+
+    A operação sai da contagem quando o job do executor termina (ou é
+    cancelado antes de começar), e não quando quem aguarda desiste: um
+    cliente que desconecta não libera vaga para um job ainda na fila.
+
+    Raises:
+        PasswordHasherBusyError: se já houver PASSWORD_HASH_MAX_QUEUE
+            operações em execução ou aguardando.
+    """
+    global _pending_tasks, _rejected_tasks
+    with _pending_lock:
+        if _pending_tasks >= settings.PASSWORD_HASH_MAX_QUEUE:
+            _rejected_tasks += 1
+            raise PasswordHasherBusyError("Fila de verificação de senhas cheia.")
+        _pending_tasks += 1
+
+    try:
+        future = _get_password_executor().submit(func, *args)
+    except BaseException:
+        _task_done(None)
+        raise
+    future.add_done_callback(_task_done)
+    return await asyncio.wrap_future(future)
+
+
+def _task_done(_future) -> None:
+    global _pending_tasks
+    with _pending_lock:
+        _pending_tasks -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Versão assíncrona de verify_password, executada no executor dedicado."""
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Versão assíncrona de get_password_hash, executada no executor dedicado."""
+    return await _run_password_task(get_password_hash, password)
+
+
+def password_executor_stats() -> Dict[str, int]:
+    """Retorna a ocupação do executor de hashing para monitoramento."""
+    with _pending_lock:
+        return {
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+            "pending": _pending_tasks,
+            "rejected": _rejected_tasks,
+        }
+
+
+def shutdown_password_executor() -> None:
+    """
+    Encerra o executor de hashing (chamado no shutdown da aplicação).
+    O próximo uso cria um executor novo.
+    """
+    global _password_executor
+    with _executor_lock:
+        executor, _password_executor = _password_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def create_access_token(data: Dict[str, Any]) -> str:
     """
     Cria um JWT access token com tempo de expiração curto.
@@ -75,14 +259,18 @@ def create_access_token(data: Dict[str, Any]) -> str:
 def create_refresh_token(data: Dict[str, Any]) -> str:
     """
     Cria um JWT refresh token com tempo de expiração longo.
+    Cada token recebe um `jti` único e pertence a uma família (`fam`),
+    preservada nas rotações para permitir revogar a cadeia inteira.
     
     Args:
-        data: Dados a serem incluídos no token (ex: {"sub": "email@example.com"})
+        data: Dados a serem incluídos no token (ex: {"sub": "email@example.com", "fam": "..."})
         
     Returns:
         Refresh token JWT codificado
     """
     to_encode = data.copy()
+    to_encode.setdefault("fam", uuid.uuid4().hex)
+    to_encode["jti"] = uuid.uuid4().hex
     expire = datetime.now(timezone.utc) + timedelta(
         days=settings.REFRESH_TOKEN_EXPIRE_DAYS
     )
@@ -149,4 +337,16 @@ def decode_refresh_token(token: str) -> Optional[Dict[str, Any]]:
             
         return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.core.security <latência alvo em ms>
+    import sys
+
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else 250.0
+    result = calibrate_bcrypt_rounds(target)
+    print(
+        f"Alvo: {target:.0f} ms -> PASSWORD_BCRYPT_ROUNDS={result['rounds']} "
+        f"(verificação medida: {result['measured_ms']} ms)"
+    )
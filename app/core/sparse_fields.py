@@ -0,0 +1,91 @@
+"""
+Campos esparsos nas listagens (`?fields=fullName,cpf`).
+
+Os campos pedidos (nomes da API ou dos atributos) são levados até o SQL
+com `load_only` (colunas não pedidas, como JSONB de endereço ou dados do
+caso, não são lidas) e `noload` (relacionamentos não pedidos não são
+consultados). A resposta é serializada com um schema parcial contendo
+apenas esses campos. Sem `fields`, as rotas se comportam como antes.
+"""
+
+from functools import lru_cache
+from typing import Any, FrozenSet, Iterable, List, Optional, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, create_model
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import load_only, noload
+
+# Sempre incluídos, para que o cliente consiga identificar os itens
+ALWAYS_INCLUDED = ("id",)
+
+
+class InvalidFieldsError(ValueError):
+    """Campo pedido em `fields` não existe no schema da resposta."""
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """
+    Converte o parâmetro `fields` ("fullName,cpf") nos nomes dos
+    atributos do schema. None quando o parâmetro não foi informado.
+
+    Raises:
+        InvalidFieldsError: campo inexistente no schema.
+    """
+    if fields is None:
+        return None
+
+    names = {}
+    for name, info in schema.model_fields.items():
+        names[name] = name
+        if info.alias:
+            names[info.alias] = name
+
+    selected = {name for name in ALWAYS_INCLUDED if name in schema.model_fields}
+    for field in fields.split(","):
+        field = field.strip()
+        if not field:
+            continue
+        if field not in names:
+            raise InvalidFieldsError(f"Campo inválido em fields: {field}")
+        selected.add(names[field])
+    return frozenset(selected)
+
+
+def load_options(model, selected: Iterable[str], extra_columns: Iterable[Any] = ()) -> List[Any]:
+    """
+    Opções de carregamento do ORM para os campos selecionados.
+
+    Args:
+        extra_columns: colunas necessárias além das pedidas (ex: as da
+            ordenação, lidas para montar o cursor).
+    """
+    selected = set(selected)
+    mapper = sa_inspect(model)
+    columns = [attr.class_attribute for attr in mapper.column_attrs if attr.key in selected]
+    # raiseload: ler uma coluna não carregada é erro, e não uma query extra por linha
+    options = [load_only(*columns, *extra_columns, raiseload=True)]
+    options += [noload(rel.class_attribute) for rel in mapper.relationships if rel.key not in selected]
+    return options
+
+
+@lru_cache(maxsize=256)
+def partial_schema(schema: Type[BaseModel], selected: FrozenSet[str]) -> Type[BaseModel]:
+    """Schema com apenas os campos selecionados (mesmos tipos, aliases e config)."""
+    fields = {
+        name: (info.annotation, info)
+        for name, info in schema.model_fields.items()
+        if name in selected
+    }
+    return create_model(f"{schema.__name__}Fields", __config__=schema.model_config, **fields)
+
+
+def sparse_response(items: Iterable[Any], schema: Type[BaseModel], selected: FrozenSet[str], response=None) -> JSONResponse:
+    """
+    Serializa objetos do ORM apenas com os campos selecionados,
+    preservando os cabeçalhos já definidos na resposta da rota.
+    """
+    model = partial_schema(schema, selected)
+    content = [model.model_validate(item).model_dump(mode="json", by_alias=True) for item in items]
+    headers = dict(response.headers) if response is not None else None
+    return JSONResponse(content=content, headers=headers)
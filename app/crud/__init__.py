@@ -6,12 +6,23 @@ from app.crud.user import (
     get_user_by_email,
     get_user_by_id,
     create_user,
+    create_user_async,
     authenticate_user,
+    authenticate_user_async,
     update_user_profile,
     update_user_password,
+    update_user_password_async,
+    delete_user,
 )
 from app.crud.client import (
     get_user_clients,
+    get_user_clients_page,
+    get_user_clients_version,
+    search_user_clients,
+    user_clients_export_query,
+    get_user_client_identities,
+    get_user_clients_by_ids,
+    upsert_user_clients,
     get_client_by_id,
     create_user_client,
     update_client,
@@ -19,7 +30,10 @@ from app.crud.client import (
 )
 from app.crud.process import (
     get_user_processes,
+    get_user_processes_page,
     create_user_process,
+    get_user_process_watermarks,
+    ingest_user_process_updates,
 )
 from app.crud.kanban import (
     get_board_for_user,
@@ -30,31 +44,53 @@ from app.crud.kanban import (
     update_task_card,
     delete_task_card,
     move_task_card,
+    reorder_board,
+    rebalance_ranks,
 )
 from app.crud.extrajudicial import (
     create_extrajudicial_case,
+    get_user_cases_page,
     get_extrajudicial_case,
     update_extrajudicial_case,
     get_intimations_stats,
 )
+from app.crud.dashboard import (
+    get_dashboard_counters,
+    reconcile_dashboard_counters,
+)
+from app.crud import aio
 
 __all__ = [
     # User
     "get_user_by_email",
     "get_user_by_id",
     "create_user",
+    "create_user_async",
     "authenticate_user",
+    "authenticate_user_async",
     "update_user_profile",
     "update_user_password",
+    "update_user_password_async",
+    "delete_user",
     # Client
     "get_user_clients",
+    "get_user_clients_page",
+    "get_user_clients_version",
+    "search_user_clients",
+    "user_clients_export_query",
+    "get_user_client_identities",
+    "get_user_clients_by_ids",
+    "upsert_user_clients",
     "get_client_by_id",
     "create_user_client",
     "update_client",
     "delete_client",
     # Process
     "get_user_processes",
+    "get_user_processes_page",
     "create_user_process",
+    "get_user_process_watermarks",
+    "ingest_user_process_updates",
     # Kanban
     "get_board_for_user",
     "create_task_column",
@@ -64,9 +100,15 @@ __all__ = [
     "update_task_card",
     "delete_task_card",
     "move_task_card",
+    "reorder_board",
+    "rebalance_ranks",
     # Extrajudicial
     "create_extrajudicial_case",
+    "get_user_cases_page",
     "get_extrajudicial_case",
     "update_extrajudicial_case",
     "get_intimations_stats",
+    # Dashboard
+    "get_dashboard_counters",
+    "reconcile_dashboard_counters",
 ]
\ No newline at end of file
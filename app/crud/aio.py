@@ -0,0 +1,70 @@
+"""
+Versões assíncronas das funções de CRUD.
+
+Cada função recebe a sessão da requisição (Session ou AsyncSession) e
+executa a implementação síncrona correspondente via `run_db`: no modo
+assíncrono sobre o driver asyncpg, no modo síncrono no threadpool.
+Assim as regras de negócio continuam em um único lugar.
+"""
+
+import functools
+from typing import Any, Callable
+
+from app.crud import client, dashboard, extrajudicial, kanban, process, user
+from app.database import run_db
+
+
+def _async_version(func: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(func)
+    async def wrapper(db, *args: Any, **kwargs: Any) -> Any:
+        return await run_db(db, func, *args, **kwargs)
+    return wrapper
+
+
+# User
+get_user_by_email = _async_version(user.get_user_by_email)
+get_user_by_id = _async_version(user.get_user_by_id)
+update_user_profile = _async_version(user.update_user_profile)
+delete_user = _async_version(user.delete_user)
+
+# Client
+get_user_clients = _async_version(client.get_user_clients)
+get_user_clients_page = _async_version(client.get_user_clients_page)
+get_user_clients_version = _async_version(client.get_user_clients_version)
+search_user_clients = _async_version(client.search_user_clients)
+get_user_client_identities = _async_version(client.get_user_client_identities)
+get_user_clients_by_ids = _async_version(client.get_user_clients_by_ids)
+upsert_user_clients = _async_version(client.upsert_user_clients)
+get_client_by_id = _async_version(client.get_client_by_id)
+create_user_client = _async_version(client.create_user_client)
+update_client = _async_version(client.update_client)
+delete_client = _async_version(client.delete_client)
+
+# Process
+get_user_processes = _async_version(process.get_user_processes)
+get_user_processes_page = _async_version(process.get_user_processes_page)
+create_user_process = _async_version(process.create_user_process)
+get_user_process_watermarks = _async_version(process.get_user_process_watermarks)
+ingest_user_process_updates = _async_version(process.ingest_user_process_updates)
+
+# Kanban
+get_board_for_user = _async_version(kanban.get_board_for_user)
+create_task_column = _async_version(kanban.create_task_column)
+update_task_column = _async_version(kanban.update_task_column)
+delete_task_column = _async_version(kanban.delete_task_column)
+create_task_card = _async_version(kanban.create_task_card)
+update_task_card = _async_version(kanban.update_task_card)
+delete_task_card = _async_version(kanban.delete_task_card)
+move_task_card = _async_version(kanban.move_task_card)
+reorder_board = _async_version(kanban.reorder_board)
+
+# Extrajudicial
+create_extrajudicial_case = _async_version(extrajudicial.create_extrajudicial_case)
+get_user_cases_page = _async_version(extrajudicial.get_user_cases_page)
+get_extrajudicial_case = _async_version(extrajudicial.get_extrajudicial_case)
+update_extrajudicial_case = _async_version(extrajudicial.update_extrajudicial_case)
+get_intimations_stats = _async_version(extrajudicial.get_intimations_stats)
+
+# Dashboard
+get_dashboard_counters = _async_version(dashboard.get_dashboard_counters)
+reconcile_dashboard_counters = _async_version(dashboard.reconcile_dashboard_counters)
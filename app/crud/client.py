@@ -2,18 +2,174 @@
 CRUD de clientes.
 """
 
+import re
+
+from sqlalchemy import case, delete, func, insert, literal_column, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from uuid import UUID
-from typing import List, Optional
+from typing import FrozenSet, List, Optional, Sequence
 from datetime import datetime
 
+from app.core.pagination import Page, keyset_paginate
+from app.core.sparse_fields import load_options
 from app.models import Client
 from app.schemas import ClientCreate, ClientUpdate
 
 
-def get_user_clients(db: Session, user_id: UUID, skip: int = 0, limit: int = 100) -> List[Client]:
-    """Lista os clientes de um usuário."""
-    return db.query(Client).filter(Client.owner_id == user_id).offset(skip).limit(limit).all()
+def get_user_clients(
+    db: Session,
+    user_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[FrozenSet[str]] = None,
+) -> List[Client]:
+    """Lista os clientes de um usuário (só os campos `fields`, se informados)."""
+    query = db.query(Client).filter(Client.owner_id == user_id)
+    if fields is not None:
+        query = query.options(*load_options(Client, fields))
+    return (
+        query
+        .order_by(Client.created_at, Client.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+# Ordenações da listagem (a última coluna desempata)
+CLIENT_SORT_OPTIONS = {
+    "created_at": (Client.created_at, Client.id),
+    "full_name": (Client.full_name_sort, Client.id),
+}
+
+
+def get_user_clients_page(
+    db: Session,
+    user_id: UUID,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    fields: Optional[FrozenSet[str]] = None,
+) -> Page[Client]:
+    """
+    Lista os clientes de um usuário com paginação por cursor.
+    Usa os índices (owner_id, created_at, id) / (owner_id, coalesce(full_name, ''), id).
+    Com `fields`, só as colunas pedidas (e as da ordenação) são lidas.
+    """
+    query = db.query(Client).filter(Client.owner_id == user_id)
+    if fields is not None:
+        query = query.options(*load_options(Client, fields, CLIENT_SORT_OPTIONS.get(sort.lstrip("-"), ())))
+    return keyset_paginate(query, sort, CLIENT_SORT_OPTIONS, limit=limit, cursor=cursor)
+
+
+def get_user_clients_version(db: Session, user_id: UUID) -> tuple:
+    """
+    Versão barata da lista de clientes do usuário (quantidade e última
+    alteração), usada como ETag: muda a cada inclusão, alteração ou exclusão.
+    """
+    return tuple(
+        db.execute(
+            select(func.count(Client.id), func.max(Client.updated_at)).where(Client.owner_id == user_id)
+        ).one()
+    )
+
+
+def _digits(column):
+    # Literais (e não parâmetros) para casar com a expressão dos índices
+    return func.regexp_replace(column, literal_column("'[^0-9]'"), literal_column("''"), literal_column("'g'"))
+
+
+def _digits_fallback(column):
+    # Sem regexp_replace (SQLite): remove a pontuação usual de CPF e telefone
+    for char in ".-/() +":
+        column = func.replace(column, char, "")
+    return column
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_user_clients(db: Session, user_id: UUID, q: str, limit: int = 10) -> List[Client]:
+    """
+    Busca de clientes por nome, CPF, email ou telefone (typeahead).
+
+    No PostgreSQL usa os índices GIN de trigramas (pg_trgm) sobre
+    f_unaccent(lower(full_name)), lower(email) e os dígitos de CPF e
+    telefone, ordenando por similaridade. Ignora acentos e caixa e
+    tolera erros de digitação no nome.
+    """
+    q = q.strip()
+    digits = re.sub(r"\D", "", q)
+    query = db.query(Client).filter(Client.owner_id == user_id)
+
+    if db.get_bind().dialect.name != "postgresql":
+        # Fallback sem pg_trgm (ex: testes com SQLite)
+        pattern = f"%{_like_escape(q)}%"
+        conditions = [Client.full_name.ilike(pattern, escape="\\"), Client.email.ilike(pattern, escape="\\")]
+        conditions += [Client.cpf.contains(q, autoescape=True), Client.phone.contains(q, autoescape=True)]
+        if len(digits) >= 3:
+            conditions += [_digits_fallback(Client.cpf).contains(digits), _digits_fallback(Client.phone).contains(digits)]
+        return query.filter(or_(*conditions)).order_by(Client.full_name).limit(limit).all()
+
+    name_key = func.f_unaccent(func.lower(Client.full_name))
+    email_key = func.lower(Client.email)
+    q_key = func.f_unaccent(func.lower(q))
+    pattern = "%" + _like_escape(q.lower()) + "%"
+
+    conditions = [
+        q_key.op("<%")(name_key),  # similaridade por palavra (erros de digitação)
+        name_key.like(func.f_unaccent(pattern)),
+        email_key.like(pattern),
+    ]
+    scores = [func.word_similarity(q_key, name_key), func.similarity(email_key, q.lower())]
+    if len(digits) >= 3:
+        digits_pattern = f"%{digits}%"
+        digits_match = or_(_digits(Client.cpf).like(digits_pattern), _digits(Client.phone).like(digits_pattern))
+        conditions.append(digits_match)
+        scores.append(case((digits_match, 1.0), else_=0.0))
+
+    rank = func.greatest(*scores)
+    return (
+        query.filter(or_(*conditions))
+        .order_by(rank.desc(), Client.full_name, Client.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def user_clients_export_query(user_id: UUID):
+    """
+    SELECT (Core, sem entidades do ORM) das colunas exportadas dos
+    clientes de um usuário, na ordem de criação.
+    """
+    columns = [column for column in Client.__table__.c if column.key != "owner_id"]
+    return (
+        select(*columns)
+        .where(Client.owner_id == user_id)
+        .order_by(Client.created_at, Client.id)
+    )
+
+
+def get_user_client_identities(db: Session, user_id: UUID) -> list:
+    """
+    Campos de identificação (id, nome, CPF, email, telefone) de todos os
+    clientes do usuário, como tuplas (sem entidades do ORM).
+    """
+    return db.execute(
+        select(Client.id, Client.full_name, Client.cpf, Client.email, Client.phone)
+        .where(Client.owner_id == user_id)
+    ).all()
+
+
+def get_user_clients_by_ids(db: Session, user_id: UUID, client_ids: Sequence[UUID]) -> List[Client]:
+    """Busca vários clientes do usuário por ID, em uma query."""
+    if not client_ids:
+        return []
+    return db.scalars(
+        select(Client).where(Client.owner_id == user_id, Client.id.in_(client_ids))
+    ).all()
 
 
 def get_client_by_id(db: Session, client_id: UUID, user_id: UUID) -> Optional[Client]:
@@ -25,42 +181,98 @@ def get_client_by_id(db: Session, client_id: UUID, user_id: UUID) -> Optional[Cl
 
 
 def create_user_client(db: Session, client: ClientCreate, user_id: UUID) -> Client:
-    """Cria um novo cliente."""
+    """Cria um novo cliente (INSERT ... RETURNING, sem refresh)."""
     client_data = client.model_dump(exclude_unset=True)
-    db_client = Client(**client_data, owner_id=user_id)
-    db.add(db_client)
+    db_client = db.scalars(
+        insert(Client).values(**client_data, owner_id=user_id).returning(Client)
+    ).one()
     db.commit()
-    db.refresh(db_client)
     return db_client
 
 
 def update_client(db: Session, client_id: UUID, client_update: ClientUpdate, user_id: UUID) -> Optional[Client]:
-    """Atualiza um cliente."""
-    db_client = get_client_by_id(db, client_id=client_id, user_id=user_id)
+    """
+    Atualiza um cliente em um único statement
+    (UPDATE ... WHERE owner ... RETURNING).
+    """
+    update_data = client_update.model_dump(exclude_unset=True, by_alias=False)
+    update_data["updated_at"] = datetime.utcnow()
+
+    db_client = db.scalars(
+        update(Client)
+        .where(Client.id == client_id, Client.owner_id == user_id)
+        .values(**update_data)
+        .returning(Client)
+    ).one_or_none()
     if not db_client:
         return None
-    
-    update_data = client_update.model_dump(exclude_unset=True, by_alias=False)
-    
-    # Handle address separately (JSONB field)
-    if 'address' in update_data and update_data['address'] is not None:
-        db_client.address = update_data.pop('address')
-    
-    for key, value in update_data.items():
-        setattr(db_client, key, value)
-    
-    db_client.updated_at = datetime.utcnow()
+
     db.commit()
-    db.refresh(db_client)
     return db_client
 
 
 def delete_client(db: Session, client_id: UUID, user_id: UUID) -> Optional[Client]:
     """Deleta um cliente."""
-    db_client = get_client_by_id(db, client_id=client_id, user_id=user_id)
+    db_client = db.scalars(
+        delete(Client)
+        .where(Client.id == client_id, Client.owner_id == user_id)
+        .returning(Client)
+    ).one_or_none()
     if not db_client:
         return None
-    
-    db.delete(db_client)
+
     db.commit()
-    return db_client
\ No newline at end of file
+    return db_client
+
+
+# Colunas atualizadas quando a importação encontra um CPF já cadastrado
+IMPORT_UPDATABLE_COLUMNS = (
+    "full_name", "email", "phone", "rg", "nationality", "marital_status", "profession", "address",
+)
+
+
+def upsert_user_clients(db: Session, clients: Sequence[ClientCreate], user_id: UUID) -> List[Optional[bool]]:
+    """
+    Insere vários clientes em um único INSERT ... ON CONFLICT (cpf)
+    DO UPDATE e faz commit.
+
+    Um CPF já cadastrado pelo mesmo usuário tem os campos preenchidos
+    atualizados (campos vazios no arquivo não apagam os existentes). Os
+    CPFs da lista devem ser distintos.
+
+    Returns:
+        Para cada cliente, na ordem recebida: True (criado), False
+        (atualizado) ou None (CPF pertence a outro usuário).
+    """
+    if not clients:
+        return []
+
+    dialect = db.get_bind().dialect.name
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}[dialect]
+
+    rows = [{**client.model_dump(), "owner_id": user_id} for client in clients]
+    stmt = dialect_insert(Client).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Client.cpf],
+        set_={
+            **{
+                column: func.coalesce(stmt.excluded[column], Client.__table__.c[column])
+                for column in IMPORT_UPDATABLE_COLUMNS
+            },
+            "updated_at": datetime.utcnow(),
+        },
+        where=Client.owner_id == user_id,
+    )
+
+    cpfs = [client.cpf for client in clients if client.cpf]
+    if dialect == "postgresql":
+        # xmax = 0 identifica as linhas inseridas (e não atualizadas) pelo statement
+        returned = db.execute(stmt.returning(Client.cpf, literal_column("xmax = 0"))).all()
+        statuses = {cpf: bool(inserted) for cpf, inserted in returned}
+    else:
+        existing = set(db.scalars(select(Client.cpf).where(Client.cpf.in_(cpfs)))) if cpfs else set()
+        returned = db.execute(stmt.returning(Client.cpf)).scalars().all()
+        statuses = {cpf: cpf not in existing for cpf in returned}
+    db.commit()
+
+    return [True if not client.cpf else statuses.get(client.cpf) for client in clients]
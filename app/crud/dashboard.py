@@ -0,0 +1,206 @@
+"""
+CRUD dos contadores do painel inicial (dashboard).
+
+Cada indicador do painel é guardado em dashboard_counters como
+(user_id, metric, bucket) -> count:
+
+- process_status: processos por status (bucket = status);
+- open_cases: casos extrajudiciais em aberto (bucket vazio);
+- cards_due: cartões do Kanban por dia de vencimento (bucket = AAAA-MM-DD);
+- intimations: intimações por dia de publicação (bucket = AAAA-MM-DD).
+
+No PostgreSQL, triggers nas tabelas de origem ajustam os contadores a
+cada escrita (migração e0a1c52f7b93) e a leitura é um único acesso pela
+chave primária. Os contadores por dia só são mantidos a partir de
+alguns dias antes de hoje (*_LOOKBACK_DAYS): as janelas do painel nunca
+voltam mais que isso. `reconcile_dashboard_counters` recalcula os
+contadores a partir das tabelas de origem e corrige divergências.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import String, and_, bindparam, cast, delete, func, literal, or_, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.normalization import utc_now
+from app.models import DashboardCounter, ExtrajudicialCase, Intimation, Process, TaskCard, TaskColumn
+
+METRIC_PROCESS_STATUS = "process_status"
+METRIC_OPEN_CASES = "open_cases"
+METRIC_CARDS_DUE = "cards_due"
+METRIC_INTIMATIONS = "intimations"
+
+# Status de casos extrajudiciais encerrados (os demais, e NULL, estão em
+# aberto). A função do trigger na migração e0a1c52f7b93 usa a mesma lista.
+CLOSED_CASE_STATUSES = ("Completed", "Concluído", "Finalizado", "Cancelado", "Arquivado")
+
+# Dias antes de hoje mantidos nos contadores por dia (semana atual e
+# últimos 30 dias, com folga); também usados pelos triggers
+CARD_DUE_LOOKBACK_DAYS = 7
+INTIMATION_LOOKBACK_DAYS = 31
+
+CounterKey = Tuple[UUID, str, str]
+
+# Contadores por comando na reconciliação (4 parâmetros por linha)
+RECONCILE_BATCH_SIZE = 1000
+
+
+def _day_bucket(column, dialect: str):
+    """Dia (AAAA-MM-DD) de uma coluna DateTime, como texto."""
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM-DD")
+    return func.date(column)
+
+
+def _counters_query(dialect: str, user_ids: Optional[Sequence[UUID]], today: date):
+    """
+    Um único SELECT (UNION ALL das agregações) com os contadores
+    calculados a partir das tabelas de origem: (user_id, metric, bucket, count).
+    """
+    def owned(query, owner_column):
+        return query.where(owner_column.in_(user_ids)) if user_ids is not None else query
+
+    processes = owned(
+        select(Process.owner_id, literal(METRIC_PROCESS_STATUS), Process.status, func.count())
+        .where(Process.status.isnot(None))
+        .group_by(Process.owner_id, Process.status),
+        Process.owner_id,
+    )
+    open_cases = owned(
+        select(ExtrajudicialCase.owner_id, literal(METRIC_OPEN_CASES), cast(literal(""), String), func.count())
+        .where(or_(ExtrajudicialCase.status.is_(None), ExtrajudicialCase.status.notin_(CLOSED_CASE_STATUSES)))
+        .group_by(ExtrajudicialCase.owner_id),
+        ExtrajudicialCase.owner_id,
+    )
+    due_day = _day_bucket(TaskCard.due_date, dialect)
+    cards = owned(
+        select(TaskColumn.owner_id, literal(METRIC_CARDS_DUE), due_day, func.count())
+        .join(TaskColumn, TaskCard.column_id == TaskColumn.id)
+        .where(TaskCard.due_date >= datetime.combine(today - timedelta(days=CARD_DUE_LOOKBACK_DAYS), time.min))
+        .group_by(TaskColumn.owner_id, due_day),
+        TaskColumn.owner_id,
+    )
+    publication_day = _day_bucket(Intimation.publication_date, dialect)
+    intimations = owned(
+        select(Intimation.owner_id, literal(METRIC_INTIMATIONS), publication_day, func.count())
+        .where(Intimation.publication_date >= datetime.combine(today - timedelta(days=INTIMATION_LOOKBACK_DAYS), time.min))
+        .group_by(Intimation.owner_id, publication_day),
+        Intimation.owner_id,
+    )
+    return union_all(processes, open_cases, cards, intimations)
+
+
+def compute_dashboard_counters(
+    db: Session,
+    user_ids: Optional[Sequence[UUID]] = None,
+    today: Optional[date] = None,
+) -> Dict[CounterKey, int]:
+    """Contadores calculados a partir das tabelas de origem (todos os usuários, sem `user_ids`)."""
+    today = today or utc_now().date()
+    rows = db.execute(_counters_query(db.get_bind().dialect.name, user_ids, today)).all()
+    return {(user_id, metric, str(bucket)): count for user_id, metric, bucket, count in rows}
+
+
+def _stored_counters_query(user_id: UUID, today: date):
+    """
+    SELECT dos contadores gravados do usuário. Os dias que já saíram da
+    janela ficam de fora: até a próxima reconciliação eles continuam na
+    tabela, e sem o filtro cada leitura do painel os traria todos.
+    """
+    def since(metric: str, lookback_days: int):
+        return and_(
+            DashboardCounter.metric == metric,
+            DashboardCounter.bucket >= (today - timedelta(days=lookback_days)).isoformat(),
+        )
+
+    return (
+        select(DashboardCounter.metric, DashboardCounter.bucket, DashboardCounter.count)
+        .where(
+            DashboardCounter.user_id == user_id,
+            DashboardCounter.count != 0,
+            or_(
+                DashboardCounter.metric.notin_((METRIC_CARDS_DUE, METRIC_INTIMATIONS)),
+                since(METRIC_CARDS_DUE, CARD_DUE_LOOKBACK_DAYS),
+                since(METRIC_INTIMATIONS, INTIMATION_LOOKBACK_DAYS),
+            ),
+        )
+    )
+
+
+def get_dashboard_counters(db: Session, user_id: UUID, today: Optional[date] = None) -> List[Tuple[str, str, int]]:
+    """
+    (metric, bucket, count) do painel do usuário.
+
+    No PostgreSQL lê os contadores mantidos pelos triggers (uma leitura
+    pela chave primária, só dos dias dentro da janela). Nos demais bancos
+    não há triggers: os contadores são calculados na hora, também em uma
+    única query.
+    """
+    today = today or utc_now().date()
+    if db.get_bind().dialect.name != "postgresql":
+        return [
+            (metric, bucket, count)
+            for (_, metric, bucket), count in compute_dashboard_counters(db, [user_id], today).items()
+        ]
+    return db.execute(_stored_counters_query(user_id, today)).all()
+
+
+def reconcile_dashboard_counters(
+    db: Session,
+    user_ids: Optional[Sequence[UUID]] = None,
+    today: Optional[date] = None,
+    batch_size: int = RECONCILE_BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    Recalcula os contadores (de todos os usuários, sem `user_ids`) e
+    grava só as diferenças: contadores divergentes são sobrescritos e
+    os que não deveriam existir (zerados ou de dias que saíram da
+    janela) são apagados.
+
+    Um trigger que rode entre o cálculo e a gravação pode ter seu ajuste
+    sobrescrito; a divergência é corrigida na próxima reconciliação.
+
+    Returns:
+        {"users": usuários corrigidos, "repaired": contadores corrigidos}
+    """
+    expected = compute_dashboard_counters(db, user_ids, today)
+    query = select(DashboardCounter.user_id, DashboardCounter.metric, DashboardCounter.bucket, DashboardCounter.count)
+    if user_ids is not None:
+        query = query.where(DashboardCounter.user_id.in_(user_ids))
+    current = {(user_id, metric, bucket): count for user_id, metric, bucket, count in db.execute(query)}
+
+    changed = [key for key, count in expected.items() if current.get(key) != count]
+    stale = [key for key in current if key not in expected]
+
+    if stale:
+        # DELETE em lote (executemany) no nível do Core
+        table = DashboardCounter.__table__
+        db.execute(
+            delete(table).where(and_(
+                table.c.user_id == bindparam("key_user_id"),
+                table.c.metric == bindparam("key_metric"),
+                table.c.bucket == bindparam("key_bucket"),
+            )),
+            [{"key_user_id": user_id, "key_metric": metric, "key_bucket": bucket} for user_id, metric, bucket in stale],
+        )
+
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}[db.get_bind().dialect.name]
+    rows = [
+        {"user_id": user_id, "metric": metric, "bucket": bucket, "count": expected[(user_id, metric, bucket)]}
+        for user_id, metric, bucket in changed
+    ]
+    for start in range(0, len(rows), batch_size):
+        stmt = dialect_insert(DashboardCounter).values(rows[start:start + batch_size])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "metric", "bucket"],
+            set_={"count": stmt.excluded.count},
+        ))
+    db.commit()
+
+    return {
+        "users": len({key[0] for key in changed} | {key[0] for key in stale}),
+        "repaired": len(changed) + len(stale),
+    }
@@ -2,28 +2,58 @@
 CRUD de casos extrajudiciais e intimações.
 """
 
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
 from uuid import UUID
-from datetime import date, datetime
-from typing import Optional
+from datetime import date, datetime, time, timedelta
+from typing import FrozenSet, Optional
 
+from app.core.pagination import Page, keyset_paginate
+from app.core.sparse_fields import load_options
 from app.models import ExtrajudicialCase, Intimation
 from app.schemas import CaseCreateRequest, CaseUpdateRequest
 
 
 def create_extrajudicial_case(db: Session, case: CaseCreateRequest, user_id: UUID) -> ExtrajudicialCase:
     """Cria um novo caso extrajudicial."""
-    db_case = ExtrajudicialCase(
-        **case.model_dump(),
-        owner_id=user_id,
-        data={}
-    )
-    db.add(db_case)
+    db_case = db.scalars(
+        insert(ExtrajudicialCase)
+        .values(**case.model_dump(), owner_id=user_id, data={})
+        .returning(ExtrajudicialCase)
+    ).one()
     db.commit()
-    db.refresh(db_case)
     return db_case
 
 
+# Ordenações da listagem (a última coluna desempata)
+CASE_SORT_OPTIONS = {
+    "created_at": (ExtrajudicialCase.created_at, ExtrajudicialCase.id),
+    "updated_at": (ExtrajudicialCase.updated_at, ExtrajudicialCase.id),
+}
+
+
+def get_user_cases_page(
+    db: Session,
+    user_id: UUID,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "-updated_at",
+    case_type: Optional[str] = None,
+    fields: Optional[FrozenSet[str]] = None,
+) -> Page[ExtrajudicialCase]:
+    """
+    Lista os casos extrajudiciais de um usuário com paginação por cursor.
+    Usa os índices (owner_id, created_at, id) / (owner_id, updated_at, id).
+    Com `fields`, só as colunas pedidas são lidas (ex: sem o JSONB `data`).
+    """
+    query = db.query(ExtrajudicialCase).filter(ExtrajudicialCase.owner_id == user_id)
+    if case_type:
+        query = query.filter(ExtrajudicialCase.case_type == case_type)
+    if fields is not None:
+        query = query.options(*load_options(ExtrajudicialCase, fields, CASE_SORT_OPTIONS.get(sort.lstrip("-"), ())))
+    return keyset_paginate(query, sort, CASE_SORT_OPTIONS, limit=limit, cursor=cursor)
+
+
 def get_extrajudicial_case(db: Session, case_id: UUID, user_id: UUID) -> Optional[ExtrajudicialCase]:
     """Busca um caso extrajudicial por ID."""
     return db.query(ExtrajudicialCase).filter(
@@ -34,29 +64,36 @@ def get_extrajudicial_case(db: Session, case_id: UUID, user_id: UUID) -> Optiona
 
 def update_extrajudicial_case(db: Session, case_id: UUID, case_data: CaseUpdateRequest, user_id: UUID) -> Optional[ExtrajudicialCase]:
     """Atualiza o campo data de um caso extrajudicial."""
-    db_case = get_extrajudicial_case(db, case_id=case_id, user_id=user_id)
+    db_case = db.scalars(
+        update(ExtrajudicialCase)
+        .where(ExtrajudicialCase.id == case_id, ExtrajudicialCase.owner_id == user_id)
+        .values(data=case_data.data)
+        .returning(ExtrajudicialCase)
+    ).one_or_none()
     
     if not db_case:
         return None
     
-    db_case.data = case_data.data
     db.commit()
-    db.refresh(db_case)
     return db_case
 
 
 def get_intimations_stats(db: Session, user_id: UUID, start_date: date, end_date: date) -> int:
-    """Conta intimações de um usuário em um intervalo de datas."""
-    start_datetime = datetime.combine(start_date, datetime.min.time())
-    end_datetime = datetime.combine(end_date, datetime.max.time())
+    """
+    Conta intimações de um usuário em um intervalo de datas.
+    O intervalo semiaberto na coluna de partição faz o PostgreSQL ler
+    apenas as partições mensais envolvidas, cada uma pelo índice
+    (owner_id, publication_date).
+    """
+    start_datetime = datetime.combine(start_date, time.min)
+    end_datetime = datetime.combine(end_date + timedelta(days=1), time.min)
 
-    count = (
-        db.query(Intimation)
-        .filter(
+    return db.scalar(
+        select(func.count())
+        .select_from(Intimation)
+        .where(
             Intimation.owner_id == user_id,
             Intimation.publication_date >= start_datetime,
-            Intimation.publication_date <= end_datetime,
+            Intimation.publication_date < end_datetime,
         )
-        .count()
-    )
-    return count
\ No newline at end of file
+    )
\ No newline at end of file
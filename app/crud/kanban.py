@@ -1,13 +1,33 @@
 """
 CRUD do quadro Kanban.
+
+As escritas verificam a propriedade no próprio statement
+(INSERT ... SELECT / UPDATE ... WHERE ... RETURNING), sem um SELECT
+prévio nem refresh após o commit: uma ida ao banco mais o COMMIT.
+
+Colunas e cartões são ordenados por chaves fracionárias (`rank`, ver
+app.core.ranking): itens novos vão para o fim da lista (a chave vem do
+MAX(rank), pelos índices (owner_id, rank) / (column_id, rank)) e mover
+um item altera só a sua linha.
 """
 
+from sqlalchemy import String, case, cast, delete, distinct, exists, func, insert, literal, or_, select, update
 from sqlalchemy.orm import Session, selectinload
 from uuid import UUID
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
+from app.core.ranking import InvalidRankError, rank_between
 from app.models import TaskColumn, TaskCard
-from app.schemas import TaskColumnCreate, TaskColumnUpdate, TaskCardCreate, TaskCardUpdate
+from app.schemas import BoardReorder, TaskColumnCreate, TaskColumnUpdate, TaskCardCreate, TaskCardUpdate
+
+# Chaves com mais caracteres que isso fazem o grupo (colunas de um
+# usuário / cartões de uma coluna) ser rebalanceado
+REBALANCE_RANK_LENGTH = 12
+# Chaves do rebalanceamento: a posição com zeros à esquerda seguida de
+# um sufixo diferente de "0" (000001i, ..., 000010i), pois as chaves
+# nunca terminam em "0" (ver app.core.ranking)
+REBALANCED_RANK_WIDTH = 6
+REBALANCED_RANK_SUFFIX = "i"
 
 
 def get_board_for_user(db: Session, user_id: UUID) -> List[TaskColumn]:
@@ -18,145 +38,304 @@ def get_board_for_user(db: Session, user_id: UUID) -> List[TaskColumn]:
     return (
         db.query(TaskColumn)
         .filter(TaskColumn.owner_id == user_id)
-        .order_by(TaskColumn.position)
+        .order_by(TaskColumn.rank, TaskColumn.id)
         .options(selectinload(TaskColumn.cards))
         .all()
     )
 
 
+def _owned_column_ids(user_id: UUID):
+    """Subquery com os IDs das colunas do usuário."""
+    return select(TaskColumn.id).where(TaskColumn.owner_id == user_id)
+
+
+def _owned_card(card_id: int, user_id: UUID):
+    """Critérios de um cartão pertencente ao usuário."""
+    return (TaskCard.id == card_id, TaskCard.column_id.in_(_owned_column_ids(user_id)))
+
+
+def _last_column_rank(db: Session, user_id: UUID) -> Optional[str]:
+    return db.scalar(select(func.max(TaskColumn.rank)).where(TaskColumn.owner_id == user_id))
+
+
+def _last_card_rank(db: Session, column_id: int) -> Optional[str]:
+    return db.scalar(select(func.max(TaskCard.rank)).where(TaskCard.column_id == column_id))
+
+
 def create_task_column(db: Session, column: TaskColumnCreate, user_id: UUID) -> TaskColumn:
-    """Cria uma nova coluna."""
-    db_column = TaskColumn(**column.model_dump(), owner_id=user_id)
-    db.add(db_column)
+    """Cria uma nova coluna no fim do quadro."""
+    db_column = db.scalars(
+        insert(TaskColumn)
+        .values(**column.model_dump(), rank=rank_between(_last_column_rank(db, user_id), None), owner_id=user_id)
+        .returning(TaskColumn)
+    ).one()
     db.commit()
-    db.refresh(db_column)
     return db_column
 
 
 def update_task_column(db: Session, column_id: int, column_update: TaskColumnUpdate, user_id: UUID) -> Optional[TaskColumn]:
     """Atualiza o título de uma coluna."""
-    db_column = db.query(TaskColumn).filter(
-        TaskColumn.id == column_id,
-        TaskColumn.owner_id == user_id
-    ).first()
+    db_column = db.scalars(
+        update(TaskColumn)
+        .where(TaskColumn.id == column_id, TaskColumn.owner_id == user_id)
+        .values(title=column_update.title)
+        .returning(TaskColumn)
+    ).one_or_none()
 
     if not db_column:
         return None
 
-    db_column.title = column_update.title
     db.commit()
-    db.refresh(db_column)
     return db_column
 
 
 def delete_task_column(db: Session, column_id: int, user_id: UUID) -> Optional[TaskColumn]:
-    """Deleta uma coluna."""
-    column_to_delete = db.query(TaskColumn).filter(
+    """Deleta uma coluna e seus cartões."""
+    owned_column = select(TaskColumn.id).where(
         TaskColumn.id == column_id,
         TaskColumn.owner_id == user_id
-    ).first()
+    )
+    db.execute(
+        delete(TaskCard)
+        .where(TaskCard.column_id.in_(owned_column))
+        .execution_options(synchronize_session=False)
+    )
+    column_to_delete = db.scalars(
+        delete(TaskColumn)
+        .where(TaskColumn.id == column_id, TaskColumn.owner_id == user_id)
+        .returning(TaskColumn)
+    ).one_or_none()
 
     if not column_to_delete:
         return None
-    
-    db.delete(column_to_delete)
+
     db.commit()
     return column_to_delete
 
 
 def create_task_card(db: Session, card: TaskCardCreate, column_id: int, user_id: UUID) -> Optional[TaskCard]:
-    """Cria um novo cartão em uma coluna."""
-    db_column = db.query(TaskColumn).filter(
-        TaskColumn.id == column_id,
-        TaskColumn.owner_id == user_id
-    ).first()
+    """Cria um novo cartão no fim de uma coluna (somente se a coluna for do usuário)."""
+    card_data = card.model_dump()
+    card_data["rank"] = rank_between(_last_card_rank(db, column_id), None)
+    columns = TaskCard.__table__.c
+    values = [literal(value, type_=columns[key].type) for key, value in card_data.items()]
 
-    if not db_column:
+    db_card = db.scalars(
+        insert(TaskCard)
+        .from_select(
+            [*card_data, "column_id"],
+            select(*values, TaskColumn.id).where(
+                TaskColumn.id == column_id,
+                TaskColumn.owner_id == user_id
+            ),
+        )
+        .returning(TaskCard)
+    ).one_or_none()
+
+    if not db_card:
         return None
 
-    db_card = TaskCard(**card.model_dump(), column_id=column_id)
-    db.add(db_card)
     db.commit()
-    db.refresh(db_card)
     return db_card
 
 
 def update_task_card(db: Session, card_id: int, card_update: TaskCardUpdate, user_id: UUID) -> Optional[TaskCard]:
     """Atualiza os detalhes de um cartão."""
-    db_card = (
-        db.query(TaskCard)
-        .join(TaskColumn, TaskCard.column_id == TaskColumn.id)
-        .filter(
-            TaskCard.id == card_id,
-            TaskColumn.owner_id == user_id
-        )
-        .first()
-    )
+    update_data = card_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return db.scalars(select(TaskCard).where(*_owned_card(card_id, user_id))).first()
+
+    db_card = db.scalars(
+        update(TaskCard)
+        .where(*_owned_card(card_id, user_id))
+        .values(**update_data)
+        .returning(TaskCard)
+    ).one_or_none()
 
     if not db_card:
         return None
-    
-    update_data = card_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_card, key, value)
-        
+
     db.commit()
-    db.refresh(db_card)
     return db_card
 
 
 def delete_task_card(db: Session, card_id: int, user_id: UUID) -> Optional[TaskCard]:
     """Deleta um cartão."""
-    card_to_delete = (
-        db.query(TaskCard)
-        .join(TaskColumn, TaskCard.column_id == TaskColumn.id)
-        .filter(
-            TaskCard.id == card_id,
-            TaskColumn.owner_id == user_id
-        )
-        .first()
-    )
+    card_to_delete = db.scalars(
+        delete(TaskCard)
+        .where(*_owned_card(card_id, user_id))
+        .returning(TaskCard)
+    ).one_or_none()
 
     if not card_to_delete:
         return None
-    
-    db.delete(card_to_delete)
+
     db.commit()
     return card_to_delete
 
 
 def move_task_card(db: Session, card_id: int, new_column_id: int, user_id: UUID) -> Optional[TaskCard]:
     """
-    Move um cartão para uma nova coluna.
+    Move um cartão para o fim de uma coluna.
+    O cartão e a coluna de destino precisam pertencer ao usuário.
     
     Returns:
         O cartão movido se sucesso, None se erro
     """
-    # Busca o cartão e verifica propriedade
-    card_to_move = (
-        db.query(TaskCard)
-        .join(TaskColumn, TaskCard.column_id == TaskColumn.id)
-        .filter(
-            TaskCard.id == card_id,
-            TaskColumn.owner_id == user_id
-        )
-        .first()
+    destination_owned = exists().where(
+        TaskColumn.id == new_column_id,
+        TaskColumn.owner_id == user_id
     )
+    moved_card = db.scalars(
+        update(TaskCard)
+        .where(*_owned_card(card_id, user_id), destination_owned)
+        .values(column_id=new_column_id, rank=rank_between(_last_card_rank(db, new_column_id), None))
+        .returning(TaskCard)
+    ).one_or_none()
 
-    if not card_to_move:
+    if not moved_card:
         return None
 
-    # Verifica se coluna de destino existe e pertence ao usuário
-    destination_column = db.query(TaskColumn).filter(
-        TaskColumn.id == new_column_id,
-        TaskColumn.owner_id == user_id
-    ).first()
+    db.commit()
+    return moved_card
+
+
+def _neighbor_rank(items: Dict[int, Any], neighbor_id: Optional[int], item_id: int, column_id: Optional[int] = None) -> Optional[str]:
+    """Chave de um vizinho de um movimento (None: início / fim da lista)."""
+    if neighbor_id is None:
+        return None
+    if neighbor_id == item_id:
+        raise InvalidRankError(f"O item {item_id} não pode ser vizinho de si mesmo.")
+    neighbor = items[neighbor_id]
+    if column_id is not None and neighbor.column_id != column_id:
+        raise InvalidRankError(f"O cartão {neighbor_id} não está na coluna {column_id}.")
+    return neighbor.rank
+
+
+def reorder_board(db: Session, reorder: BoardReorder, user_id: UUID) -> Optional[Dict[str, List[Any]]]:
+    """
+    Aplica vários movimentos de colunas e cartões em uma transação.
+
+    Cada movimento coloca o item entre `previous_id` e `next_id` (sem
+    nenhum dos dois, no fim da lista) e altera só a chave do item (e a
+    coluna, para cartões). Os itens envolvidos são lidos em duas
+    queries, os movimentos são aplicados em memória, na ordem, e
+    gravados juntos no commit.
+
+    Returns:
+        {"columns": [...], "cards": [...]} com os itens movidos, ou None
+        se algum item não existe ou não pertence ao usuário.
+
+    Raises:
+        InvalidRankError: vizinhos fora de ordem ou de outra coluna (o
+            quadro mudou desde a leitura); nada é gravado.
+    """
+    column_ids = {
+        item_id
+        for move in reorder.columns
+        for item_id in (move.id, move.previous_id, move.next_id)
+        if item_id is not None
+    } | {move.column_id for move in reorder.cards}
+    card_ids = {
+        item_id
+        for move in reorder.cards
+        for item_id in (move.id, move.previous_id, move.next_id)
+        if item_id is not None
+    }
 
-    if not destination_column:
+    columns = {
+        column.id: column
+        for column in db.scalars(select(TaskColumn).where(TaskColumn.owner_id == user_id, TaskColumn.id.in_(column_ids)))
+    } if column_ids else {}
+    cards = {
+        card.id: card
+        for card in db.scalars(select(TaskCard).where(TaskCard.id.in_(card_ids), TaskCard.column_id.in_(_owned_column_ids(user_id))))
+    } if card_ids else {}
+    if len(columns) < len(column_ids) or len(cards) < len(card_ids):
         return None
 
-    # Move o cartão
-    card_to_move.column_id = new_column_id
+    try:
+        for move in reorder.columns:
+            previous = _neighbor_rank(columns, move.previous_id, move.id)
+            following = _neighbor_rank(columns, move.next_id, move.id)
+            if previous is None and following is None:
+                db.flush()
+                previous = db.scalar(
+                    select(func.max(TaskColumn.rank)).where(TaskColumn.owner_id == user_id, TaskColumn.id != move.id)
+                )
+            columns[move.id].rank = rank_between(previous, following)
+
+        for move in reorder.cards:
+            previous = _neighbor_rank(cards, move.previous_id, move.id, move.column_id)
+            following = _neighbor_rank(cards, move.next_id, move.id, move.column_id)
+            if previous is None and following is None:
+                db.flush()
+                previous = db.scalar(
+                    select(func.max(TaskCard.rank)).where(TaskCard.column_id == move.column_id, TaskCard.id != move.id)
+                )
+            cards[move.id].column_id = move.column_id
+            cards[move.id].rank = rank_between(previous, following)
+    except InvalidRankError:
+        db.rollback()
+        raise
+
+    db.commit()
+    return {
+        "columns": [columns[column_id] for column_id in dict.fromkeys(move.id for move in reorder.columns)],
+        "cards": [cards[card_id] for card_id in dict.fromkeys(move.id for move in reorder.cards)],
+    }
+
+
+def _sequence_rank(position, dialect: str):
+    """Chave de tamanho fixo para a posição `position` (1 -> "000001i")."""
+    if dialect == "postgresql":
+        return func.lpad(cast(position, String), REBALANCED_RANK_WIDTH, "0", type_=String) + REBALANCED_RANK_SUFFIX
+    return func.printf(f"%0{REBALANCED_RANK_WIDTH}d{REBALANCED_RANK_SUFFIX}", position)
+
+
+def _rebalance(db: Session, model, group_column, max_length: int) -> int:
+    """
+    Reescreve, em um único UPDATE com row_number(), as chaves dos grupos
+    com alguma chave longa demais, chaves repetidas (criações
+    concorrentes no fim da lista) ou terminadas em "0" (gravadas por
+    versões antigas do rebalanceamento), mantendo a ordem atual.
+    """
+    crowded = (
+        select(group_column)
+        .group_by(group_column)
+        .having(or_(
+            func.max(func.length(model.rank)) > max_length,
+            func.count(distinct(model.rank)) < func.count(),
+            func.max(case((model.rank.like("%0"), 1), else_=0)) == 1,
+        ))
+        .correlate(None)
+    )
+    position = func.row_number().over(partition_by=group_column, order_by=(model.rank, model.id))
+    ranked = (
+        select(model.id, _sequence_rank(position, db.get_bind().dialect.name).label("new_rank"))
+        .where(group_column.in_(crowded))
+        .subquery()
+    )
+    return db.execute(
+        update(model)
+        .where(model.id == ranked.c.id, model.rank != ranked.c.new_rank)
+        .values(rank=ranked.c.new_rank)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def rebalance_ranks(db: Session, max_length: int = REBALANCE_RANK_LENGTH) -> Dict[str, int]:
+    """
+    Rebalanceia as chaves de colunas e cartões (ver `_rebalance`).
+    Um movimento lido antes e gravado depois do rebalanceamento pode
+    cair fora do lugar; o usuário o corrige com um novo movimento.
+
+    Returns:
+        Número de colunas e de cartões com a chave reescrita.
+    """
+    result = {
+        "columns": _rebalance(db, TaskColumn, TaskColumn.owner_id, max_length),
+        "cards": _rebalance(db, TaskCard, TaskCard.column_id, max_length),
+    }
     db.commit()
-    db.refresh(card_to_move)
-    return card_to_move
\ No newline at end of file
+    return result
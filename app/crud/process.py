@@ -2,23 +2,272 @@
 CRUD de processos.
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, insert, select, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased, contains_eager, noload, selectinload, with_expression
 from uuid import UUID
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
-from app.models import Process
-from app.schemas import ProcessCreate
+from app.core.cnj import InvalidCNJNumberError, parse_cnj
+from app.core.normalization import normalize_timestamp, process_update_hash
+from app.core.pagination import Page, keyset_paginate
+from app.core.sparse_fields import load_options
+from app.models import Process, ProcessUpdate
+from app.schemas import ProcessCreate, ProcessUpdateCreate
 
 
-def get_user_processes(db: Session, user_id: UUID, skip: int = 0, limit: int = 100) -> List[Process]:
-    """Lista os processos de um usuário."""
-    return db.query(Process).filter(Process.owner_id == user_id).offset(skip).limit(limit).all()
+def cnj_columns(number: str) -> Dict[str, int]:
+    """Valores das colunas cnj_* para um número (vazio fora do padrão CNJ)."""
+    try:
+        cnj = parse_cnj(number)
+    except InvalidCNJNumberError:
+        return {}
+    return {
+        "cnj_sequential": cnj.sequential,
+        "cnj_year": cnj.year,
+        "cnj_segment": cnj.segment,
+        "cnj_tribunal": cnj.tribunal,
+        "cnj_origin": cnj.origin,
+    }
+
+
+def _filter_cnj(query, cnj_segment: Optional[int], cnj_tribunal: Optional[int], cnj_year: Optional[int]):
+    """Filtros por tribunal/ano (índices ix_processes_owner_id_cnj_*)."""
+    if cnj_segment is not None:
+        query = query.filter(Process.cnj_segment == cnj_segment)
+    if cnj_tribunal is not None:
+        query = query.filter(Process.cnj_tribunal == cnj_tribunal)
+    if cnj_year is not None:
+        query = query.filter(Process.cnj_year == cnj_year)
+    return query
+
+
+# Campos preenchidos pelo join com o andamento mais recente
+LATEST_UPDATE_FIELDS = frozenset({"latest_update", "updates_count"})
+
+
+def _latest_update_join(dialect: str):
+    """
+    Subquery com o andamento mais recente de cada processo e o total de
+    andamentos, e a condição do join com processes.
+
+    No PostgreSQL é um LATERAL: para cada processo da página, uma busca
+    no índice (process_id, date DESC, id DESC) com LIMIT 1; o COUNT(*)
+    OVER () é calculado antes do LIMIT, sobre os andamentos do processo.
+    Em outros bancos (SQLite, nos testes) a mesma informação vem de
+    funções de janela particionadas por processo.
+    """
+    newest_first = (ProcessUpdate.date.desc(), ProcessUpdate.id.desc())
+    if dialect == "postgresql":
+        subquery = (
+            select(ProcessUpdate, func.count().over().label("updates_count"))
+            .where(ProcessUpdate.process_id == Process.id)
+            .order_by(*newest_first)
+            .limit(1)
+            .lateral("latest_update")
+        )
+        return subquery, true()
+
+    subquery = select(
+        ProcessUpdate,
+        func.row_number().over(partition_by=ProcessUpdate.process_id, order_by=newest_first).label("position"),
+        func.count().over(partition_by=ProcessUpdate.process_id).label("updates_count"),
+    ).subquery("latest_update")
+    return subquery, and_(subquery.c.process_id == Process.id, subquery.c.position == 1)
+
+
+def _with_latest_update(db: Session, query, load_update: bool = True):
+    """Inclui `latest_update` e `updates_count` na mesma query da listagem."""
+    subquery, onclause = _latest_update_join(db.get_bind().dialect.name)
+    latest = aliased(ProcessUpdate, subquery)
+    query = query.outerjoin(latest, onclause).options(
+        with_expression(Process.updates_count, func.coalesce(subquery.c.updates_count, 0)),
+    )
+    if load_update:
+        query = query.options(contains_eager(Process.latest_update.of_type(latest)))
+    return query
+
+
+def _listing_query(
+    db: Session,
+    user_id: UUID,
+    fields: Optional[FrozenSet[str]],
+    extra_columns=(),
+    status: Optional[str] = None,
+    type: Optional[str] = None,
+    cnj_segment: Optional[int] = None,
+    cnj_tribunal: Optional[int] = None,
+    cnj_year: Optional[int] = None,
+):
+    """Query base das listagens: filtros, campos esparsos e último andamento."""
+    query = db.query(Process).filter(Process.owner_id == user_id)
+    if status is not None:
+        query = query.filter(Process.status == status)
+    if type is not None:
+        query = query.filter(Process.type == type)
+    query = _filter_cnj(query, cnj_segment, cnj_tribunal, cnj_year)
+    if fields is not None:
+        # updates_count não é coluna: vem do with_expression abaixo
+        query = query.options(*load_options(Process, fields - {"updates_count"}, extra_columns))
+    if fields is None or "updates" in fields:
+        # Andamentos da página inteira em uma query
+        query = query.options(selectinload(Process.updates))
+    if fields is None or fields & LATEST_UPDATE_FIELDS:
+        query = _with_latest_update(db, query, load_update=fields is None or "latest_update" in fields)
+    return query
+
+
+def get_user_processes(
+    db: Session,
+    user_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[FrozenSet[str]] = None,
+    status: Optional[str] = None,
+    type: Optional[str] = None,
+    cnj_segment: Optional[int] = None,
+    cnj_tribunal: Optional[int] = None,
+    cnj_year: Optional[int] = None,
+) -> List[Process]:
+    """Lista os processos de um usuário (só os campos `fields`, se informados)."""
+    query = _listing_query(
+        db, user_id, fields,
+        status=status, type=type,
+        cnj_segment=cnj_segment, cnj_tribunal=cnj_tribunal, cnj_year=cnj_year,
+    )
+    return (
+        query
+        .order_by(Process.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+# Ordenações da listagem (number é único, não precisa de desempate)
+PROCESS_SORT_OPTIONS = {
+    "id": (Process.id,),
+    "number": (Process.number,),
+}
+
+
+def get_user_processes_page(
+    db: Session,
+    user_id: UUID,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    fields: Optional[FrozenSet[str]] = None,
+    status: Optional[str] = None,
+    type: Optional[str] = None,
+    cnj_segment: Optional[int] = None,
+    cnj_tribunal: Optional[int] = None,
+    cnj_year: Optional[int] = None,
+) -> Page[Process]:
+    """
+    Lista os processos de um usuário com paginação por cursor.
+    Usa os índices (owner_id, id) / (owner_id, number).
+    Com `fields`, só as colunas pedidas são lidas. Os andamentos
+    (`updates`) só são buscados se pedidos em `fields`. Os filtros `status`, `type`
+    e cnj_* (segmento, tribunal e ano do número CNJ) restringem a lista.
+    O andamento mais recente e o total de andamentos de cada processo
+    vêm na mesma query (ver `_latest_update_join`).
+    """
+    query = _listing_query(
+        db, user_id, fields, PROCESS_SORT_OPTIONS.get(sort.lstrip("-"), ()),
+        status=status, type=type,
+        cnj_segment=cnj_segment, cnj_tribunal=cnj_tribunal, cnj_year=cnj_year,
+    )
+    return keyset_paginate(query, sort, PROCESS_SORT_OPTIONS, limit=limit, cursor=cursor)
 
 
 def create_user_process(db: Session, process: ProcessCreate, user_id: UUID) -> Process:
-    """Cria um novo processo."""
-    db_process = Process(**process.model_dump(), owner_id=user_id)
-    db.add(db_process)
+    """Cria um novo processo (INSERT ... RETURNING, sem refresh)."""
+    db_process = db.scalars(
+        insert(Process)
+        .values(**process.model_dump(), **cnj_columns(process.number), owner_id=user_id)
+        .returning(Process)
+        # Processo novo não tem andamentos: serializa a lista vazia sem lazy load
+        .options(noload(Process.updates))
+    ).one()
     db.commit()
-    db.refresh(db_process)
-    return db_process
\ No newline at end of file
+    return db_process
+
+def get_user_process_watermarks(db: Session, user_id: UUID) -> List[Tuple[int, str, Optional[datetime]]]:
+    """
+    (id, número, data do andamento mais recente) de cada processo do
+    usuário: a marca d'água da sincronização com o DataJud. O MAX(date)
+    por processo usa o índice (process_id, date DESC).
+    """
+    return db.execute(
+        select(Process.id, Process.number, func.max(ProcessUpdate.date))
+        .outerjoin(ProcessUpdate, ProcessUpdate.process_id == Process.id)
+        .where(Process.owner_id == user_id)
+        .group_by(Process.id, Process.number)
+        .order_by(Process.id)
+    ).all()
+
+
+# Andamentos por INSERT na ingestão em massa (5 parâmetros por linha)
+INGEST_BATCH_SIZE = 1000
+
+
+def ingest_user_process_updates(
+    db: Session,
+    updates: Sequence[ProcessUpdateCreate],
+    user_id: UUID,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Grava andamentos de vários processos do usuário, sem duplicar os já
+    existentes: cada andamento recebe o hash do conteúdo (data e
+    descrição) e os lotes são gravados com INSERT ... ON CONFLICT
+    (process_id, content_hash, date) DO NOTHING, com commit por lote.
+    Reenviar os mesmos andamentos não grava nada.
+
+    `updates` são objetos com process_id, date e description (ex:
+    schemas.ProcessUpdateIngest). Andamentos de processos inexistentes
+    ou de outro usuário são rejeitados.
+
+    Returns:
+        Contadores no formato de schemas.ProcessUpdateIngestReport.
+    """
+    process_ids = {update.process_id for update in updates}
+    owned = set(db.scalars(
+        select(Process.id).where(Process.owner_id == user_id, Process.id.in_(process_ids))
+    )) if process_ids else set()
+
+    rows, seen, rejected = [], set(), 0
+    for update in updates:
+        if update.process_id not in owned:
+            rejected += 1
+            continue
+        content_hash = process_update_hash(update.date, update.description)
+        if (update.process_id, content_hash) in seen:
+            continue
+        seen.add((update.process_id, content_hash))
+        rows.append({
+            "process_id": update.process_id,
+            # Até os segundos, como no hash: o índice único inclui a data
+            "date": normalize_timestamp(update.date).replace(microsecond=0),
+            "description": update.description,
+            "content_hash": content_hash,
+        })
+
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}[db.get_bind().dialect.name]
+    inserted = 0
+    for start in range(0, len(rows), batch_size):
+        stmt = dialect_insert(ProcessUpdate).values(rows[start:start + batch_size])
+        stmt = stmt.on_conflict_do_nothing(index_elements=["process_id", "content_hash", "date"])
+        # rowcount conta apenas as linhas inseridas (conflitos são ignorados)
+        inserted += db.execute(stmt).rowcount
+        db.commit()
+
+    return {
+        "received": len(updates),
+        "inserted": inserted,
+        "skipped": len(updates) - rejected - inserted,
+        "rejected": rejected,
+        "unknown_process_ids": sorted(process_ids - owned),
+    }
@@ -2,13 +2,23 @@
 CRUD de usuários.
 """
 
+from sqlalchemy import insert, update
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Tuple, Optional
 
+from app.database import run_db
 from app.models import User
 from app.schemas import UserCreate, UserUpdate, UserPasswordUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.identity_cache import invalidate_identity
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password,
+    verify_password_async,
+)
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
@@ -24,14 +34,17 @@ def get_user_by_id(db: Session, user_id: UUID) -> Optional[User]:
 def create_user(db: Session, user: UserCreate) -> User:
     """Cria um novo usuário com senha criptografada."""
     hashed_password = get_password_hash(user.password)
-    db_user = User(
-        email=user.email,
-        name=user.name,
-        hashed_password=hashed_password
-    )
-    db.add(db_user)
+    return _insert_user(db, user, hashed_password)
+
+
+def _insert_user(db: Session, user: UserCreate, hashed_password: str) -> User:
+    """Persiste um novo usuário com o hash já calculado."""
+    db_user = db.scalars(
+        insert(User)
+        .values(email=user.email, name=user.name, hashed_password=hashed_password)
+        .returning(User)
+    ).one()
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 
@@ -48,26 +61,60 @@ def authenticate_user(db: Session, email: str, password: str) -> Tuple[Optional[
         return None, "user_not_found"
     if not verify_password(password, user.hashed_password):
         return None, "invalid_password"
+    if password_needs_rehash(user.hashed_password):
+        _rehash_password(db, user, get_password_hash(password))
     return user, None
 
 
-def update_user_profile(db: Session, user_id: UUID, user_update: UserUpdate) -> Optional[User]:
-    """Atualiza o perfil de um usuário."""
-    db_user = get_user_by_id(db, user_id)
-    if not db_user:
-        return None
+async def create_user_async(db: Session, user: UserCreate) -> User:
+    """
+    Versão assíncrona de create_user.
+    O bcrypt roda no executor dedicado e o acesso ao banco via run_db.
+    """
+    hashed_password = await get_password_hash_async(user.password)
+    return await run_db(db, _insert_user, user, hashed_password)
+
+
+async def authenticate_user_async(db: Session, email: str, password: str) -> Tuple[Optional[User], Optional[str]]:
+    """Versão assíncrona de authenticate_user (mesmos códigos de erro)."""
+    user = await run_db(db, get_user_by_email, email)
+    if not user:
+        return None, "user_not_found"
+    if not await verify_password_async(password, user.hashed_password):
+        return None, "invalid_password"
+    if password_needs_rehash(user.hashed_password):
+        new_hash = await get_password_hash_async(password)
+        await run_db(db, _rehash_password, user, new_hash)
+    return user, None
+
+
+def _rehash_password(db: Session, user: User, hashed_password: str) -> None:
+    """
+    Regrava o hash com os parâmetros atuais após um login bem-sucedido.
+    Falhas aqui não impedem o login: o hash antigo continua válido.
+    """
+    try:
+        user.hashed_password = hashed_password
+        db.commit()
+        invalidate_identity(user.email)
+    except SQLAlchemyError:
+        db.rollback()
 
-    update_data = user_update.model_dump(exclude_unset=True)
 
-    # Handle address separately (JSONB field)
-    if 'address' in update_data and update_data['address'] is not None:
-        db_user.address = update_data.pop('address')
+def update_user_profile(db: Session, user_id: UUID, user_update: UserUpdate) -> Optional[User]:
+    """Atualiza o perfil de um usuário (UPDATE ... RETURNING)."""
+    update_data = user_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return get_user_by_id(db, user_id)
 
-    for key, value in update_data.items():
-        setattr(db_user, key, value)
+    db_user = db.scalars(
+        update(User).where(User.id == user_id).values(**update_data).returning(User)
+    ).one_or_none()
+    if not db_user:
+        return None
 
     db.commit()
-    db.refresh(db_user)
+    invalidate_identity(db_user.email)
     return db_user
 
 
@@ -77,7 +124,42 @@ def update_user_password(db: Session, user: User, password_update: UserPasswordU
         return False
 
     hashed_password = get_password_hash(password_update.new_password)
-    user.hashed_password = hashed_password
+    return _store_password(db, user.id, hashed_password)
+
+
+async def update_user_password_async(db: Session, user: User, password_update: UserPasswordUpdate) -> bool:
+    """Versão assíncrona de update_user_password."""
+    if not await verify_password_async(password_update.current_password, user.hashed_password):
+        return False
+
+    hashed_password = await get_password_hash_async(password_update.new_password)
+    return await run_db(db, _store_password, user.id, hashed_password)
+
+
+def _store_password(db: Session, user_id: UUID, hashed_password: str) -> bool:
+    """Grava o novo hash de senha e invalida a identidade em cache."""
+    # O usuário autenticado pode vir do cache (desanexado da sessão)
+    email = db.scalars(
+        update(User)
+        .where(User.id == user_id)
+        .values(hashed_password=hashed_password)
+        .returning(User.email)
+    ).one_or_none()
+    if email is None:
+        return False
+
+    db.commit()
+    invalidate_identity(email)
+    return True
+
+
+def delete_user(db: Session, user_id: UUID) -> Optional[User]:
+    """Deleta um usuário e todos os seus dados."""
+    db_user = get_user_by_id(db, user_id)
+    if not db_user:
+        return None
+
+    db.delete(db_user)
     db.commit()
-    db.refresh(user)
-    return True
\ No newline at end of file
+    invalidate_identity(db_user.email)
+    return db_user
\ No newline at end of file
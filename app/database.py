@@ -1,12 +1,133 @@
 """
 Configuração do banco de dados SQLAlchemy.
+
+Com DB_ASYNC_ENABLED, as rotas usam um AsyncSession (driver asyncpg) e
+as funções de CRUD rodam via `AsyncSession.run_sync`, sem ocupar threads.
+Com DATABASE_REPLICA_URL, rotas somente-leitura podem usar a réplica
+(ver app.core.replica).
 """
 
-from sqlalchemy import create_engine
+from typing import Any, AsyncIterator, Callable, Sequence
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.db_metrics import PoolMetrics, pool_metrics, pool_options
+from app.core.query_stats import instrument_engine
+from app.core.replica import ReplicaRouter
+
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings, pool_metrics))
+event.listen(engine, "connect", pool_metrics.record_connect)
+event.listen(engine, "invalidate", pool_metrics.record_invalidate)
+instrument_engine(engine)
+
+# expire_on_commit=False: as escritas montam a resposta a partir do RETURNING;
+# expirar no commit forçaria um SELECT extra ao serializar
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+Base = declarative_base()
+
+# === Caminho assíncrono (opcional) ===
+
+async_engine = None
+AsyncSessionLocal = None
+async_pool_metrics = PoolMetrics()
+
+
+def _create_async_engine(url: str, metrics: PoolMetrics):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    options = pool_options(settings, metrics, base=AsyncAdaptedQueuePool)
+    if settings.DB_PGBOUNCER_MODE:
+        # asyncpg usa prepared statements, incompatíveis com pgbouncer em modo transação
+        options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+    async_db_engine = create_async_engine(url, **options)
+    event.listen(async_db_engine.sync_engine, "connect", metrics.record_connect)
+    event.listen(async_db_engine.sync_engine, "invalidate", metrics.record_invalidate)
+    instrument_engine(async_db_engine.sync_engine)
+    return async_db_engine
+
+
+def _async_sessionmaker(bind):
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    # expire_on_commit=False: atributos expirados não podem ser recarregados
+    # fora do contexto assíncrono (ex: na serialização da resposta)
+    return async_sessionmaker(bind, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+if settings.DB_ASYNC_ENABLED:
+    async_engine = _create_async_engine(settings.DATABASE_ASYNC_URL, async_pool_metrics)
+    AsyncSessionLocal = _async_sessionmaker(async_engine)
+
+# === Réplica de leitura (opcional) ===
+
+replica_engine = None
+ReplicaSessionLocal = None
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+replica_pool_metrics = PoolMetrics()
+replica_router = ReplicaRouter(
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_LAG_CHECK_SECONDS,
+)
+
+if settings.DATABASE_REPLICA_URL:
+    if settings.DB_ASYNC_ENABLED:
+        async_replica_engine = _create_async_engine(settings.DATABASE_REPLICA_ASYNC_URL, replica_pool_metrics)
+        AsyncReplicaSessionLocal = _async_sessionmaker(async_replica_engine)
+    else:
+        replica_engine = create_engine(
+            settings.DATABASE_REPLICA_URL,
+            **pool_options(settings, replica_pool_metrics),
+        )
+        event.listen(replica_engine, "connect", replica_pool_metrics.record_connect)
+        event.listen(replica_engine, "invalidate", replica_pool_metrics.record_invalidate)
+        instrument_engine(replica_engine)
+        ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=replica_engine)
+
+
+async def run_db(db, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Executa uma função de CRUD síncrona (que recebe a sessão como primeiro
+    argumento) sem bloquear o event loop.
+
+    - AsyncSession: roda via run_sync, sobre o driver assíncrono.
+    - Session: roda no threadpool do anyio.
+    """
+    if hasattr(db, "run_sync"):
+        return await db.run_sync(lambda session: func(session, *args, **kwargs))
+    return await run_in_threadpool(func, db, *args, **kwargs)
+
+
+async def stream_partitions(db, statement, batch_size: int = 1000) -> AsyncIterator[Sequence[Any]]:
+    """
+    Executa um SELECT com cursor do lado do servidor (yield_per) e entrega
+    as linhas em lotes de até `batch_size`, sem carregar o resultado
+    inteiro em memória.
+
+    - AsyncSession: AsyncSession.stream.
+    - Session: cada lote é buscado no threadpool.
+    """
+    statement = statement.execution_options(yield_per=batch_size)
+    if hasattr(db, "stream"):
+        result = await db.stream(statement)
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+        return
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+    result = await run_in_threadpool(db.execute, statement)
+    try:
+        while True:
+            partition = await run_in_threadpool(result.fetchmany, batch_size)
+            if not partition:
+                break
+            yield partition
+    finally:
+        await run_in_threadpool(result.close)
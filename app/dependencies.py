@@ -2,21 +2,42 @@
 Dependências compartilhadas da API (autenticação, DB).
 """
 
-from fastapi import Depends, HTTPException, status
+import inspect
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import APIKeyHeader
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import crud, models, schemas
 from app.core.config import settings
-from app.database import SessionLocal
+from app.core.identity_cache import identity_cache
+from app.database import (
+    AsyncReplicaSessionLocal,
+    AsyncSessionLocal,
+    ReplicaSessionLocal,
+    SessionLocal,
+    async_replica_engine,
+    replica_engine,
+    replica_router,
+    run_db,
+)
+from app.services.token_revocation import token_revocation_store
 
 # Esquema de segurança: espera cabeçalho "Authorization: Bearer <token>"
 oauth2_scheme = APIKeyHeader(name="Authorization", auto_error=False)
 
+# Métodos que não alteram dados (não desviam leituras para o primário)
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
 
-def get_db():
-    """Cria uma sessão do banco de dados."""
+def get_sync_db():
+    """
+    Cria uma sessão do banco de dados.
+    A sessão só retira uma conexão do pool na primeira query.
+    """
     db = SessionLocal()
     try:
         yield db
@@ -24,13 +45,50 @@ def get_db():
         db.close()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+async def get_async_db():
+    """Cria uma sessão assíncrona do banco de dados (DB_ASYNC_ENABLED)."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependência usada pelas rotas: o modo é escolhido por DB_ASYNC_ENABLED.
+# As rotas acessam a sessão apenas via crud.aio / run_db, que aceitam ambos.
+get_db = get_async_db if settings.DB_ASYNC_ENABLED else get_sync_db
+
+
+@asynccontextmanager
+async def on_demand_db(request: Request):
+    """
+    Abre uma sessão de get_db apenas quando necessária (respeitando
+    dependency_overrides) e a fecha ao sair do bloco, devolvendo a
+    conexão ao pool antes de a rota continuar.
+    """
+    provider = request.app.dependency_overrides.get(get_db, get_db)
+    session_gen = provider()
+    if inspect.isasyncgen(session_gen):
+        db = await session_gen.__anext__()
+        try:
+            yield db
+        finally:
+            await session_gen.aclose()
+    else:
+        db = next(session_gen)
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(session_gen.close)
+
+
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme)
 ) -> models.User:
     """
     Decodifica o token JWT e retorna o usuário autenticado.
     O token deve ser passado como: Authorization: Bearer <token>
+
+    Não depende de get_db: com a identidade em cache e a família do
+    token fora do filtro de revogação, nenhuma sessão é aberta.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,12 +111,69 @@ def get_current_user(
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
+        # Refresh tokens não servem como credencial de acesso
+        if payload.get("type", "access") != "access":
+            raise credentials_exception
         token_data = schemas.TokenData(email=email)
     except JWTError:
         raise credentials_exception
+
+    # Família revogada (reuso de refresh token detectado)
+    family_id = payload.get("fam")
+    if family_id and token_revocation_store.needs_db_check(family_id):
+        async with on_demand_db(request) as db:
+            revoked = await run_db(db, token_revocation_store.confirm_family_revoked, family_id)
+        if revoked:
+            raise credentials_exception
     
-    user = crud.get_user_by_email(db, email=token_data.email)
+    # Caminho quente: identidade já resolvida recentemente
+    user = identity_cache.get(token_data.email)
     if user is None:
-        raise credentials_exception
-    
-    return user
\ No newline at end of file
+        async with on_demand_db(request) as db:
+            user = await crud.aio.get_user_by_email(db=db, email=token_data.email)
+            if user is None:
+                raise credentials_exception
+
+            # Desanexa da sessão para que o objeto em cache não seja
+            # expirado nem compartilhe a sessão com outras requisições.
+            db.expunge(user)
+        identity_cache.set(token_data.email, user)
+
+    # Leituras seguintes deste usuário ficam no primário por um tempo
+    if request.method not in SAFE_METHODS:
+        replica_router.note_write(user.id)
+
+    return user
+
+
+async def get_read_db(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Sessão para rotas somente-leitura: usa a réplica quando configurada,
+    com atraso aceitável e sem escrita recente do usuário; caso contrário,
+    a mesma sessão do primário da requisição.
+    """
+    if async_replica_engine is not None:
+        fresh = await replica_router.replica_is_fresh_async(async_replica_engine)
+    elif replica_engine is not None:
+        fresh = await run_in_threadpool(replica_router.replica_is_fresh, replica_engine)
+    else:
+        yield db
+        return
+
+    use_replica = fresh and not replica_router.recently_wrote(current_user.id)
+    if not replica_router.record_decision(use_replica):
+        yield db
+        return
+
+    if AsyncReplicaSessionLocal is not None:
+        async with AsyncReplicaSessionLocal() as replica_db:
+            yield replica_db
+    else:
+        replica_db = ReplicaSessionLocal()
+        try:
+            yield replica_db
+        finally:
+            await run_in_threadpool(replica_db.close)
\ No newline at end of file
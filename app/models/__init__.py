@@ -11,6 +11,8 @@ from app.models.extrajudicial import (
     JurisprudenceDocument,
     Intimation
 )
+from app.models.auth import RevokedRefreshToken, RevokedTokenFamily
+from app.models.dashboard import DashboardCounter
 
 __all__ = [
     "User",
@@ -22,4 +24,7 @@ __all__ = [
     "ExtrajudicialCase",
     "JurisprudenceDocument",
     "Intimation",
+    "RevokedRefreshToken",
+    "RevokedTokenFamily",
+    "DashboardCounter",
 ]
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""
+Modelos de revogação de refresh tokens (rotação com detecção de reuso).
+"""
+
+from sqlalchemy import Column, String, DateTime
+
+from app.core.normalization import utc_now
+from app.database import Base
+
+
+class RevokedRefreshToken(Base):
+    """Refresh token já usado em uma rotação (identificado pelo `jti`)."""
+    __tablename__ = "revoked_refresh_tokens"
+
+    jti = Column(String, primary_key=True)
+    family_id = Column(String, index=True, nullable=False)
+    revoked_at = Column(DateTime, default=utc_now, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
+
+
+class RevokedTokenFamily(Base):
+    """Família de tokens invalidada (ex: reuso de um refresh token rotacionado)."""
+    __tablename__ = "revoked_token_families"
+
+    family_id = Column(String, primary_key=True)
+    reason = Column(String, nullable=True)
+    revoked_at = Column(DateTime, default=utc_now, index=True, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
@@ -4,8 +4,8 @@ Modelo de Cliente.
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, func, text
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from app.database import Base
@@ -13,9 +13,19 @@ from app.database import Base
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (
+        # Paginação por cursor da listagem (ver crud.client.CLIENT_SORT_OPTIONS)
+        Index("ix_clients_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_clients_owner_id_full_name_sort_id", "owner_id", text("coalesce(full_name, '')"), "id"),
+        # Os índices GIN de trigramas da busca (pg_trgm/unaccent) existem
+        # apenas na migração 4bdbc89cfb4f, por dependerem de extensões
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     full_name = Column(String, index=True)
+    # Chave da ordenação por nome: full_name é anulável e a comparação
+    # por tupla do cursor descartaria as linhas com NULL
+    full_name_sort = column_property(func.coalesce(full_name, ""))
     email = Column(String, index=True, nullable=True)
     phone = Column(String, nullable=True)
     cpf = Column(String, unique=True, index=True, nullable=True)
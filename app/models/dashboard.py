@@ -0,0 +1,25 @@
+"""
+Modelo dos contadores do painel inicial (dashboard).
+"""
+
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+
+class DashboardCounter(Base):
+    """
+    Um contador do painel de um usuário: `metric` identifica o indicador
+    e `bucket` a subdivisão (status do processo ou dia, AAAA-MM-DD).
+
+    No PostgreSQL é mantido por triggers nas tabelas de origem (migração
+    e0a1c52f7b93); GET /dashboard lê todos os contadores do usuário pela
+    chave primária. Ver app.services.dashboard.
+    """
+    __tablename__ = "dashboard_counters"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    metric = Column(String, primary_key=True)
+    bucket = Column(String, primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
@@ -4,7 +4,7 @@ Modelos de casos extrajudiciais, jurisprudência e intimações.
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 
@@ -13,6 +13,11 @@ from app.database import Base
 
 class ExtrajudicialCase(Base):
     __tablename__ = "extrajudicial_cases"
+    __table_args__ = (
+        # Paginação por cursor da listagem (ver crud.extrajudicial.CASE_SORT_OPTIONS)
+        Index("ix_extrajudicial_cases_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_extrajudicial_cases_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -38,10 +43,16 @@ class JurisprudenceDocument(Base):
 
 
 class Intimation(Base):
+    # No PostgreSQL, particionada por mês em `publication_date` (ver
+    # app.services.partitions): a chave primária é (id, publication_date)
     __tablename__ = "intimations"
+    __table_args__ = (
+        # Contagens por período (crud.extrajudicial.get_intimations_stats)
+        Index("ix_intimations_owner_id_publication_date", "owner_id", "publication_date"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    publication_date = Column(DateTime, nullable=False, index=True)
+    publication_date = Column(DateTime, nullable=False)
     process_number = Column(String, index=True)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
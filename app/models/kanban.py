@@ -2,7 +2,7 @@
 Modelos do quadro Kanban (colunas e cartões).
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -11,23 +11,37 @@ from app.database import Base
 
 class TaskColumn(Base):
     __tablename__ = "task_columns"
+    __table_args__ = (
+        Index("ix_task_columns_owner_id_rank", "owner_id", "rank"),
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
-    position = Column(Integer, nullable=False)
+    # Chave de ordenação fracionária (app.core.ranking)
+    rank = Column(String, nullable=False)
 
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     owner = relationship("User", back_populates="task_columns")
     
-    cards = relationship("TaskCard", cascade="all, delete-orphan", backref="column")
+    cards = relationship(
+        "TaskCard",
+        cascade="all, delete-orphan",
+        backref="column",
+        order_by="(TaskCard.rank, TaskCard.id)",
+    )
 
 
 class TaskCard(Base):
     __tablename__ = "task_cards"
+    __table_args__ = (
+        Index("ix_task_cards_column_id_rank", "column_id", "rank"),
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     due_date = Column(DateTime, nullable=True)
+    # Chave de ordenação fracionária dentro da coluna (app.core.ranking)
+    rank = Column(String, nullable=False)
     
-    column_id = Column(Integer, ForeignKey("task_columns.id"), nullable=False)
\ No newline at end of file
+    column_id = Column(Integer, ForeignKey("task_columns.id"), nullable=False)
@@ -2,34 +2,76 @@
 Modelos de Processo e Andamentos.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, SmallInteger, String, ForeignKey, Text, DateTime, Index, text
+from sqlalchemy.orm import query_expression, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
+from app.core.normalization import process_update_hash
 from app.database import Base
 
 
+def _content_hash_default(context) -> str:
+    params = context.get_current_parameters()
+    return process_update_hash(params["date"], params["description"])
+
+
 class Process(Base):
     __tablename__ = "processes"
+    __table_args__ = (
+        # Paginação por cursor da listagem (ver crud.process.PROCESS_SORT_OPTIONS)
+        Index("ix_processes_owner_id_id", "owner_id", "id"),
+        Index("ix_processes_owner_id_number", "owner_id", "number"),
+        # Filtros por tribunal e ano do número CNJ (ex: TJSP de 2023)
+        Index("ix_processes_owner_id_cnj_court_year", "owner_id", "cnj_segment", "cnj_tribunal", "cnj_year"),
+        Index("ix_processes_owner_id_cnj_year", "owner_id", "cnj_year"),
+        # Filtro por situação na listagem
+        Index("ix_processes_owner_id_status", "owner_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True)
     number = Column(String, index=True, unique=True, nullable=False)
     client_name = Column(String, index=True, nullable=False)
     type = Column(String, nullable=False)
     status = Column(String, default="Ativo")
+
+    # Componentes do número CNJ (ver app.core.cnj); NULL para números
+    # fora do padrão (numeração anterior a 2010)
+    cnj_sequential = Column(Integer, nullable=True)
+    cnj_year = Column(SmallInteger, nullable=True)
+    cnj_segment = Column(SmallInteger, nullable=True)
+    cnj_tribunal = Column(SmallInteger, nullable=True)
+    cnj_origin = Column(SmallInteger, nullable=True)
     
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     owner = relationship("User", back_populates="processes")
 
+    # Carregamento sob demanda: quem devolve os andamentos pede
+    # selectinload (crud.process), para não somar um SELECT a cada
+    # processo lido. Lazy load fora do run_sync falha no modo assíncrono.
     updates = relationship("ProcessUpdate", back_populates="process", cascade="all, delete-orphan")
 
+    # Andamento mais recente e total de andamentos: preenchidos apenas pela
+    # listagem (crud.process, via LATERAL); fora dela ficam None
+    latest_update = relationship("ProcessUpdate", uselist=False, viewonly=True, lazy="noload")
+    updates_count = query_expression()
+
 
 class ProcessUpdate(Base):
+    # No PostgreSQL, particionada por mês em `date` (ver app.services.partitions):
+    # a chave primária é (id, date) e os índices únicos incluem `date`
     __tablename__ = "process_updates"
+    __table_args__ = (
+        # Andamento mais recente de cada processo (LATERAL ... ORDER BY date DESC LIMIT 1)
+        Index("ix_process_updates_process_id_date", "process_id", text("date DESC"), text("id DESC")),
+        # Um mesmo andamento não é gravado duas vezes (ON CONFLICT DO NOTHING)
+        Index("ix_process_updates_process_id_content_hash", "process_id", "content_hash", "date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     date = Column(DateTime, nullable=False)
     description = Column(Text, nullable=False)
+    # Ver app.core.normalization.process_update_hash
+    content_hash = Column(String(64), nullable=False, default=_content_hash_default)
 
     process_id = Column(Integer, ForeignKey("processes.id"), nullable=False)
     process = relationship("Process", back_populates="updates")
\ No newline at end of file
@@ -11,6 +11,8 @@ from app.routers import (
     ai,
     extrajudicial,
     documents,
+    metrics,
+    dashboard,
 )
 
 __all__ = [
@@ -22,4 +24,6 @@ __all__ = [
     "ai",
     "extrajudicial",
     "documents",
+    "metrics",
+    "dashboard",
 ]
\ No newline at end of file
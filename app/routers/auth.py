@@ -2,40 +2,44 @@
 Endpoints de autenticação (login, signup, refresh token).
 """
 
+import uuid
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app import crud, schemas
 from app.core.security import create_access_token, create_refresh_token, decode_refresh_token
+from app.database import run_db
 from app.dependencies import get_db
+from app.services.token_revocation import legacy_token_ids, token_revocation_store
 
 router = APIRouter(prefix="", tags=["Autenticação"])
 
 
 @router.post("/users/", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """
     Cria um novo usuário (signup).
     """
-    db_user = crud.get_user_by_email(db, email=user.email)
+    db_user = await crud.aio.get_user_by_email(db=db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=400,
             detail="Este email já está cadastrado."
         )
-    return crud.create_user(db=db, user=user)
+    return await crud.create_user_async(db=db, user=user)
 
 
 @router.post("/token", response_model=schemas.TokenResponse)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Autentica usuário e retorna access_token + refresh_token.
     """
-    user, error = crud.authenticate_user(
+    user, error = await crud.authenticate_user_async(
         db,
         email=form_data.username,
         password=form_data.password
@@ -59,9 +63,10 @@ def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Gerar ambos os tokens
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.email})
+    # Gerar ambos os tokens (nova família de rotação)
+    family_id = uuid.uuid4().hex
+    access_token = create_access_token(data={"sub": user.email, "fam": family_id})
+    refresh_token = create_refresh_token(data={"sub": user.email, "fam": family_id})
     
     return {
         "access_token": access_token,
@@ -71,7 +76,7 @@ def login_for_access_token(
 
 
 @router.post("/token/refresh", response_model=schemas.TokenResponse)
-def refresh_access_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_access_token(refresh_token: str, db: Session = Depends(get_db)):
     """
     Renova o access token usando um refresh token válido.
     Implementa Refresh Token Rotation (RTR).
@@ -92,17 +97,39 @@ def refresh_access_token(refresh_token: str, db: Session = Depends(get_db)):
             detail="Refresh token inválido.",
         )
     
+    if not (payload.get("jti") and payload.get("fam")):
+        # Tokens emitidos antes da rotação: identificadores derivados do
+        # próprio token, para que também só rotacionem uma vez
+        payload = legacy_token_ids(refresh_token, payload)
+    family_id = payload["fam"]
+
+    # Cada refresh token só pode ser usado uma vez. Reuso de um token
+    # já rotacionado indica vazamento: a família inteira é revogada.
+    error = await run_db(db, token_revocation_store.check_and_rotate, payload)
+    if error == "revoked":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token revogado.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if error == "reused":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token já utilizado. Faça login novamente.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     # Validar se usuário ainda existe
-    user = crud.get_user_by_email(db, email=email)
+    user = await crud.aio.get_user_by_email(db=db, email=email)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário não encontrado.",
         )
     
-    # Gerar novos tokens (RTR)
-    new_access_token = create_access_token(data={"sub": user.email})
-    new_refresh_token = create_refresh_token(data={"sub": user.email})
+    # Gerar novos tokens (RTR), mantendo a família
+    new_access_token = create_access_token(data={"sub": user.email, "fam": family_id})
+    new_refresh_token = create_refresh_token(data={"sub": user.email, "fam": family_id})
     
     return {
         "access_token": new_access_token,
@@ -2,19 +2,25 @@
 Endpoints de gerenciamento de clientes.
 """
 
-from typing import List
+from typing import List, Literal, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
-from app.dependencies import get_db, get_current_user
+from app.core.http_cache import not_modified_response
+from app.core.pagination import set_page_headers
+from app.core.sparse_fields import parse_fields, sparse_response
+from app.core.query_stats import query_budget
+from app.dependencies import get_db, get_current_user, get_read_db, on_demand_db
+from app.services import client_dedup, client_export, client_import
 
 router = APIRouter(prefix="/api/v1/clients", tags=["Clientes"])
 
 
 @router.post("", response_model=schemas.Client, status_code=status.HTTP_201_CREATED)
-def create_client(
+async def create_client(
     client: schemas.ClientCreate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
@@ -22,37 +28,180 @@ def create_client(
     """
     Cria um novo cliente para o usuário autenticado.
     """
-    return crud.create_user_client(db=db, client=client, user_id=current_user.id)
+    return await crud.aio.create_user_client(db=db, client=client, user_id=current_user.id)
 
 
-@router.get("", response_model=List[schemas.Client])
-def read_clients(
-    skip: int = 0,
-    limit: int = 100,
+@router.get("", response_model=List[schemas.Client], dependencies=[Depends(query_budget(4))])
+async def read_clients(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    sort: Literal["created_at", "-created_at", "full_name", "-full_name"] = "created_at",
+    limit: int = Query(100, ge=1, le=500),
+    skip: int = Query(0, ge=0, deprecated=True),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex: fullName,cpf). O id é sempre incluído."),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Lista os clientes do usuário autenticado.
+
+    Paginação por cursor: a resposta traz `X-Has-More` e, se houver mais
+    resultados, `X-Next-Cursor`, a ser enviado como `cursor` na próxima
+    chamada (com o mesmo `sort`). `skip` (OFFSET) é mantido apenas por
+    compatibilidade.
+
+    Com `If-None-Match` igual ao ETag anterior e sem alterações nos
+    clientes, responde 304 sem buscar a página.
+
+    `fields` restringe os campos da resposta e as colunas lidas do banco
+    (ex: `fields=fullName` não lê o endereço).
+    """
+    selected = parse_fields(fields, schemas.Client)
+    version = await crud.aio.get_user_clients_version(db=db, user_id=current_user.id)
+    not_modified = not_modified_response(request, response, current_user.id, *version)
+    if not_modified is not None:
+        return not_modified
+
+    if skip and not cursor:
+        items = await crud.aio.get_user_clients(
+            db=db,
+            user_id=current_user.id,
+            skip=skip,
+            limit=limit,
+            fields=selected
+        )
+    else:
+        page = await crud.aio.get_user_clients_page(
+            db=db,
+            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            fields=selected
+        )
+        set_page_headers(response, page)
+        items = page.items
+
+    if selected is not None:
+        return sparse_response(items, schemas.Client, selected, response)
+    return items
+
+
+@router.post("/import", response_model=schemas.ClientImportReport)
+async def import_clients(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
-    Lista todos os clientes do usuário autenticado.
+    Importa clientes em massa de um arquivo CSV (separador "," ou ";",
+    colunas com os nomes dos campos e `address.<campo>` para o endereço)
+    ou NDJSON (um objeto por linha).
+
+    Clientes com CPF já cadastrado pelo usuário são atualizados. Linhas
+    inválidas não interrompem a importação: são listadas no relatório.
+    O formato é deduzido da extensão do arquivo se `format` não for informado.
     """
-    return crud.get_user_clients(
+    file_format = format
+    if file_format is None:
+        filename = (file.filename or "").lower()
+        content_type = (file.content_type or "").lower()
+        if filename.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type:
+            file_format = "ndjson"
+        elif filename.endswith(".csv") or "csv" in content_type:
+            file_format = "csv"
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail="Formato não reconhecido. Informe format=csv ou format=ndjson."
+            )
+
+    report = await client_import.import_clients(
+        db=db,
+        fileobj=file.file,
+        file_format=file_format,
+        user_id=current_user.id
+    )
+    return report
+
+
+@router.get("/export")
+async def export_clients(
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Exporta todos os clientes do usuário autenticado em CSV ou NDJSON,
+    no mesmo formato aceito por /import.
+
+    A resposta é enviada em streaming, lida do banco com cursor do lado
+    do servidor. A sessão é aberta pelo próprio stream (e não via
+    Depends), pois precisa continuar aberta enquanto o corpo é enviado.
+    """
+    user_id = current_user.id
+
+    async def body():
+        async with on_demand_db(request) as db:
+            async for chunk in client_export.stream_clients(db, user_id, format):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=client_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="clientes.{format}"'},
+    )
+
+
+@router.get("/search", response_model=List[schemas.Client], dependencies=[Depends(query_budget(3))])
+async def search_clients(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Busca clientes por nome, CPF, email ou telefone, ignorando acentos
+    e tolerando erros de digitação. Retorna os mais relevantes primeiro.
+    """
+    return await crud.aio.search_user_clients(
         db=db,
         user_id=current_user.id,
-        skip=skip,
+        q=q,
         limit=limit
     )
 
 
-@router.get("/{clientId}", response_model=schemas.Client)
-def read_client(
+@router.get("/duplicates", response_model=List[schemas.ClientDuplicateGroup], dependencies=[Depends(query_budget(4))])
+async def find_duplicate_clients(
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Lista grupos de clientes que provavelmente são a mesma pessoa
+    (mesmo CPF, ou nomes parecidos com ou sem email/telefone em comum),
+    candidatos à mesclagem. Não altera nenhum cliente.
+    """
+    return await client_dedup.find_user_duplicates(
+        db=db,
+        user_id=current_user.id,
+        limit=limit
+    )
+
+
+@router.get("/{clientId}", response_model=schemas.Client, dependencies=[Depends(query_budget(3))])
+async def read_client(
     clientId: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
     Retorna os dados de um cliente específico.
     """
-    db_client = crud.get_client_by_id(
+    db_client = await crud.aio.get_client_by_id(
         db=db,
         client_id=clientId,
         user_id=current_user.id
@@ -66,7 +215,7 @@ def read_client(
 
 
 @router.put("/{clientId}", response_model=schemas.Client)
-def update_client(
+async def update_client(
     clientId: UUID,
     client: schemas.ClientUpdate,
     db: Session = Depends(get_db),
@@ -75,7 +224,7 @@ def update_client(
     """
     Atualiza os dados de um cliente.
     """
-    updated_client = crud.update_client(
+    updated_client = await crud.aio.update_client(
         db=db,
         client_id=clientId,
         client_update=client,
@@ -90,7 +239,7 @@ def update_client(
 
 
 @router.delete("/{clientId}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_client(
+async def delete_client(
     clientId: UUID,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
@@ -98,7 +247,7 @@ def delete_client(
     """
     Deleta um cliente.
     """
-    deleted_client = crud.delete_client(
+    deleted_client = await crud.aio.delete_client(
         db=db,
         client_id=clientId,
         user_id=current_user.id
@@ -0,0 +1,32 @@
+"""
+Endpoint do painel inicial.
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.core.normalization import utc_now
+from app.core.query_stats import query_budget
+from app.dependencies import get_current_user, get_read_db
+from app.services.dashboard import build_dashboard
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+@router.get("", response_model=schemas.DashboardSummary, dependencies=[Depends(query_budget(3))])
+async def read_dashboard(
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Indicadores da tela inicial: processos por status, casos
+    extrajudiciais em aberto, cartões que vencem nesta semana e
+    intimações dos últimos 7 e 30 dias (datas em UTC).
+
+    Os contadores são mantidos a cada escrita, então o painel é uma
+    única leitura, em vez de uma agregação por indicador.
+    """
+    today = utc_now().date()
+    counters = await crud.aio.get_dashboard_counters(db=db, user_id=current_user.id, today=today)
+    return build_dashboard(counters, today)
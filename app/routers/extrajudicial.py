@@ -2,18 +2,22 @@
 Endpoints do assistente extrajudicial.
 """
 
+from typing import List, Literal, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
-from app.dependencies import get_db, get_current_user
+from app.core.pagination import set_page_headers
+from app.core.query_stats import query_budget
+from app.core.sparse_fields import parse_fields, sparse_response
+from app.dependencies import get_db, get_current_user, get_read_db
 
 router = APIRouter(prefix="/api/v1/extrajudicial-cases", tags=["Assistente Extrajudicial"])
 
 
 @router.post("", response_model=schemas.CaseResponse, status_code=status.HTTP_201_CREATED)
-def create_case(
+async def create_case(
     case: schemas.CaseCreateRequest,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
@@ -21,19 +25,53 @@ def create_case(
     """
     Cria um novo caso extrajudicial (inventário, divórcio, usucapião).
     """
-    return crud.create_extrajudicial_case(db=db, case=case, user_id=current_user.id)
+    return await crud.aio.create_extrajudicial_case(db=db, case=case, user_id=current_user.id)
+
+
+@router.get("", response_model=List[schemas.CaseResponse], dependencies=[Depends(query_budget(3))])
+async def list_cases(
+    response: Response,
+    cursor: Optional[str] = None,
+    sort: Literal["created_at", "-created_at", "updated_at", "-updated_at"] = "-updated_at",
+    limit: int = Query(100, ge=1, le=500),
+    case_type: Optional[str] = Query(None, alias="caseType"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex: caseName,status). O id é sempre incluído."),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Lista os casos extrajudiciais do usuário autenticado, com paginação
+    por cursor (`X-Has-More` / `X-Next-Cursor`).
+
+    `fields` restringe os campos da resposta e as colunas lidas do banco
+    (ex: sem `data`, o JSONB do caso não é lido).
+    """
+    selected = parse_fields(fields, schemas.CaseResponse)
+    page = await crud.aio.get_user_cases_page(
+        db=db,
+        user_id=current_user.id,
+        limit=limit,
+        cursor=cursor,
+        sort=sort,
+        case_type=case_type,
+        fields=selected
+    )
+    set_page_headers(response, page)
+    if selected is not None:
+        return sparse_response(page.items, schemas.CaseResponse, selected, response)
+    return page.items
 
 
 @router.get("/{case_id}", response_model=schemas.CaseResponse)
-def get_case(
+async def get_case(
     case_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
     Retorna os dados de um caso extrajudicial.
     """
-    db_case = crud.get_extrajudicial_case(db=db, case_id=case_id, user_id=current_user.id)
+    db_case = await crud.aio.get_extrajudicial_case(db=db, case_id=case_id, user_id=current_user.id)
     if db_case is None:
         raise HTTPException(
             status_code=404,
@@ -43,7 +81,7 @@ def get_case(
 
 
 @router.put("/{case_id}", response_model=schemas.CaseResponse)
-def update_case(
+async def update_case(
     case_id: UUID,
     case_data: schemas.CaseUpdateRequest,
     db: Session = Depends(get_db),
@@ -52,4 +90,15 @@ def update_case(
     """
     Atualiza o campo data de um caso extrajudicial.
     """
-    updated_case = crud.update_e
\ No newline at end of file
+    updated_case = await crud.aio.update_extrajudicial_case(
+        db=db,
+        case_id=case_id,
+        case_data=case_data,
+        user_id=current_user.id
+    )
+    if updated_case is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Caso não encontrado ou permissão negada."
+        )
+    return updated_case
\ No newline at end of file
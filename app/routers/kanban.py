@@ -7,24 +7,52 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
-from app.dependencies import get_db, get_current_user
+from app.core.query_stats import query_budget
+from app.dependencies import get_db, get_current_user, get_read_db
 
 router = APIRouter(prefix="", tags=["Kanban"])
 
 
-@router.get("/board/", response_model=List[schemas.TaskColumnWithCards])
-def get_board(
-    db: Session = Depends(get_db),
+@router.get(
+    "/board/",
+    response_model=List[schemas.TaskColumnWithCards],
+    dependencies=[Depends(query_budget(4))],
+)
+async def get_board(
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
     Retorna todas as colunas e cartões do quadro Kanban do usuário.
     """
-    return crud.get_board_for_user(db=db, user_id=current_user.id)
+    return await crud.aio.get_board_for_user(db=db, user_id=current_user.id)
+
+
+@router.patch("/board/reorder", response_model=schemas.BoardReorderResult)
+async def reorder_board(
+    reorder: schemas.BoardReorder,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Aplica vários movimentos de colunas e cartões em uma transação.
+
+    Cada movimento coloca o item entre `previous_id` e `next_id` (sem
+    nenhum dos dois, no fim da lista); cartões também informam a coluna
+    de destino. Vizinhos fora de ordem (o quadro mudou desde a leitura)
+    resultam em 409 e nada é gravado.
+    """
+    result = await crud.aio.reorder_board(db=db, reorder=reorder, user_id=current_user.id)
+    if result is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Coluna ou cartão não encontrado ou permissão negada."
+        )
+    return result
 
 
 @router.post("/columns/", response_model=schemas.TaskColumn, status_code=status.HTTP_201_CREATED)
-def create_column(
+async def create_column(
     column: schemas.TaskColumnCreate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
@@ -32,11 +60,11 @@ def create_column(
     """
     Cria uma nova coluna no quadro Kanban.
     """
-    return crud.create_task_column(db=db, column=column, user_id=current_user.id)
+    return await crud.aio.create_task_column(db=db, column=column, user_id=current_user.id)
 
 
 @router.patch("/columns/{column_id}", response_model=schemas.TaskColumn)
-def update_column(
+async def update_column(
     column_id: int,
     column_update: schemas.TaskColumnUpdate,
     db: Session = Depends(get_db),
@@ -45,7 +73,7 @@ def update_column(
     """
     Atualiza o título de uma coluna.
     """
-    updated_column = crud.update_task_column(
+    updated_column = await crud.aio.update_task_column(
         db=db,
         column_id=column_id,
         column_update=column_update,
@@ -60,7 +88,7 @@ def update_column(
 
 
 @router.delete("/columns/{column_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_column(
+async def delete_column(
     column_id: int,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
@@ -68,7 +96,7 @@ def delete_column(
     """
     Deleta uma coluna e todos os seus cartões.
     """
-    deleted_column = crud.delete_task_column(
+    deleted_column = await crud.aio.delete_task_column(
         db=db,
         column_id=column_id,
         user_id=current_user.id
@@ -82,7 +110,7 @@ def delete_column(
 
 
 @router.post("/columns/{column_id}/cards/", response_model=schemas.TaskCard, status_code=status.HTTP_201_CREATED)
-def create_card(
+async def create_card(
     column_id: int,
     card: schemas.TaskCardCreate,
     db: Session = Depends(get_db),
@@ -91,7 +119,7 @@ def create_card(
     """
     Cria um novo cartão em uma coluna.
     """
-    db_card = crud.create_task_card(
+    db_card = await crud.aio.create_task_card(
         db=db,
         card=card,
         column_id=column_id,
@@ -106,7 +134,7 @@ def create_card(
 
 
 @router.patch("/cards/{card_id}", response_model=schemas.TaskCard)
-def update_card(
+async def update_card(
     card_id: int,
     card_update: schemas.TaskCardUpdate,
     db: Session = Depends(get_db),
@@ -115,7 +143,7 @@ def update_card(
     """
     Atualiza os detalhes de um cartão.
     """
-    updated_card = crud.update_task_card(
+    updated_card = await crud.aio.update_task_card(
         db=db,
         card_id=card_id,
         card_update=card_update,
@@ -129,8 +157,12 @@ def update_card(
     return updated_card
 
 
-@router.patch("/cards/{card_id}/move", response_model=schemas.TaskCard)
-def move_card(
+@router.patch(
+    "/cards/{card_id}/move",
+    response_model=schemas.TaskCard,
+    dependencies=[Depends(query_budget(3))],
+)
+async def move_card(
     card_id: int,
     move_data: schemas.TaskCardMove,
     db: Session = Depends(get_db),
@@ -139,7 +171,7 @@ def move_card(
     """
     Move um cartão para outra coluna.
     """
-    moved_card = crud.move_task_card(
+    moved_card = await crud.aio.move_task_card(
         db=db,
         card_id=card_id,
         new_column_id=move_data.new_column_id,
@@ -154,7 +186,7 @@ def move_card(
 
 
 @router.delete("/cards/{card_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_card(
+async def delete_card(
     card_id: int,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
@@ -162,7 +194,7 @@ def delete_card(
     """
     Deleta um cartão.
     """
-    deleted_card = crud.delete_task_card(
+    deleted_card = await crud.aio.delete_task_card(
         db=db,
         card_id=card_id,
         user_id=current_user.id
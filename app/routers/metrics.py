@@ -0,0 +1,90 @@
+"""
+Endpoints internos de monitoramento (métricas de runtime).
+"""
+
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, status
+
+from app.core.config import settings
+from app.core.db_metrics import pool_metrics
+from app.core.identity_cache import identity_cache
+from app.core.query_stats import query_stats_totals
+from app.core.security import password_executor_stats
+from app.database import (
+    async_engine,
+    async_pool_metrics,
+    async_replica_engine,
+    engine,
+    replica_engine,
+    replica_pool_metrics,
+    replica_router,
+)
+from app.services.dashboard import run_reconciliation
+from app.services.kanban_ranks import run_rebalance
+from app.services.partitions import run_maintenance
+from app.services.token_revocation import token_revocation_store
+
+router = APIRouter(prefix="/internal", tags=["Monitoramento"], include_in_schema=False)
+
+
+def _check_metrics_token(token: Optional[str]) -> None:
+    """
+    Exige o cabeçalho X-Metrics-Token igual a METRICS_TOKEN. Sem
+    METRICS_TOKEN configurado, os endpoints internos ficam fechados.
+    """
+    if not settings.METRICS_TOKEN or not secrets.compare_digest(token or "", settings.METRICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado.")
+
+
+@router.get("/metrics")
+def read_metrics(x_metrics_token: Optional[str] = Header(None)):
+    """
+    Retorna contadores internos para monitoramento.
+    """
+    _check_metrics_token(x_metrics_token)
+    metrics = {
+        "auth_cache": identity_cache.stats(),
+        "password_hashing": password_executor_stats(),
+        "token_revocation": token_revocation_store.stats(),
+        "db_pool": pool_metrics.snapshot(engine.pool),
+        "db_queries": query_stats_totals(),
+    }
+    if async_engine is not None:
+        metrics["db_async_pool"] = async_pool_metrics.snapshot(async_engine.sync_engine.pool)
+    replica = replica_engine or (async_replica_engine and async_replica_engine.sync_engine)
+    if replica is not None:
+        metrics["db_replica"] = {
+            **replica_router.stats(),
+            "pool": replica_pool_metrics.snapshot(replica.pool),
+        }
+    return metrics
+
+
+@router.post("/partitions/maintenance")
+def run_partition_maintenance(x_metrics_token: Optional[str] = Header(None)):
+    """
+    Executa a manutenção das partições mensais (criação dos próximos
+    meses e retenção) imediatamente, sem esperar o ciclo periódico.
+    """
+    _check_metrics_token(x_metrics_token)
+    return run_maintenance(engine)
+
+
+@router.post("/dashboard/reconcile")
+def run_dashboard_reconciliation(x_metrics_token: Optional[str] = Header(None)):
+    """
+    Recalcula os contadores do painel de todos os usuários e corrige
+    as divergências, sem esperar o ciclo periódico.
+    """
+    _check_metrics_token(x_metrics_token)
+    return run_reconciliation()
+
+
+@router.post("/kanban/rebalance")
+def run_kanban_rebalance(x_metrics_token: Optional[str] = Header(None)):
+    """
+    Rebalanceia as chaves de ordenação do Kanban imediatamente.
+    """
+    _check_metrics_token(x_metrics_token)
+    return run_rebalance()
@@ -2,18 +2,24 @@
 Endpoints de gerenciamento de processos.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, status
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
-from app.dependencies import get_db, get_current_user
+from app.core.cnj import InvalidCNJNumberError, parse_court
+from app.core.pagination import set_page_headers
+from app.core.sparse_fields import parse_fields, sparse_response
+from app.core.query_stats import query_budget
+from app.core.config import settings
+from app.dependencies import get_db, get_current_user, get_read_db
+from app.services import datajud_sync
 
 router = APIRouter(prefix="/processes", tags=["Processos"])
 
 
 @router.post("/", response_model=schemas.Process, status_code=status.HTTP_201_CREATED)
-def create_process(
+async def create_process(
     process: schemas.ProcessCreate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
@@ -21,22 +27,116 @@ def create_process(
     """
     Cria um novo processo para o usuário autenticado.
     """
-    return crud.create_user_process(db=db, process=process, user_id=current_user.id)
+    return await crud.aio.create_user_process(db=db, process=process, user_id=current_user.id)
 
 
-@router.get("/", response_model=List[schemas.Process])
-def read_processes(
-    skip: int = 0,
-    limit: int = 100,
+@router.post("/updates/bulk", response_model=schemas.ProcessUpdateIngestReport)
+async def ingest_process_updates(
+    payload: schemas.ProcessUpdateBulk,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
-    Lista todos os processos do usuário autenticado.
+    Grava andamentos de vários processos do usuário de uma vez.
+
+    A operação é idempotente: andamentos já gravados (mesmo processo,
+    data/hora e descrição) são ignorados e contados em `skipped`, então
+    a mesma lista pode ser reenviada a cada sincronização com a fonte.
+    Andamentos de processos inexistentes ou de outro usuário são
+    contados em `rejected`.
     """
-    return crud.get_user_processes(
+    return await crud.aio.ingest_user_process_updates(
         db=db,
-        user_id=current_user.id,
-        skip=skip,
-        limit=limit
-    )
\ No newline at end of file
+        updates=payload.updates,
+        user_id=current_user.id
+    )
+
+
+@router.post("/sync", response_model=schemas.ProcessSyncReport)
+async def sync_processes(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Busca no DataJud os movimentos de todos os processos do usuário com
+    número no padrão CNJ e grava os novos como andamentos.
+
+    A sincronização é incremental (só movimentos a partir do último
+    andamento gravado de cada processo) e idempotente. Processos com
+    falha no DataJud não interrompem os demais: aparecem em `errors`.
+    """
+    if not settings.DATAJUD_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="A chave da API do DataJud não está configurada.",
+        )
+    return await datajud_sync.sync_user_processes(db=db, user_id=current_user.id)
+
+
+@router.get("/", response_model=List[schemas.Process], dependencies=[Depends(query_budget(4))])
+async def read_processes(
+    response: Response,
+    cursor: Optional[str] = None,
+    sort: Literal["id", "-id", "number", "-number"] = "id",
+    limit: int = Query(100, ge=1, le=500),
+    skip: int = Query(0, ge=0, deprecated=True),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex: number,status). O id é sempre incluído."),
+    status_filter: Optional[str] = Query(None, alias="status", description="Situação do processo (ex: Ativo)."),
+    type: Optional[str] = Query(None, description="Tipo do processo (ex: Cível)."),
+    court: Optional[str] = Query(None, description="Sigla do tribunal do número CNJ (ex: TJSP, TRF3, TRT2)."),
+    year: Optional[int] = Query(None, ge=1900, le=2999, description="Ano de ajuizamento do número CNJ."),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Lista os processos do usuário autenticado.
+
+    Paginação por cursor: ver `X-Has-More` / `X-Next-Cursor` na resposta.
+    `skip` (OFFSET) é mantido apenas por compatibilidade.
+
+    `fields` restringe os campos da resposta e as colunas lidas do banco.
+    Sem `fields`, a resposta traz todos os campos, inclusive os
+    andamentos (`updates`, buscados em uma query para a página inteira);
+    com `fields`, eles só são buscados se `updates` estiver entre os campos.
+
+    Cada processo traz o andamento mais recente (`latest_update`) e o
+    total de andamentos (`updates_count`), obtidos na mesma query da
+    listagem (LATERAL no PostgreSQL), sem uma query extra por processo.
+    `status` e `type` filtram pela situação e pelo tipo do processo.
+
+    `court` e `year` filtram pelos componentes do número CNJ (ex:
+    `court=TJSP&year=2023`), usando os índices das colunas cnj_*.
+    """
+    selected = parse_fields(fields, schemas.Process)
+    filters = {"status": status_filter, "type": type, "cnj_year": year}
+    if court:
+        try:
+            filters["cnj_segment"], filters["cnj_tribunal"] = parse_court(court)
+        except InvalidCNJNumberError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    if skip and not cursor:
+        items = await crud.aio.get_user_processes(
+            db=db,
+            user_id=current_user.id,
+            skip=skip,
+            limit=limit,
+            fields=selected,
+            **filters
+        )
+    else:
+        page = await crud.aio.get_user_processes_page(
+            db=db,
+            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            fields=selected,
+            **filters
+        )
+        set_page_headers(response, page)
+        items = page.items
+
+    if selected is not None:
+        return sparse_response(items, schemas.Process, selected, response)
+    return items
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/users", tags=["Usuários"])
 
 
 @router.get("/me", response_model=schemas.User)
-def read_users_me(current_user: models.User = Depends(get_current_user)):
+async def read_users_me(current_user: models.User = Depends(get_current_user)):
     """
     Retorna os dados do usuário autenticado.
     """
@@ -20,7 +20,7 @@ def read_users_me(current_user: models.User = Depends(get_current_user)):
 
 
 @router.patch("/me", response_model=schemas.User)
-def update_users_me(
+async def update_users_me(
     user_update: schemas.UserUpdate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
@@ -28,7 +28,7 @@ def update_users_me(
     """
     Atualiza o perfil do usuário autenticado.
     """
-    updated_user = crud.update_user_profile(
+    updated_user = await crud.aio.update_user_profile(
         db=db,
         user_id=current_user.id,
         user_update=user_update
@@ -42,7 +42,7 @@ def update_users_me(
 
 
 @router.patch("/me/password", status_code=status.HTTP_204_NO_CONTENT)
-def update_password(
+async def update_password(
     password_update: schemas.UserPasswordUpdate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
@@ -50,7 +50,7 @@ def update_password(
     """
     Atualiza a senha do usuário autenticado.
     """
-    success = crud.update_user_password(
+    success = await crud.update_user_password_async(
         db=db,
         user=current_user,
         password_update=password_update
@@ -60,4 +60,21 @@ def update_password(
             status_code=400,
             detail="Senha atual incorreta."
         )
-    return
\ No newline at end of file
+    return
+
+
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_users_me(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Exclui a conta do usuário autenticado e todos os seus dados.
+    """
+    deleted_user = await crud.aio.delete_user(db=db, user_id=current_user.id)
+    if deleted_user is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Usuário não encontrado."
+        )
+    return
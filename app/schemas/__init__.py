@@ -7,15 +7,19 @@ from app.schemas.user import (
     UserBase, UserCreate, User, UserUpdate, UserPasswordUpdate
 )
 from app.schemas.client import (
-    AddressSchema, ClientBase, ClientCreate, ClientUpdate, Client
+    AddressSchema, ClientBase, ClientCreate, ClientImport, ClientUpdate, Client,
+    ClientImportError, ClientImportReport, ClientDuplicateGroup
 )
 from app.schemas.process import (
     ProcessBase, ProcessCreate, Process,
-    ProcessUpdateBase, ProcessUpdateCreate, ProcessUpdate
+    ProcessUpdateBase, ProcessUpdateCreate, ProcessUpdate,
+    ProcessUpdateIngest, ProcessUpdateBulk, ProcessUpdateIngestReport,
+    ProcessSyncError, ProcessSyncReport
 )
 from app.schemas.kanban import (
     TaskCardBase, TaskCardCreate, TaskCard, TaskCardUpdate, TaskCardMove,
-    TaskColumnBase, TaskColumnCreate, TaskColumn, TaskColumnUpdate, TaskColumnWithCards
+    TaskColumnBase, TaskColumnCreate, TaskColumn, TaskColumnUpdate, TaskColumnWithCards,
+    BoardColumnMove, BoardCardMove, BoardReorder, BoardReorderResult
 )
 from app.schemas.extrajudicial import (
     PersonSchema, AssetSchema, DebtSchema, ChildSchema,
@@ -30,6 +34,7 @@ from app.schemas.document import (
     ClientDataForDoc, CaseDetailsSchema,
     GenerateDocumentRequest, GenerateDocumentResponse
 )
+from app.schemas.dashboard import DashboardSummary
 
 __all__ = [
     # Auth
@@ -37,13 +42,17 @@ __all__ = [
     # User
     "UserBase", "UserCreate", "User", "UserUpdate", "UserPasswordUpdate",
     # Client
-    "AddressSchema", "ClientBase", "ClientCreate", "ClientUpdate", "Client",
+    "AddressSchema", "ClientBase", "ClientCreate", "ClientImport", "ClientUpdate", "Client",
+    "ClientImportError", "ClientImportReport", "ClientDuplicateGroup",
     # Process
     "ProcessBase", "ProcessCreate", "Process",
     "ProcessUpdateBase", "ProcessUpdateCreate", "ProcessUpdate",
+    "ProcessUpdateIngest", "ProcessUpdateBulk", "ProcessUpdateIngestReport",
+    "ProcessSyncError", "ProcessSyncReport",
     # Kanban
     "TaskCardBase", "TaskCardCreate", "TaskCard", "TaskCardUpdate", "TaskCardMove",
     "TaskColumnBase", "TaskColumnCreate", "TaskColumn", "TaskColumnUpdate", "TaskColumnWithCards",
+    "BoardColumnMove", "BoardCardMove", "BoardReorder", "BoardReorderResult",
     # Extrajudicial
     "PersonSchema", "AssetSchema", "DebtSchema", "ChildSchema",
     "CaseCreateRequest", "CaseUpdateRequest", "CaseResponse",
@@ -54,4 +63,6 @@ __all__ = [
     # Documents
     "ClientDataForDoc", "CaseDetailsSchema",
     "GenerateDocumentRequest", "GenerateDocumentResponse",
+    # Dashboard
+    "DashboardSummary",
 ]
\ No newline at end of file
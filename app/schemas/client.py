@@ -2,11 +2,13 @@
 Schemas de cliente.
 """
 
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_validator
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
+from app.core.normalization import format_cpf, normalize_cpf
+
 
 class AddressSchema(BaseModel):
     street: Optional[str] = None
@@ -35,7 +37,15 @@ class ClientBase(BaseModel):
 
 
 class ClientCreate(ClientBase):
-    pass
+    # Só na entrada, e sem rejeitar: CPFs de 11 dígitos vão para o formato
+    # canônico; os demais são gravados como vieram, como antes
+    _normalize_cpf = field_validator('cpf')(format_cpf)
+
+
+class ClientImport(ClientCreate):
+    """Linha da importação em massa: o CPF precisa ser válido."""
+
+    _normalize_cpf = field_validator('cpf')(normalize_cpf)
 
 
 class ClientUpdate(BaseModel):
@@ -51,6 +61,8 @@ class ClientUpdate(BaseModel):
 
     model_config = ConfigDict(populate_by_name=True, from_attributes=True)
 
+    _normalize_cpf = field_validator('cpf')(format_cpf)
+
 
 class Client(ClientBase):
     id: UUID
@@ -58,4 +70,26 @@ class Client(ClientBase):
     created_at: datetime = Field(..., alias='createdAt')
     updated_at: datetime = Field(..., alias='updatedAt')
 
-    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+class ClientImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+
+class ClientImportReport(BaseModel):
+    total_rows: int = Field(..., alias='totalRows')
+    created: int
+    updated: int
+    failed: int
+    errors: List[ClientImportError] = []
+    errors_truncated: bool = Field(False, alias='errorsTruncated')
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ClientDuplicateGroup(BaseModel):
+    score: float
+    reasons: List[str]
+    clients: List[Client]
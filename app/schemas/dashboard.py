@@ -0,0 +1,22 @@
+"""
+Schemas do painel inicial (dashboard).
+"""
+
+from datetime import date
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class DashboardSummary(BaseModel):
+    processes_by_status: Dict[str, int]
+    processes_total: int
+    open_extrajudicial_cases: int
+    # Semana de segunda a domingo que contém `today`
+    week_start: date
+    week_end: date
+    cards_due_this_week: int
+    # Janelas que terminam em `today`, inclusive
+    intimations_last_7_days: int
+    intimations_last_30_days: int
+    today: date
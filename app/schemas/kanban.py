@@ -2,7 +2,7 @@
 Schemas do quadro Kanban.
 """
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -20,6 +20,7 @@ class TaskCardCreate(TaskCardBase):
 class TaskCard(TaskCardBase):
     id: int
     column_id: int
+    rank: str
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -35,7 +36,6 @@ class TaskCardMove(BaseModel):
 
 class TaskColumnBase(BaseModel):
     title: str
-    position: int
 
 
 class TaskColumnCreate(TaskColumnBase):
@@ -44,6 +44,7 @@ class TaskColumnCreate(TaskColumnBase):
 
 class TaskColumn(TaskColumnBase):
     id: int
+    rank: str
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -52,4 +53,26 @@ class TaskColumnWithCards(TaskColumn):
 
 
 class TaskColumnUpdate(BaseModel):
-    title: str
\ No newline at end of file
+    title: str
+
+
+class BoardColumnMove(BaseModel):
+    """Coloca um item entre `previous_id` e `next_id` (None: início / fim)."""
+    id: int
+    previous_id: Optional[int] = None
+    next_id: Optional[int] = None
+
+
+class BoardCardMove(BoardColumnMove):
+    column_id: int
+
+
+class BoardReorder(BaseModel):
+    # Aplicados em ordem, colunas antes dos cartões
+    columns: List[BoardColumnMove] = Field(default=[], max_length=500)
+    cards: List[BoardCardMove] = Field(default=[], max_length=500)
+
+
+class BoardReorderResult(BaseModel):
+    columns: List[TaskColumn]
+    cards: List[TaskCard]
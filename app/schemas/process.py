@@ -2,11 +2,14 @@
 Schemas de processo.
 """
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
+from app.core.cnj import normalize_cnj
+from app.core.normalization import only_digits
+
 
 class ProcessUpdateBase(BaseModel):
     date: datetime
@@ -23,6 +26,41 @@ class ProcessUpdate(ProcessUpdateBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProcessUpdateIngest(ProcessUpdateCreate):
+    process_id: int
+    description: str = Field(..., min_length=1)
+
+
+class ProcessUpdateBulk(BaseModel):
+    updates: List[ProcessUpdateIngest] = Field(..., max_length=10000)
+
+
+class ProcessUpdateIngestReport(BaseModel):
+    received: int
+    inserted: int
+    skipped: int
+    rejected: int
+    unknown_process_ids: List[int] = []
+
+
+class ProcessSyncError(BaseModel):
+    process_id: int
+    number: str
+    error: str
+
+
+class ProcessSyncReport(BaseModel):
+    processes: int
+    synced: int
+    skipped: int
+    not_found: int
+    failed: int
+    fetched: int
+    inserted: int
+    duplicates: int
+    errors: List[ProcessSyncError] = []
+
+
 class ProcessBase(BaseModel):
     number: str
     client_name: str
@@ -31,11 +69,21 @@ class ProcessBase(BaseModel):
 
 
 class ProcessCreate(ProcessBase):
-    pass
+    @field_validator('number')
+    @classmethod
+    def _normalize_number(cls, value: str) -> str:
+        # Números com 20 dígitos seguem o padrão CNJ e precisam ter
+        # dígitos verificadores válidos; a numeração antiga é mantida
+        if len(only_digits(value)) == 20:
+            return normalize_cnj(value)
+        return value.strip()
 
 
 class Process(ProcessBase):
     id: int
     owner_id: UUID
     updates: List[ProcessUpdate] = []
+    # Preenchidos na listagem: andamento mais recente e total de andamentos
+    latest_update: Optional[ProcessUpdate] = None
+    updates_count: Optional[int] = None
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
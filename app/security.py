@@ -1,9 +1,11 @@
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta, timezone
-import bcrypt
 from jose import JWTError, jwt
 
+# Hash de senhas centralizado em app.core.security (mesmo algoritmo/custo)
+from app.core.security import verify_password, get_password_hash
+
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -11,13 +13,6 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
-
-def get_password_hash(password: str) -> str:
-    hashed_bytes = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-    return hashed_bytes.decode('utf-8')
-
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
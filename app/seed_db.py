@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from app.database import SessionLocal, engine
 from app.models import Base, User, Client, Process, TaskColumn, TaskCard
+from app.core.ranking import rank_between
 from app.core.security import get_password_hash
 
 
@@ -140,15 +141,17 @@ def seed_kanban(db: Session, user: User):
     
     # Criar colunas
     columns_data = [
-        {"title": "A Fazer", "position": 0},
-        {"title": "Em Andamento", "position": 1},
-        {"title": "Aguardando", "position": 2},
-        {"title": "Concluído", "position": 3},
+        {"title": "A Fazer"},
+        {"title": "Em Andamento"},
+        {"title": "Aguardando"},
+        {"title": "Concluído"},
     ]
     
     columns = []
+    rank = None
     for col_data in columns_data:
-        column = TaskColumn(**col_data, owner_id=user.id)
+        rank = rank_between(rank, None)
+        column = TaskColumn(**col_data, rank=rank, owner_id=user.id)
         db.add(column)
         db.flush()  # Para obter o ID
         columns.append(column)
@@ -182,7 +185,7 @@ def seed_kanban(db: Session, user: User):
     ]
     
     for card_data in cards_data:
-        card = TaskCard(**card_data)
+        card = TaskCard(**card_data, rank=rank_between(None, None))
         db.add(card)
     
     db.commit()
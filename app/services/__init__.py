@@ -2,6 +2,6 @@
 Services - Lógica de negócio e integrações externas.
 """
 
-from app.services import scraper, vector_db, document_generator
+from app.services import scraper, vector_db, document_generator, token_revocation, client_import, client_export, client_dedup, datajud_sync
 
-__all__ = ["scraper", "vector_db", "document_generator"]
\ No newline at end of file
+__all__ = ["scraper", "vector_db", "document_generator", "token_revocation", "client_import", "client_export", "client_dedup", "datajud_sync"]
\ No newline at end of file
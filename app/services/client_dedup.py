@@ -0,0 +1,300 @@
+"""
+Detecção de clientes duplicados de um usuário.
+
+Comparar todos os pares é O(n²) (5 bilhões de pares para 100k
+clientes). Em vez disso, cada cliente recebe chaves de bloqueio
+(CPF, email, telefone e combinações de primeiro/último nome
+normalizados) e só clientes que compartilham alguma chave são
+comparados:
+
+- mesmo CPF (com ou sem pontuação): duplicata;
+- demais pares: similaridade dos nomes (Jaro-Winkler, que tolera erros
+  de digitação, ponderado com trigramas, como no pg_trgm, que penalizam
+  palavras diferentes) acima do limite. O limite é menor quando
+  o par também compartilha email ou telefone;
+- CPFs diferentes e preenchidos nunca são duplicatas.
+
+Blocos muito grandes (nomes comuns) são comparados apenas entre
+vizinhos na ordem alfabética. Os pares encontrados são agrupados com
+union-find: A~B e B~C formam um único grupo candidato à mesclagem.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, Iterator, List, Set, Tuple
+from uuid import UUID
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.normalization import normalize_email, normalize_name, only_digits
+from app.crud import aio as crud_aio
+
+# Similaridade mínima dos nomes para pares que só compartilham o nome
+NAME_MATCH_THRESHOLD = 0.84
+# ... e para pares que também compartilham email ou telefone
+RELATED_MATCH_THRESHOLD = 0.7
+JARO_WINKLER_WEIGHT = 0.7
+# Blocos maiores que isso comparam cada cliente apenas com os
+# BLOCK_WINDOW seguintes em ordem alfabética
+MAX_BLOCK_SIZE = 50
+BLOCK_WINDOW = 10
+
+# Partículas ignoradas nas chaves de nome
+NAME_PARTICLES = {"da", "de", "do", "das", "dos", "e"}
+
+
+@dataclass
+class DedupRecord:
+    """Campos de comparação de um cliente, já normalizados."""
+
+    id: UUID
+    name: str
+    cpf: str
+    email: str
+    phone: str
+
+    @classmethod
+    def from_row(cls, row) -> "DedupRecord":
+        return cls(
+            id=row.id,
+            name=normalize_name(row.full_name),
+            cpf=only_digits(row.cpf),
+            email=normalize_email(row.email),
+            # Últimos 8 dígitos: ignora +55, DDD e o nono dígito
+            phone=only_digits(row.phone)[-8:],
+        )
+
+    def blocking_keys(self) -> Iterator[str]:
+        if self.cpf:
+            yield f"cpf:{self.cpf}"
+        if self.email:
+            yield f"email:{self.email}"
+        if len(self.phone) == 8:
+            yield f"phone:{self.phone}"
+        tokens = [token for token in self.name.split() if token not in NAME_PARTICLES]
+        if len(tokens) == 1:
+            yield f"name:{tokens[0]}"
+        elif tokens:
+            # Um erro de digitação em um dos nomes não impede o outro bloco
+            first, last = tokens[0], tokens[-1]
+            yield f"name:{first}|{last[:2]}"
+            yield f"name:{last}|{first[:2]}"
+
+
+@dataclass
+class DuplicateGroup:
+    """Clientes que provavelmente são a mesma pessoa."""
+
+    client_ids: List[UUID]
+    score: float
+    reasons: Set[str] = field(default_factory=set)
+
+
+# --- Similaridade ---
+
+def jaro_winkler(a: str, b: str, prefix_weight: float = 0.1) -> float:
+    """Similaridade de Jaro-Winkler (0 a 1)."""
+    if a == b:
+        return 1.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+
+    # Caracteres iguais a até `window` posições de distância (str.find
+    # faz a busca na janela sem um laço em Python)
+    window = max(max(len_a, len_b) // 2 - 1, 0)
+    matched_b = [False] * len_b
+    matches_a = []
+    for i, char in enumerate(a):
+        end = i + window + 1
+        j = b.find(char, max(0, i - window), end)
+        while j != -1 and matched_b[j]:
+            j = b.find(char, j + 1, end)
+        if j != -1:
+            matched_b[j] = True
+            matches_a.append(char)
+
+    matches = len(matches_a)
+    if not matches:
+        return 0.0
+    matches_b = [char for char, matched in zip(b, matched_b) if matched]
+    transpositions = sum(char_a != char_b for char_a, char_b in zip(matches_a, matches_b)) / 2
+
+    jaro = (matches / len_a + matches / len_b + (matches - transpositions) / matches) / 3
+
+    prefix = 0
+    for char_a, char_b in zip(a[:4], b[:4]):
+        if char_a != char_b:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_weight * (1 - jaro)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas de cada palavra, com o mesmo preenchimento do pg_trgm."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def trigram_similarity(a: Set[str], b: Set[str]) -> float:
+    """Similaridade de trigramas (como similarity() do pg_trgm)."""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class _UnionFind:
+    """
+    Union-find dos grupos, com o CPF de cada grupo na raiz: dois grupos
+    com CPFs diferentes nunca são unidos, mesmo que um registro sem CPF
+    pareça com ambos.
+    """
+
+    def __init__(self, cpfs: List[str]):
+        self.parent = list(range(len(cpfs)))
+        self.cpf = list(cpfs)
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: int, b: int) -> bool:
+        """Une os grupos de `a` e `b`; False se os CPFs dos grupos divergem."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return True
+        cpf_a, cpf_b = self.cpf[root_a], self.cpf[root_b]
+        if cpf_a and cpf_b and cpf_a != cpf_b:
+            return False
+        root, child = min(root_a, root_b), max(root_a, root_b)
+        self.parent[child] = root
+        self.cpf[root] = cpf_a or cpf_b
+        return True
+
+
+# --- Detecção ---
+
+def _blocks(records: List[DedupRecord]) -> Iterator[List[int]]:
+    """Índices dos registros de cada bloco com dois ou mais registros."""
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for index, record in enumerate(records):
+        for key in record.blocking_keys():
+            blocks[key].append(index)
+    return (members for members in blocks.values() if len(members) > 1)
+
+
+def _block_pairs(members: List[int], records: List[DedupRecord]) -> Iterator[Tuple[int, int]]:
+    if len(members) <= MAX_BLOCK_SIZE:
+        yield from combinations(members, 2)
+        return
+    members = sorted(members, key=lambda index: records[index].name)
+    for i, a in enumerate(members):
+        for b in members[i + 1:i + 1 + BLOCK_WINDOW]:
+            yield a, b
+
+
+def _match(record_a: DedupRecord, record_b: DedupRecord, name_trigrams: Dict[str, Set[str]]) -> Tuple[float, Set[str]]:
+    """Score e motivos de um par; score 0 se não forem a mesma pessoa."""
+    if record_a.cpf and record_b.cpf:
+        return (1.0, {"cpf"}) if record_a.cpf == record_b.cpf else (0.0, set())
+
+    reasons = set()
+    if record_a.email and record_a.email == record_b.email:
+        reasons.add("email")
+    if record_a.phone and record_a.phone == record_b.phone:
+        reasons.add("phone")
+
+    threshold = RELATED_MATCH_THRESHOLD if reasons else NAME_MATCH_THRESHOLD
+    name_a, name_b = record_a.name, record_b.name
+    if name_a == name_b:
+        score = 1.0
+    else:
+        for name in (name_a, name_b):
+            if name not in name_trigrams:
+                name_trigrams[name] = trigrams(name)
+        trigram_score = trigram_similarity(name_trigrams[name_a], name_trigrams[name_b])
+        # Jaro-Winkler é o cálculo caro: só quando o par ainda pode atingir o limite
+        if JARO_WINKLER_WEIGHT + (1 - JARO_WINKLER_WEIGHT) * trigram_score < threshold:
+            return 0.0, set()
+        score = JARO_WINKLER_WEIGHT * jaro_winkler(name_a, name_b) + (1 - JARO_WINKLER_WEIGHT) * trigram_score
+    if score < threshold:
+        return 0.0, set()
+    reasons.add("name")
+    return score, reasons
+
+
+def find_duplicate_groups(records: List[DedupRecord]) -> List[DuplicateGroup]:
+    """
+    Agrupa os registros que provavelmente são a mesma pessoa (um grupo
+    nunca reúne CPFs diferentes). Grupos ordenados por tamanho e score
+    (o menor score entre os pares que formaram o grupo).
+    """
+    union_find = _UnionFind([record.cpf for record in records])
+    name_trigrams: Dict[str, Set[str]] = {}
+    compared: Set[int] = set()
+    matched: List[Tuple[int, float, Set[str]]] = []
+
+    for members in _blocks(records):
+        for a, b in _block_pairs(members, records):
+            if a > b:
+                a, b = b, a
+            pair_key = a * len(records) + b
+            if pair_key in compared:
+                continue
+            compared.add(pair_key)
+
+            score, reasons = _match(records[a], records[b], name_trigrams)
+            if score and union_find.union(a, b):
+                matched.append((a, score, reasons))
+                matched.append((b, score, reasons))
+
+    groups: Dict[int, DuplicateGroup] = {}
+    members_by_root: Dict[int, Set[int]] = defaultdict(set)
+    for index, score, reasons in matched:
+        root = union_find.find(index)
+        members_by_root[root].add(index)
+        group = groups.setdefault(root, DuplicateGroup(client_ids=[], score=score))
+        group.score = min(group.score, score)
+        group.reasons |= reasons
+
+    for root, group in groups.items():
+        group.client_ids = [records[index].id for index in sorted(members_by_root[root])]
+    return sorted(groups.values(), key=lambda group: (-len(group.client_ids), -group.score))
+
+
+def _groups_from_rows(rows) -> List[DuplicateGroup]:
+    return find_duplicate_groups([DedupRecord.from_row(row) for row in rows])
+
+
+async def find_user_duplicates(db, user_id: UUID, limit: int = 100) -> List[dict]:
+    """
+    Busca os grupos de clientes duplicados do usuário (no máximo
+    `limit`), com os dados completos dos clientes de cada grupo.
+    """
+    rows = await crud_aio.get_user_client_identities(db=db, user_id=user_id)
+    groups = (await run_in_threadpool(_groups_from_rows, rows))[:limit]
+    if not groups:
+        return []
+
+    ids = [client_id for group in groups for client_id in group.client_ids]
+    clients = {
+        client.id: client
+        for client in await crud_aio.get_user_clients_by_ids(db=db, user_id=user_id, client_ids=ids)
+    }
+    return [
+        {
+            "score": round(group.score, 3),
+            "reasons": sorted(group.reasons),
+            "clients": [clients[client_id] for client_id in group.client_ids if client_id in clients],
+        }
+        for group in groups
+    ]
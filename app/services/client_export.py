@@ -0,0 +1,119 @@
+"""
+Exportação de clientes (CSV ou NDJSON) em streaming.
+
+As linhas vêm de um SELECT do Core com cursor do lado do servidor
+(yield_per), em lotes de EXPORT_BATCH_SIZE, e são serializadas direto
+das tuplas, sem instanciar objetos do ORM. A memória usada é a de um
+lote, independentemente do número de clientes.
+
+O formato é o mesmo aceito pela importação (app.services.client_import):
+nomes dos campos da API e, no CSV, colunas `address.<campo>`.
+
+No CSV, textos que começam com "=", "+", "-", "@" (ou tab/CR) recebem
+um "'" na frente, para não serem interpretados como fórmula ao abrir o
+arquivo numa planilha; a importação remove esse prefixo.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List
+from uuid import UUID
+
+from app import crud
+from app.database import stream_partitions
+from app.schemas import AddressSchema, Client as ClientSchema
+
+EXPORT_BATCH_SIZE = 1000
+
+# Coluna do banco -> nome do campo na API (fullName, maritalStatus, ...).
+# O dono não é exportado: todas as linhas são do usuário autenticado.
+FIELD_NAMES: Dict[str, str] = {
+    name: field.alias or name
+    for name, field in ClientSchema.model_fields.items()
+    if name != "owner_id"
+}
+ADDRESS_FIELD_NAMES: Dict[str, str] = {
+    name: field.alias or name for name, field in AddressSchema.model_fields.items()
+}
+
+CSV_HEADER: List[str] = [
+    column
+    for name, field_name in FIELD_NAMES.items()
+    for column in (
+        [f"address.{address_field}" for address_field in ADDRESS_FIELD_NAMES.values()]
+        if name == "address" else [field_name]
+    )
+]
+
+# Primeiros caracteres que planilhas interpretam como fórmula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def row_to_record(row) -> Dict[str, Any]:
+    """Converte uma linha do SELECT em um registro com os nomes da API."""
+    values = row._mapping
+    record = {field_name: _json_value(values[name]) for name, field_name in FIELD_NAMES.items()}
+    address = values["address"]
+    if address:
+        record["address"] = {
+            ADDRESS_FIELD_NAMES.get(key, key): value for key, value in address.items()
+        }
+    return record
+
+
+def escape_csv_cell(value: Any) -> Any:
+    """Prefixa com "'" textos que seriam lidos como fórmula numa planilha."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_values(record: Dict[str, Any]) -> List[Any]:
+    address = record.get("address") or {}
+    values = []
+    for name, field_name in FIELD_NAMES.items():
+        if name == "address":
+            values.extend(address.get(address_field) for address_field in ADDRESS_FIELD_NAMES.values())
+        else:
+            values.append(record[field_name])
+    return [escape_csv_cell(value) for value in values]
+
+
+def encode_csv(rows: Iterable, header: bool = False) -> bytes:
+    """Serializa um lote de linhas em CSV (com o cabeçalho, se pedido)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(CSV_HEADER)
+    writer.writerows(_csv_values(row_to_record(row)) for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_ndjson(rows: Iterable) -> bytes:
+    """Serializa um lote de linhas em NDJSON (um objeto por linha)."""
+    return "".join(
+        json.dumps(row_to_record(row), ensure_ascii=False, separators=(",", ":")) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+async def stream_clients(db, user_id: UUID, file_format: str) -> AsyncIterator[bytes]:
+    """Gera o arquivo de exportação dos clientes do usuário em blocos."""
+    if file_format == "csv":
+        yield encode_csv([], header=True)
+
+    statement = crud.user_clients_export_query(user_id)
+    async for partition in stream_partitions(db, statement, EXPORT_BATCH_SIZE):
+        yield encode_csv(partition) if file_format == "csv" else encode_ndjson(partition)
@@ -0,0 +1,187 @@
+"""
+Importação em massa de clientes (CSV ou NDJSON).
+
+O arquivo é lido em streaming, linha a linha, a partir do upload já
+em disco (o Starlette descarrega uploads grandes em arquivo temporário).
+As linhas são validadas com ClientImport (o CPF precisa ser válido e
+é normalizado) e gravadas em lotes de IMPORT_BATCH_SIZE com um único
+INSERT ... ON CONFLICT (cpf) por lote. A memória usada depende do
+tamanho do lote, não do arquivo; o relatório guarda no máximo
+MAX_REPORTED_ERRORS linhas com erro.
+"""
+
+import codecs
+import csv
+import json
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.crud import aio as crud_aio
+from app.schemas import ClientImport
+from app.services.client_export import FORMULA_PREFIXES
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+# (número da linha, registro ou None, mensagem de erro de leitura)
+RawRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+class ImportReport:
+    """Contadores e erros por linha de uma importação."""
+
+    def __init__(self):
+        self.total_rows = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.errors_truncated = False
+
+    def add_error(self, line: int, messages: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": messages})
+        else:
+            self.errors_truncated = True
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_rows": self.total_rows,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+        }
+
+
+def _clean_csv_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converte uma linha de CSV em registro: células vazias são ignoradas
+    e colunas "address.<campo>" formam o endereço. O "'" que a exportação
+    põe antes de textos com cara de fórmula é removido.
+    """
+    record: Dict[str, Any] = {}
+    address: Dict[str, Any] = {}
+    for key, value in row.items():
+        if key is None or value is None:
+            continue
+        value = value.strip()
+        if not value:
+            continue
+        if value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+            value = value[1:]
+        key = key.strip()
+        if key.startswith("address."):
+            address[key[len("address."):]] = value
+        else:
+            record[key] = value
+    if address:
+        record["address"] = address
+    return record
+
+
+def iter_csv_records(fileobj: BinaryIO) -> Iterator[RawRecord]:
+    """Lê um CSV (UTF-8, separador "," ou ";") registro a registro."""
+    text = codecs.getreader("utf-8-sig")(fileobj)
+    header = text.readline()
+    # Planilhas em pt-BR costumam exportar CSV com ";"
+    delimiter = ";" if header.count(";") > header.count(",") else ","
+    fieldnames = next(csv.reader([header], delimiter=delimiter), [])
+
+    reader = csv.DictReader(text, fieldnames=fieldnames, delimiter=delimiter)
+    try:
+        for row in reader:
+            record = _clean_csv_row(row)
+            if record:
+                # +1: o cabeçalho foi lido fora do reader
+                yield reader.line_num + 1, record, None
+    except (csv.Error, UnicodeDecodeError) as exc:
+        yield reader.line_num + 1, None, f"Arquivo inválido: {exc}"
+
+
+def iter_ndjson_records(fileobj: BinaryIO) -> Iterator[RawRecord]:
+    """Lê um arquivo NDJSON (um objeto JSON por linha)."""
+    text = codecs.getreader("utf-8-sig")(fileobj)
+    line_number = 0
+    try:
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_number, None, f"JSON inválido: {exc.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Cada linha deve ser um objeto JSON."
+                continue
+            yield line_number, record, None
+    except UnicodeDecodeError as exc:
+        yield line_number + 1, None, f"Arquivo inválido: {exc}"
+
+
+def _format_validation_error(exc: ValidationError) -> List[str]:
+    messages = []
+    for error in exc.errors():
+        field = ".".join(str(part) for part in error["loc"])
+        messages.append(f"{field}: {error['msg']}" if field else error["msg"])
+    return messages
+
+
+def next_batch(records: Iterator[RawRecord], report: ImportReport, size: int = IMPORT_BATCH_SIZE) -> List[Tuple[int, ClientImport]]:
+    """
+    Lê e valida até `size` linhas válidas. Linhas inválidas vão para o
+    relatório. Um CPF repetido dentro do lote fica com a última linha.
+    """
+    batch: Dict[Any, Tuple[int, ClientImport]] = {}
+    valid = 0
+    for line, record, read_error in records:
+        report.total_rows += 1
+        if read_error:
+            report.add_error(line, [read_error])
+            continue
+        try:
+            client = ClientImport.model_validate(record)
+        except ValidationError as exc:
+            report.add_error(line, _format_validation_error(exc))
+            continue
+
+        key = client.cpf or ("__sem_cpf__", line)
+        if key in batch:
+            report.add_error(batch[key][0], [f"cpf: repetido no arquivo (também na linha {line})"])
+        batch[key] = (line, client)
+        valid += 1
+        if valid >= size:
+            break
+    return list(batch.values())
+
+
+async def import_clients(db, fileobj: BinaryIO, file_format: str, user_id: UUID) -> Dict[str, Any]:
+    """
+    Importa clientes de um arquivo CSV ou NDJSON para o usuário.
+    Cada lote é validado no threadpool e gravado em uma transação.
+    """
+    records = iter_csv_records(fileobj) if file_format == "csv" else iter_ndjson_records(fileobj)
+    report = ImportReport()
+
+    while True:
+        batch = await run_in_threadpool(next_batch, records, report)
+        if not batch:
+            break
+
+        statuses = await crud_aio.upsert_user_clients(db=db, clients=[client for _, client in batch], user_id=user_id)
+        for (line, _), created in zip(batch, statuses):
+            if created is None:
+                # CPF de outro usuário: a mensagem não revela que ele existe
+                report.add_error(line, ["cpf: não pode ser importado"])
+            elif created:
+                report.created += 1
+            else:
+                report.updated += 1
+
+    return report.as_dict()
@@ -0,0 +1,89 @@
+"""
+Painel inicial (GET /dashboard).
+
+Os indicadores vêm dos contadores de app.crud.dashboard, mantidos por
+triggers no PostgreSQL: a montagem do painel só soma os contadores das
+janelas de datas (semana atual, últimos 7 e 30 dias).
+
+`reconcile_loop`, executado periodicamente (ver main.lifespan) e em
+POST /internal/dashboard/reconcile, recalcula os contadores a partir
+das tabelas de origem e corrige divergências (escritas fora dos
+triggers, restaurações, ajustes perdidos).
+"""
+
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.crud.dashboard import (
+    METRIC_CARDS_DUE,
+    METRIC_INTIMATIONS,
+    METRIC_OPEN_CASES,
+    METRIC_PROCESS_STATUS,
+    reconcile_dashboard_counters,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def build_dashboard(counters: Iterable[Tuple[str, str, int]], today: date) -> Dict:
+    """Indicadores do painel (formato de schemas.DashboardSummary) a partir dos contadores."""
+    week_start = today - timedelta(days=today.weekday())
+    week_end = week_start + timedelta(days=6)
+    summary = {
+        "processes_by_status": {},
+        "processes_total": 0,
+        "open_extrajudicial_cases": 0,
+        "week_start": week_start,
+        "week_end": week_end,
+        "cards_due_this_week": 0,
+        "intimations_last_7_days": 0,
+        "intimations_last_30_days": 0,
+        "today": today,
+    }
+    for metric, bucket, count in counters:
+        if count <= 0:
+            continue
+        if metric == METRIC_PROCESS_STATUS:
+            summary["processes_by_status"][bucket] = count
+            summary["processes_total"] += count
+        elif metric == METRIC_OPEN_CASES:
+            summary["open_extrajudicial_cases"] += count
+        elif metric == METRIC_CARDS_DUE:
+            if week_start <= date.fromisoformat(bucket) <= week_end:
+                summary["cards_due_this_week"] += count
+        elif metric == METRIC_INTIMATIONS:
+            age = (today - date.fromisoformat(bucket)).days
+            if 0 <= age < 7:
+                summary["intimations_last_7_days"] += count
+            if 0 <= age < 30:
+                summary["intimations_last_30_days"] += count
+    return summary
+
+
+def run_reconciliation(today: Optional[date] = None) -> Dict[str, int]:
+    """Reconcilia os contadores de todos os usuários em uma sessão própria."""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return reconcile_dashboard_counters(db, today=today)
+    finally:
+        db.close()
+
+
+async def reconcile_loop(interval_hours: Optional[float] = None) -> None:
+    """Executa run_reconciliation periodicamente (tarefa de fundo do lifespan)."""
+    interval = (interval_hours or settings.DASHBOARD_RECONCILE_INTERVAL_HOURS) * 3600
+    while True:
+        try:
+            report = await run_in_threadpool(run_reconciliation)
+            if report["repaired"]:
+                logger.info("Contadores do painel corrigidos: %s", report)
+        except Exception:
+            logger.exception("Falha na reconciliação dos contadores do painel.")
+        await asyncio.sleep(interval)
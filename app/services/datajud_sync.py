@@ -0,0 +1,294 @@
+"""
+Sincronização incremental dos andamentos dos processos com o DataJud.
+
+Para cada processo do usuário com número no padrão CNJ, o índice do
+tribunal no DataJud (api_publica_tjsp, api_publica_trf3, ...) é
+consultado pelo número e os movimentos retornados viram andamentos:
+
+- concorrência limitada (DATAJUD_SYNC_CONCURRENCY requisições
+  simultâneas, cada uma no threadpool, com `requests`);
+- marca d'água por processo: só movimentos a partir da data do
+  andamento mais recente já gravado são enviados ao banco (os da mesma
+  data/hora que já existem são descartados pelo hash de conteúdo);
+- falhas temporárias (rede, timeout, 429, 5xx) são repetidas com
+  backoff exponencial com jitter, respeitando o Retry-After (até o
+  maior backoff; acima disso, falha);
+- os andamentos são gravados em lotes por
+  crud.ingest_user_process_updates (ON CONFLICT DO NOTHING), à medida
+  que as respostas chegam.
+
+O resultado é um relatório com os contadores da execução e os erros
+por processo.
+"""
+
+import asyncio
+import random
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import requests
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cnj import STATE_CODES, InvalidCNJNumberError, court_acronym, parse_cnj
+from app.core.config import settings
+from app.core.normalization import normalize_timestamp, only_digits
+from app.crud import aio as crud_aio
+from app.crud.process import INGEST_BATCH_SIZE
+from app.schemas import ProcessUpdateIngest
+
+MAX_REPORTED_ERRORS = 100
+
+# Documentos por número (um por grau de jurisdição, em geral 1 ou 2)
+SEARCH_SIZE = 10
+
+
+class DataJudError(Exception):
+    """Falha ao consultar o DataJud."""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def datajud_alias(segment: int, tribunal: int) -> Optional[str]:
+    """Sufixo do índice do tribunal no DataJud (8, 26 -> "tjsp")."""
+    if segment == 5 and tribunal == 0:
+        return "tst"
+    if segment == 6 and tribunal == 0:
+        return "tse"
+    if segment == 6 and tribunal in STATE_CODES:
+        return f"tre-{STATE_CODES[tribunal].lower()}"
+    acronym = court_acronym(segment, tribunal)
+    # O STF não publica seus processos no DataJud
+    if acronym is None or acronym == "STF" or acronym == "CNJ":
+        return None
+    return acronym.lower()
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """dataHora dos movimentos: ISO 8601 (com ou sem fuso) ou AAAAMMDDHHMMSS."""
+    if not value:
+        return None
+    try:
+        return normalize_timestamp(datetime.fromisoformat(value))
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+
+
+def movement_description(movement: Dict[str, Any]) -> str:
+    """Descrição do andamento: nome do movimento e complementos tabelados."""
+    name = (movement.get("nome") or "").strip()
+    complements = [
+        f"{item.get('descricao')}: {item.get('nome')}" if item.get("descricao") else str(item.get("nome"))
+        for item in movement.get("complementosTabelados") or []
+        if item.get("nome")
+    ]
+    if complements:
+        return f"{name} ({'; '.join(complements)})"
+    return name
+
+
+class DataJudClient:
+    """Cliente da API pública do DataJud (uma sessão HTTP por thread)."""
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, timeout: Optional[float] = None):
+        self.base_url = (base_url or settings.DATAJUD_BASE_URL).rstrip("/")
+        self.api_key = api_key if api_key is not None else settings.DATAJUD_API_KEY
+        self.timeout = timeout or settings.DATAJUD_TIMEOUT_SECONDS
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"APIKey {self.api_key}",
+                "Content-Type": "application/json",
+            })
+            self._local.session = session
+        return session
+
+    def fetch_movements(self, alias: str, number: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Movimentos de um processo (número só com dígitos), de todos os
+        graus. None se o processo não existe no índice do tribunal.
+
+        Raises:
+            DataJudError: falha de rede ou resposta de erro.
+        """
+        query = {
+            "size": SEARCH_SIZE,
+            "query": {"match": {"numeroProcesso": number}},
+            "_source": ["numeroProcesso", "movimentos"],
+        }
+        try:
+            response = self._session().post(
+                f"{self.base_url}/api_publica_{alias}/_search", json=query, timeout=self.timeout
+            )
+        except requests.RequestException as exc:
+            raise DataJudError(f"Erro de comunicação com o DataJud: {exc}", retryable=True)
+
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("Retry-After")
+            raise DataJudError(
+                f"DataJud respondeu {response.status_code}.",
+                retryable=True,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        if response.status_code >= 400:
+            raise DataJudError(f"DataJud respondeu {response.status_code}: {response.text[:200]}")
+
+        try:
+            hits = response.json().get("hits", {}).get("hits", [])
+        except ValueError:
+            raise DataJudError("Resposta inválida do DataJud.")
+        if not hits:
+            return None
+        return [movement for hit in hits for movement in hit.get("_source", {}).get("movimentos") or []]
+
+
+class SyncReport:
+    """Contadores e erros de uma sincronização."""
+
+    def __init__(self):
+        self.processes = 0
+        self.synced = 0
+        self.skipped = 0
+        self.not_found = 0
+        self.failed = 0
+        self.fetched = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def add_error(self, process_id: int, number: str, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"process_id": process_id, "number": number, "error": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "processes": self.processes,
+            "synced": self.synced,
+            "skipped": self.skipped,
+            "not_found": self.not_found,
+            "failed": self.failed,
+            "fetched": self.fetched,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "errors": self.errors,
+        }
+
+
+def new_updates(process_id: int, movements: List[Dict[str, Any]], watermark: Optional[datetime]) -> List[ProcessUpdateIngest]:
+    """Movimentos a partir da marca d'água, como andamentos a gravar."""
+    updates = []
+    for movement in movements:
+        date = _parse_datetime(movement.get("dataHora"))
+        description = movement_description(movement)
+        if date is None or not description:
+            continue
+        # >=: outro movimento pode ter a mesma data/hora do último gravado
+        if watermark is None or date >= watermark:
+            updates.append(ProcessUpdateIngest(process_id=process_id, date=date, description=description))
+    return updates
+
+
+async def _fetch_with_retry(client: DataJudClient, alias: str, number: str, max_retries: int, backoff: float):
+    """
+    Consulta o DataJud com novas tentativas em falhas temporárias.
+
+    A espera é o Retry-After do servidor ou um backoff exponencial com
+    jitter ("full jitter"). Um Retry-After acima do maior backoff
+    (backoff * 2 ** max_retries) conta como falha: não vale prender o
+    semáforo da sincronização esperando tanto.
+    """
+    max_delay = backoff * 2 ** max_retries
+    for attempt in range(max_retries + 1):
+        try:
+            return await run_in_threadpool(client.fetch_movements, alias, number)
+        except DataJudError as exc:
+            if not exc.retryable or attempt == max_retries:
+                raise
+            if exc.retry_after is None:
+                delay = random.uniform(0, backoff * 2 ** attempt)
+            elif exc.retry_after > max_delay:
+                raise DataJudError(
+                    f"{exc} (Retry-After de {exc.retry_after:g}s excede o limite de {max_delay:g}s)"
+                ) from exc
+            else:
+                delay = exc.retry_after
+            await asyncio.sleep(delay)
+
+
+async def sync_user_processes(
+    db,
+    user_id: UUID,
+    client: Optional[DataJudClient] = None,
+    concurrency: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    backoff: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Sincroniza os andamentos de todos os processos do usuário."""
+    client = client or DataJudClient()
+    concurrency = concurrency or settings.DATAJUD_SYNC_CONCURRENCY
+    max_retries = settings.DATAJUD_SYNC_MAX_RETRIES if max_retries is None else max_retries
+    backoff = settings.DATAJUD_SYNC_BACKOFF_SECONDS if backoff is None else backoff
+
+    report = SyncReport()
+    targets: List[Tuple[int, str, str, str, Optional[datetime]]] = []
+    for process_id, number, watermark in await crud_aio.get_user_process_watermarks(db=db, user_id=user_id):
+        report.processes += 1
+        try:
+            cnj = parse_cnj(number)
+        except InvalidCNJNumberError:
+            report.skipped += 1
+            continue
+        alias = datajud_alias(cnj.segment, cnj.tribunal)
+        if alias is None:
+            report.skipped += 1
+            continue
+        targets.append((process_id, number, alias, only_digits(number), watermark))
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(target):
+        async with semaphore:
+            try:
+                return target, await _fetch_with_retry(client, target[2], target[3], max_retries, backoff), None
+            except DataJudError as exc:
+                return target, None, str(exc)
+
+    pending: List[ProcessUpdateIngest] = []
+
+    async def flush():
+        if not pending:
+            return
+        result = await crud_aio.ingest_user_process_updates(db=db, updates=list(pending), user_id=user_id)
+        report.inserted += result["inserted"]
+        report.duplicates += result["skipped"]
+        pending.clear()
+
+    for next_result in asyncio.as_completed([fetch(target) for target in targets]):
+        (process_id, number, _, _, watermark), movements, error = await next_result
+        if error is not None:
+            report.add_error(process_id, number, error)
+            continue
+        if movements is None:
+            report.not_found += 1
+            continue
+        report.synced += 1
+        report.fetched += len(movements)
+        pending.extend(new_updates(process_id, movements, watermark))
+        if len(pending) >= INGEST_BATCH_SIZE:
+            await flush()
+    await flush()
+
+    return report.as_dict()
@@ -0,0 +1,44 @@
+"""
+Rebalanceamento das chaves de ordenação do Kanban.
+
+Inserções repetidas no mesmo ponto alongam as chaves fracionárias
+(app.core.ranking). `rebalance_loop`, executado periodicamente (ver
+main.lifespan) e em POST /internal/kanban/rebalance, reescreve as
+chaves dos grupos com chaves longas ou repetidas
+(crud.kanban.rebalance_ranks): um UPDATE por tabela.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.crud.kanban import rebalance_ranks
+
+logger = logging.getLogger(__name__)
+
+
+def run_rebalance() -> Dict[str, int]:
+    """Rebalanceia as chaves em uma sessão própria."""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return rebalance_ranks(db)
+    finally:
+        db.close()
+
+
+async def rebalance_loop(interval_hours: Optional[float] = None) -> None:
+    """Executa run_rebalance periodicamente (tarefa de fundo do lifespan)."""
+    interval = (interval_hours or settings.KANBAN_REBALANCE_INTERVAL_HOURS) * 3600
+    while True:
+        try:
+            report = await run_in_threadpool(run_rebalance)
+            if report["columns"] or report["cards"]:
+                logger.info("Chaves do Kanban rebalanceadas: %s", report)
+        except Exception:
+            logger.exception("Falha no rebalanceamento das chaves do Kanban.")
+        await asyncio.sleep(interval)
@@ -0,0 +1,203 @@
+"""
+Manutenção das tabelas particionadas por mês (PostgreSQL).
+
+process_updates (por `date`) e intimations (por `publication_date`) são
+particionadas por intervalo (migração f631f29d8a8c):
+
+- `<tabela>_pAAAAMM`: um mês cada;
+- `<tabela>_historic`: tudo antes do primeiro mês particionado;
+- `<tabela>_default`: datas sem partição (ex: muito no futuro).
+
+`run_maintenance`, executado periodicamente (ver main.lifespan) e em
+POST /internal/partitions/maintenance:
+
+- cria as partições do mês atual e dos PARTITION_PREMAKE_MONTHS
+  seguintes, antes que recebam dados;
+- move para partições próprias os meses que caíram na partição default;
+- desanexa e apaga as partições inteiramente anteriores à retenção
+  (*_RETENTION_MONTHS; 0 mantém tudo).
+
+Um advisory lock garante uma única execução por vez entre workers. Em
+outros bancos, ou com as tabelas ainda não particionadas, não faz nada.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# tabela -> (coluna de partição, configuração de retenção em meses)
+PARTITIONED_TABLES = {
+    "process_updates": ("date", "PROCESS_UPDATES_RETENTION_MONTHS"),
+    "intimations": ("publication_date", "INTIMATIONS_RETENTION_MONTHS"),
+}
+
+MAINTENANCE_LOCK_ID = 7_240_023
+
+_LOWER_BOUND = re.compile(r"FROM \('([^']+)'\)")
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+Bounds = Tuple[Optional[datetime], Optional[datetime]]
+
+
+def add_months(month: date, months: int) -> date:
+    """Primeiro dia do mês `months` meses depois (ou antes) de `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def parse_bounds(expression: str) -> Bounds:
+    """
+    Limites de uma partição a partir de pg_get_expr(relpartbound)
+    ("FOR VALUES FROM ('2024-01-01 00:00:00') TO ('2024-02-01 00:00:00')").
+    MINVALUE/MAXVALUE viram None.
+    """
+    lower = _LOWER_BOUND.search(expression)
+    upper = _UPPER_BOUND.search(expression)
+    return (
+        datetime.fromisoformat(lower.group(1)) if lower else None,
+        datetime.fromisoformat(upper.group(1)) if upper else None,
+    )
+
+
+def _covers(bounds: Bounds, month: date) -> bool:
+    lower, upper = bounds
+    start = datetime.combine(month, time())
+    return (lower is None or lower <= start) and (upper is None or start < upper)
+
+
+def is_partitioned(conn, table: str) -> bool:
+    return conn.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar() is True
+
+
+def list_partitions(conn, table: str) -> List[Tuple[str, str]]:
+    """(nome, limites) das partições de uma tabela."""
+    return conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+    ), {"table": table}).all()
+
+
+def create_partition(conn, table: str, column: str, month: date, has_default: bool) -> str:
+    """
+    Cria a partição de um mês. Se a partição default já tem linhas do
+    mês (a criação falharia), elas saem da default para uma tabela
+    temporária e voltam pela tabela particionada depois da criação.
+
+    A volta pela tabela particionada dispara os triggers das partições
+    (contadores do painel, migração e0a1c52f7b93) também na inserção:
+    o ajuste da saída de cada linha é desfeito pelo da volta.
+    """
+    name = partition_name(table, month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    in_month = f"{column} >= :start AND {column} < :end"
+    params = {"start": start, "end": end}
+
+    if has_default and conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {in_month})"), params
+    ).scalar():
+        conn.execute(text(f"CREATE TEMPORARY TABLE {name}_moved (LIKE {table}) ON COMMIT DROP"))
+        conn.execute(text(
+            f"WITH moved AS (DELETE FROM {table}_default WHERE {in_month} RETURNING *) "
+            f"INSERT INTO {name}_moved SELECT * FROM moved"
+        ), params)
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+        conn.execute(text(f"INSERT INTO {table} SELECT * FROM {name}_moved"))
+    else:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+    return name
+
+
+def maintain_table(conn, table: str, column: str, today: date, premake_months: int, retention_months: int) -> Dict[str, List[str]]:
+    """Cria as partições que faltam e remove as expiradas de uma tabela."""
+    created, dropped = [], []
+    with conn.begin():
+        partitions = list_partitions(conn, table)
+        has_default = any(expression == "DEFAULT" for _, expression in partitions)
+        months = {add_months(today.replace(day=1), offset) for offset in range(premake_months + 1)}
+        if has_default:
+            months.update(conn.scalars(text(
+                f"SELECT DISTINCT date_trunc('month', {column})::date FROM {table}_default"
+            )))
+
+    ranges = [parse_bounds(expression) for _, expression in partitions if expression != "DEFAULT"]
+    for month in sorted(months):
+        if any(_covers(bounds, month) for bounds in ranges):
+            continue
+        with conn.begin():
+            created.append(create_partition(conn, table, column, month, has_default))
+        ranges.append((datetime.combine(month, time()), datetime.combine(add_months(month, 1), time())))
+
+    if retention_months > 0:
+        cutoff = datetime.combine(add_months(today.replace(day=1), -retention_months), time())
+        for name, expression in partitions:
+            _, upper = parse_bounds(expression)
+            if expression == "DEFAULT" or upper is None or upper > cutoff:
+                continue
+            # DETACH ... CONCURRENTLY não é permitido com partição default;
+            # o DETACH simples só segura o lock da tabela pai por um instante
+            with conn.begin():
+                conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+    return {"created": created, "dropped": dropped}
+
+
+def run_maintenance(engine=None, today: Optional[date] = None) -> Dict[str, Any]:
+    """Manutenção de todas as tabelas particionadas. Retorna o que foi feito por tabela."""
+    if engine is None:
+        from app.database import engine
+    today = today or date.today()
+    report: Dict[str, Any] = {}
+
+    with engine.connect() as conn:
+        if conn.dialect.name != "postgresql":
+            return report
+        with conn.begin():
+            locked = conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}).scalar()
+        if not locked:
+            return {"skipped": "Manutenção em andamento em outro processo."}
+        try:
+            for table, (column, retention_setting) in PARTITIONED_TABLES.items():
+                with conn.begin():
+                    partitioned = is_partitioned(conn, table)
+                if partitioned:
+                    report[table] = maintain_table(
+                        conn, table, column, today,
+                        premake_months=settings.PARTITION_PREMAKE_MONTHS,
+                        retention_months=getattr(settings, retention_setting),
+                    )
+        finally:
+            with conn.begin():
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MAINTENANCE_LOCK_ID})
+    return report
+
+
+async def maintenance_loop(interval_hours: Optional[float] = None) -> None:
+    """Executa run_maintenance periodicamente (tarefa de fundo do lifespan)."""
+    interval = (interval_hours or settings.PARTITION_MAINTENANCE_INTERVAL_HOURS) * 3600
+    while True:
+        try:
+            report = await run_in_threadpool(run_maintenance)
+            if any(changes.get("created") or changes.get("dropped") for changes in report.values() if isinstance(changes, dict)):
+                logger.info("Manutenção das partições: %s", report)
+        except Exception:
+            logger.exception("Falha na manutenção das partições.")
+        await asyncio.sleep(interval)
@@ -0,0 +1,279 @@
+"""
+Rotação e revogação de refresh tokens.
+
+- Cada refresh token tem um `jti` e uma família (`fam`). Ao rotacionar,
+  o `jti` usado é gravado em `revoked_refresh_tokens`; a chave primária
+  garante que um mesmo token só rotaciona uma vez, mesmo entre workers.
+- Reapresentar um token já rotacionado indica vazamento: a família
+  inteira vai para `revoked_token_families`.
+- Access tokens carregam a família. Um filtro de Bloom em memória com as
+  famílias revogadas responde o caso comum ("não revogada") sem I/O; só
+  um positivo do filtro é confirmado no banco. O filtro é sincronizado
+  de forma incremental a cada TOKEN_REVOCATION_SYNC_SECONDS.
+- Refresh tokens emitidos antes da rotação (sem `jti`/`fam`) recebem
+  identificadores derivados do próprio token (`legacy_token_ids`): também
+  só rotacionam uma vez e o reuso revoga a família derivada.
+- `purge_loop` (ver main.lifespan) remove periodicamente os registros
+  já expirados.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.normalization import normalize_timestamp, utc_now
+from app.models import RevokedRefreshToken, RevokedTokenFamily
+
+logger = logging.getLogger(__name__)
+
+LEGACY_PREFIX = "legacy-"
+
+
+def legacy_token_ids(refresh_token: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Payload de um refresh token antigo (sem `jti`/`fam`) com identificadores
+    derivados do SHA-256 do token: reapresentar o mesmo token cai na mesma
+    linha de revoked_refresh_tokens e é detectado como reuso.
+    """
+    digest = hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()
+    return {**payload, "jti": LEGACY_PREFIX + digest, "fam": LEGACY_PREFIX + digest[:32]}
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom simples (double hashing sobre SHA-256).
+    Sem falsos negativos; falsos positivos na taxa configurada.
+    `count` só conta itens que mudaram algum bit: reinserir um item
+    (sincronizações com sobreposição) não enche o filtro.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> bool:
+        """Adiciona o item; False se ele (provavelmente) já estava no filtro."""
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self._bits[pos >> 3] & mask:
+                self._bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class TokenRevocationStore:
+    """Store de rotação/revogação com pré-filtro de Bloom em memória."""
+
+    # Margem para commits atrasados e diferença de relógio entre workers
+    SYNC_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, sync_interval: Optional[float] = None, bloom_capacity: Optional[int] = None):
+        self.sync_interval = settings.TOKEN_REVOCATION_SYNC_SECONDS if sync_interval is None else sync_interval
+        self.bloom_capacity = bloom_capacity or settings.TOKEN_REVOCATION_BLOOM_CAPACITY
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(self.bloom_capacity)
+        self._watermark: Optional[datetime] = None
+        self._last_sync = -math.inf
+        self.checks = 0
+        self.bloom_negatives = 0
+        self.db_confirmations = 0
+        self.reuse_detected = 0
+
+    # --- Refresh (caminho autoritativo, sempre no banco) ---
+
+    def rotate(self, db: Session, payload: Dict[str, Any]) -> bool:
+        """
+        Marca o refresh token como usado.
+
+        Returns:
+            False se o token já havia sido rotacionado (reuso).
+        """
+        db.add(RevokedRefreshToken(
+            jti=payload["jti"],
+            family_id=payload["fam"],
+            expires_at=normalize_timestamp(datetime.fromtimestamp(payload["exp"], timezone.utc)),
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            self.reuse_detected += 1
+            return False
+        return True
+
+    def revoke_family(self, db: Session, family_id: str, expires_at: datetime, reason: str) -> None:
+        """Invalida todos os tokens (access e refresh) de uma família."""
+        db.merge(RevokedTokenFamily(family_id=family_id, reason=reason, expires_at=expires_at))
+        db.commit()
+        with self._lock:
+            self._bloom.add(family_id)
+
+    def is_family_revoked_authoritative(self, db: Session, family_id: str) -> bool:
+        """Consulta direta ao banco (usada no refresh, que já faz I/O)."""
+        return db.get(RevokedTokenFamily, family_id) is not None
+
+    def check_and_rotate(self, db: Session, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        Fluxo completo do refresh em uma única chamada.
+
+        Returns:
+            None se o token pode ser rotacionado, ou o código de erro
+            'revoked' (família revogada) / 'reused' (token já usado; a
+            família é revogada agora).
+        """
+        family_id = payload["fam"]
+        if self.is_family_revoked_authoritative(db, family_id):
+            return "revoked"
+        if not self.rotate(db, payload):
+            # A família vale até o último token emitido nela expirar, não
+            # só até o token reapresentado
+            self.revoke_family(
+                db,
+                family_id,
+                expires_at=utc_now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+                reason="refresh_token_reuse",
+            )
+            return "reused"
+        return None
+
+    # --- Access tokens (caminho quente) ---
+
+    def needs_db_check(self, family_id: str) -> bool:
+        """
+        Verificação em memória: False significa "não revogada" sem I/O.
+        True indica sincronização pendente ou positivo no filtro, e o
+        chamador deve confirmar com confirm_family_revoked().
+        """
+        self.checks += 1
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            return True
+        with self._lock:
+            maybe_revoked = family_id in self._bloom
+        if not maybe_revoked:
+            self.bloom_negatives += 1
+        return maybe_revoked
+
+    def confirm_family_revoked(self, db: Session, family_id: str) -> bool:
+        """Caminho lento: sincroniza o filtro e confirma positivos no banco."""
+        self._maybe_sync(db)
+        with self._lock:
+            maybe_revoked = family_id in self._bloom
+        if not maybe_revoked:
+            return False
+
+        self.db_confirmations += 1
+        return self.is_family_revoked_authoritative(db, family_id)
+
+    def is_family_revoked(self, db: Session, family_id: str) -> bool:
+        """
+        Verifica se a família foi revogada. Sem I/O quando o filtro de
+        Bloom responde "não" (caso comum); positivos são confirmados no banco.
+        """
+        return self.needs_db_check(family_id) and self.confirm_family_revoked(db, family_id)
+
+    def _maybe_sync(self, db: Session) -> None:
+        """
+        Traz para o filtro as famílias revogadas por outros workers: só as
+        revogadas desde a mais recente já vista (`_watermark`). A tabela
+        inteira (famílias ainda válidas) só é lida na primeira
+        sincronização e quando o filtro enche, para descartar as expiradas;
+        o filtro novo tem o dobro do necessário, então isso é raro.
+        """
+        now = time.monotonic()
+        if now - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = now
+
+        query = db.query(RevokedTokenFamily.family_id, RevokedTokenFamily.revoked_at).filter(
+            RevokedTokenFamily.expires_at > utc_now()
+        )
+        rebuild = self._watermark is None or self._bloom.count >= self._bloom.capacity
+        if not rebuild:
+            query = query.filter(RevokedTokenFamily.revoked_at >= self._watermark - self.SYNC_OVERLAP)
+        rows = query.all()
+
+        with self._lock:
+            if rebuild:
+                # Reconstrói o filtro sem as famílias já expiradas
+                self._bloom = BloomFilter(max(self.bloom_capacity, len(rows) * 2))
+            for family_id, revoked_at in rows:
+                self._bloom.add(family_id)
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            if self._watermark is None:
+                self._watermark = utc_now() - self.SYNC_OVERLAP
+
+    # --- Manutenção ---
+
+    def purge_expired(self, db: Session) -> int:
+        """Remove registros de tokens e famílias já expirados."""
+        now = utc_now()
+        removed = db.query(RevokedRefreshToken).filter(RevokedRefreshToken.expires_at <= now).delete()
+        removed += db.query(RevokedTokenFamily).filter(RevokedTokenFamily.expires_at <= now).delete()
+        db.commit()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores para monitoramento."""
+        return {
+            "bloom_entries": self._bloom.count,
+            "bloom_bits": self._bloom.num_bits,
+            "checks": self.checks,
+            "bloom_negatives": self.bloom_negatives,
+            "db_confirmations": self.db_confirmations,
+            "reuse_detected": self.reuse_detected,
+        }
+
+
+token_revocation_store = TokenRevocationStore()
+
+
+def run_purge() -> int:
+    """Remove os registros expirados em uma sessão própria."""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return token_revocation_store.purge_expired(db)
+    finally:
+        db.close()
+
+
+async def purge_loop(interval_hours: Optional[float] = None) -> None:
+    """Executa run_purge periodicamente (tarefa de fundo do lifespan)."""
+    interval = (interval_hours or settings.TOKEN_REVOCATION_PURGE_INTERVAL_HOURS) * 3600
+    while True:
+        try:
+            removed = await run_in_threadpool(run_purge)
+            if removed:
+                logger.info("Registros de revogação expirados removidos: %s", removed)
+        except Exception:
+            logger.exception("Falha na limpeza dos registros de revogação.")
+        await asyncio.sleep(interval)
@@ -0,0 +1,90 @@
+"""
+Utilitários compartilhados pelos benchmarks (execução contra uma API em execução).
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List
+
+import requests
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Percentil por rank mais próximo (samples em segundos)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def ensure_user(base_url: str, email: str, password: str) -> Dict[str, str]:
+    """Cria (se necessário) um usuário de benchmark e retorna os headers de autenticação."""
+    requests.post(
+        f"{base_url}/users/",
+        json={"email": email, "name": "Benchmark", "password": password},
+        timeout=30,
+    )
+    response = requests.post(
+        f"{base_url}/token",
+        data={"username": email, "password": password},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def run_workers(worker: Callable[[requests.Session, List[float], List[int]], None],
+                concurrency: int, duration: float) -> Dict[str, object]:
+    """
+    Executa `worker` em `concurrency` threads por `duration` segundos.
+    Cada worker registra latências (s) e status HTTP nas listas recebidas.
+    """
+    latencies: List[float] = []
+    statuses: List[int] = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def loop():
+        session = requests.Session()
+        local_lat: List[float] = []
+        local_status: List[int] = []
+        while time.monotonic() < deadline:
+            worker(session, local_lat, local_status)
+        with lock:
+            latencies.extend(local_lat)
+            statuses.extend(local_status)
+
+    threads = [threading.Thread(target=loop, daemon=True) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": sum(1 for code in statuses if code >= 400),
+    }
+
+
+def timed_get(url: str, headers: Dict[str, str]):
+    """Cria um worker que faz GET em `url` e registra a latência."""
+    def worker(session: requests.Session, latencies: List[float], statuses: List[int]):
+        started = time.perf_counter()
+        response = session.get(url, headers=headers, timeout=60)
+        latencies.append(time.perf_counter() - started)
+        statuses.append(response.status_code)
+    return worker
+
+
+def print_result(label: str, result: Dict[str, object]) -> None:
+    """Imprime uma linha de resultado."""
+    print(
+        f"{label:<40} req={result['requests']:<6} rps={result['rps']:<8.1f} "
+        f"p50={result['p50_ms']:<8.1f}ms p99={result['p99_ms']:<8.1f}ms erros={result['errors']}"
+    )
@@ -0,0 +1,45 @@
+"""
+Benchmark: caminho síncrono (threadpool) x assíncrono (AsyncSession).
+
+Mede vazão e p50/p99 de endpoints de leitura em duas instâncias da API,
+uma com DB_ASYNC_ENABLED=false e outra com DB_ASYNC_ENABLED=true,
+apontando para o mesmo banco.
+
+Uso (com as duas APIs rodando):
+    DB_ASYNC_ENABLED=false uvicorn main:app --port 8000
+    DB_ASYNC_ENABLED=true  uvicorn main:app --port 8001
+    python benchmarks/db_modes.py --sync-url http://localhost:8000 --async-url http://localhost:8001
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from common import ensure_user, print_result, run_workers, timed_get  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sync-url", default="http://localhost:8000")
+    parser.add_argument("--async-url", default="http://localhost:8001")
+    parser.add_argument("--email", default="benchmark@ritum.local")
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128],
+                        help="Níveis de concorrência a medir")
+    parser.add_argument("--duration", type=float, default=15.0, help="Duração de cada medição (s)")
+    args = parser.parse_args()
+
+    for mode, base_url in (("sync", args.sync_url), ("async", args.async_url)):
+        headers = ensure_user(base_url, args.email, args.password)
+        print(f"== {mode} ({base_url}) ==")
+        for path in ("/api/v1/clients", "/board/"):
+            for concurrency in args.concurrency:
+                result = run_workers(timed_get(f"{base_url}{path}", headers), concurrency, args.duration)
+                print_result(f"GET {path} c={concurrency}", result)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: latência de endpoints não relacionados durante uma rajada de logins.
+
+Mede p50/p99 de /board/ e /api/v1/clients sem carga e, em seguida, enquanto
+várias threads fazem POST /token em paralelo (bcrypt). Com o bcrypt no
+executor dedicado, a latência dos endpoints de leitura deve se manter.
+
+Uso (com a API rodando):
+    python benchmarks/login_storm.py --base-url http://localhost:8000
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from common import ensure_user, print_result, run_workers, timed_get  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default="benchmark@ritum.local")
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--logins", type=int, default=32, help="Threads fazendo login em paralelo")
+    parser.add_argument("--readers", type=int, default=8, help="Threads lendo endpoints não relacionados")
+    parser.add_argument("--duration", type=float, default=15.0, help="Duração de cada fase (s)")
+    args = parser.parse_args()
+
+    headers = ensure_user(args.base_url, args.email, args.password)
+    probes = {
+        "GET /board/": f"{args.base_url}/board/",
+        "GET /api/v1/clients": f"{args.base_url}/api/v1/clients",
+    }
+
+    print("== Fase 1: sem carga de login ==")
+    for label, url in probes.items():
+        print_result(label, run_workers(timed_get(url, headers), args.readers, args.duration))
+
+    print(f"\n== Fase 2: {args.logins} threads de login em paralelo ==")
+    login_result = {}
+
+    def login_worker(session, latencies, statuses):
+        started = time.perf_counter()
+        response = session.post(
+            f"{args.base_url}/token",
+            data={"username": args.email, "password": args.password},
+            timeout=60,
+        )
+        latencies.append(time.perf_counter() - started)
+        statuses.append(response.status_code)
+
+    storm_duration = args.duration * len(probes) + 2
+    storm = threading.Thread(
+        target=lambda: login_result.update(run_workers(login_worker, args.logins, storm_duration)),
+        daemon=True,
+    )
+    storm.start()
+    time.sleep(1)  # deixa a rajada estabilizar
+
+    for label, url in probes.items():
+        print_result(f"{label} (durante logins)", run_workers(timed_get(url, headers), args.readers, args.duration))
+
+    storm.join()
+    print_result("POST /token", login_result)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,31 @@ Ritum API - Backend FastAPI
 SaaS jurídico para advogados brasileiros
 """
 
+import asyncio
 import sys
 import os
 from pathlib import Path
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 # Importar configurações
 from app.core.config import settings
+from app.core.security import PasswordHasherBusyError, shutdown_password_executor
+from app.core.pagination import InvalidCursorError
+from app.core.sparse_fields import InvalidFieldsError
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.http_cache import ConditionalRequestMiddleware
+from app.core.compression import CompressionMiddleware
+from app.services.partitions import maintenance_loop
+from app.services.dashboard import reconcile_loop
+from app.services.kanban_ranks import rebalance_loop
+from app.services.token_revocation import purge_loop
+from app.core.ranking import InvalidRankError
 
 # Importar routers
 from app.routers import (
@@ -25,6 +39,8 @@ from app.routers import (
     ai,
     extrajudicial,
     documents,
+    metrics,
+    dashboard,
 )
 
 
@@ -51,6 +67,26 @@ async def lifespan(app: FastAPI):
     (static_dir / "generated_documents").mkdir(exist_ok=True)
     print("✅ Diretórios criados")
     
+    # Partições mensais de andamentos e intimações (criação antecipada e retenção)
+    partition_task = None
+    if settings.PARTITION_MAINTENANCE_ENABLED:
+        partition_task = asyncio.create_task(maintenance_loop())
+    
+    # Reconciliação dos contadores do painel com as tabelas de origem
+    dashboard_task = None
+    if settings.DASHBOARD_RECONCILE_ENABLED:
+        dashboard_task = asyncio.create_task(reconcile_loop())
+    
+    # Rebalanceamento das chaves de ordenação do Kanban
+    kanban_task = None
+    if settings.KANBAN_REBALANCE_ENABLED:
+        kanban_task = asyncio.create_task(rebalance_loop())
+    
+    # Limpeza dos refresh tokens e famílias revogados já expirados
+    purge_task = None
+    if settings.TOKEN_REVOCATION_PURGE_ENABLED:
+        purge_task = asyncio.create_task(purge_loop())
+    
     print(f"✅ Ambiente: {settings.ENVIRONMENT}")
     print(f"✅ CORS origins: {settings.CORS_ORIGINS}")
     print("✅ Ritum API pronta!")
@@ -59,6 +95,15 @@ async def lifespan(app: FastAPI):
     
     # === SHUTDOWN ===
     print("👋 Encerrando Ritum API...")
+    if partition_task is not None:
+        partition_task.cancel()
+    if dashboard_task is not None:
+        dashboard_task.cancel()
+    if kanban_task is not None:
+        kanban_task.cancel()
+    if purge_task is not None:
+        purge_task.cancel()
+    shutdown_password_executor()
 
 
 # Criar aplicação FastAPI
@@ -72,6 +117,22 @@ app = FastAPI(
 
 # === MIDDLEWARE ===
 
+# Contagem de queries por requisição (N+1, queries lentas, orçamento)
+if settings.DB_QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# ETag / 304 (o ETag é calculado antes da compressão)
+if settings.HTTP_ETAG_ENABLED:
+    app.add_middleware(ConditionalRequestMiddleware)
+
+# Compressão brotli/gzip de respostas grandes
+if settings.HTTP_COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Rate limiting (token bucket por usuário e por IP)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -79,9 +140,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
     allow_headers=["*"],
+    # Cabeçalhos de paginação lidos pelo frontend
+    expose_headers=["X-Next-Cursor", "X-Has-More", "ETag"],
 )
 
 
+# === HANDLERS DE ERRO ===
+
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+    """
+    Fila de bcrypt cheia: pede ao cliente para tentar novamente em instantes.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Servidor ocupado processando logins. Tente novamente em instantes."},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    """
+    Cursor de paginação malformado ou de outra ordenação.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
+@app.exception_handler(InvalidFieldsError)
+async def invalid_fields_handler(request: Request, exc: InvalidFieldsError):
+    """
+    Campo inexistente no parâmetro `fields` de uma listagem.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
+@app.exception_handler(InvalidRankError)
+async def invalid_rank_handler(request: Request, exc: InvalidRankError):
+    """
+    Reordenação com vizinhos fora de ordem: o quadro mudou desde a leitura.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": str(exc)},
+    )
+
+
 # === STATIC FILES ===
 
 static_dir = Path(__file__).parent / "static"
@@ -114,6 +224,12 @@ app.include_router(extrajudicial.router)
 # Gerador de Documentos
 app.include_router(documents.router)
 
+# Painel inicial
+app.include_router(dashboard.router)
+
+# Monitoramento interno
+app.include_router(metrics.router)
+
 
 # === ENDPOINTS DE SAÚDE ===
 
@@ -0,0 +1,73 @@
+"""
+Configuração comum dos testes.
+
+Os testes rodam em SQLite: JSONB (colunas de users e extrajudicial_cases)
+é compilado como JSON para que Base.metadata.create_all funcione.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def db_engine():
+    """Banco SQLite em memória com todas as tabelas."""
+    import app.models  # noqa: F401 (registra as tabelas em Base.metadata)
+    from app.database import Base
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=db_engine)
+
+
+@pytest.fixture
+def client(session_factory):
+    """
+    TestClient com get_db apontando para o SQLite de teste. Sem o
+    `with`: o lifespan (tarefas de fundo no banco real) não é executado.
+    """
+    from app.core.identity_cache import identity_cache
+    from app.dependencies import get_db
+    from main import app
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    identity_cache.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    # Restaura a sobrescrita anterior (test_main define a sua no import)
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    identity_cache.clear()
+
+
+def login(client, email="a@example.com", password="pw123456"):
+    """Cadastra o usuário (se preciso) e devolve os tokens do login."""
+    client.post("/users/", json={"email": email, "name": "A", "password": password})
+    response = client.post("/token", data={"username": email, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
@@ -0,0 +1,45 @@
+import uuid
+
+from app.services.client_dedup import DedupRecord, find_duplicate_groups, jaro_winkler
+
+
+def _record(name, cpf="", email="", phone=""):
+    return DedupRecord(id=uuid.uuid4(), name=name, cpf=cpf, email=email, phone=phone)
+
+
+def test_jaro_winkler():
+    assert round(jaro_winkler("martha", "marhta"), 3) == 0.961
+    assert round(jaro_winkler("dwayne", "duane"), 3) == 0.84
+    assert jaro_winkler("ana", "") == 0.0
+
+
+def test_groups_by_cpf_and_similar_names():
+    records = [
+        _record("jose da silva", cpf="52998224725"),
+        _record("jose silva", cpf="52998224725"),
+        _record("joao pereira"),
+        _record("joao pereria"),
+        _record("maria souza", cpf="11144477735"),
+        _record("maria souza", cpf="39053344705"),
+        _record("carlos alberto"),
+        _record("carlos roberto"),
+    ]
+    groups = find_duplicate_groups(records)
+
+    index = {record.id: position for position, record in enumerate(records)}
+    members = [{index[client_id] for client_id in group.client_ids} for group in groups]
+    assert sorted(members, key=min) == [{0, 1}, {2, 3}]
+    assert groups[0].score == 1.0 and groups[0].reasons == {"cpf"}
+
+
+def test_record_without_cpf_does_not_bridge_different_cpfs():
+    records = [
+        _record("ana paula lima", cpf="52998224725"),
+        _record("ana paula lima"),
+        _record("ana paula lima", cpf="11144477735"),
+    ]
+    groups = find_duplicate_groups(records)
+
+    assert len(groups) == 1
+    cpfs = {records[index].cpf for index in range(3) if records[index].id in groups[0].client_ids}
+    assert len(groups[0].client_ids) == 2 and len(cpfs - {""}) == 1
@@ -0,0 +1,56 @@
+import asyncio
+import csv
+import io
+import json
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.services import client_export
+from app.services.client_import import iter_csv_records
+
+
+def export(db, user_id, file_format):
+    async def collect():
+        return [chunk async for chunk in client_export.stream_clients(db, user_id, file_format)]
+    return asyncio.run(collect())
+
+
+def test_escape_csv_cell():
+    for value in ("=1+1", "+5511999", "-2", "@SUM(A1)", "\tx", "\rx"):
+        assert client_export.escape_csv_cell(value) == "'" + value
+    for value in ("Ana", "", None, 10, "a=b"):
+        assert client_export.escape_csv_cell(value) == value
+
+
+def test_streaming_export_on_sqlite(db_engine, monkeypatch):
+    monkeypatch.setattr(client_export, "EXPORT_BATCH_SIZE", 2)
+    owner, other = uuid.uuid4(), uuid.uuid4()
+    with Session(db_engine, expire_on_commit=False) as db:
+        for index in range(5):
+            crud.create_user_client(db, schemas.ClientCreate(fullName=f"Cliente {index}"), owner)
+        crud.create_user_client(
+            db, schemas.ClientCreate(fullName='=HYPERLINK("http://x")', phone="+55 81 9999", address={"city": "@Recife"}),
+            owner,
+        )
+        crud.create_user_client(db, schemas.ClientCreate(fullName="De outro"), other)
+
+        chunks = export(db, owner, "csv")
+        # Cabeçalho + um bloco por lote de 2 linhas
+        assert len(chunks) == 4
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+        assert [row["fullName"] for row in rows[:5]] == [f"Cliente {index}" for index in range(5)]
+        assert rows[5]["fullName"] == '\'=HYPERLINK("http://x")'
+        assert rows[5]["phone"] == "'+55 81 9999"
+        assert rows[5]["address.city"] == "'@Recife"
+
+        # A importação lê de volta os valores originais
+        records = [record for _, record, _ in iter_csv_records(io.BytesIO(b"".join(chunks)))]
+        assert records[5]["fullName"] == '=HYPERLINK("http://x")'
+        assert records[5]["phone"] == "+55 81 9999"
+        assert records[5]["address"]["city"] == "@Recife"
+
+        lines = b"".join(export(db, owner, "ndjson")).decode("utf-8").splitlines()
+        assert len(lines) == 6
+        assert json.loads(lines[5])["fullName"] == '=HYPERLINK("http://x")'
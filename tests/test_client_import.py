@@ -0,0 +1,88 @@
+import io
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.core.normalization import normalize_cpf
+from app.crud.client import upsert_user_clients
+from app.database import Base
+from app.schemas import ClientCreate, ClientImport
+from app.services.client_import import ImportReport, iter_csv_records, next_batch
+from conftest import login
+
+
+def test_normalize_cpf():
+    assert normalize_cpf("52998224725") == "529.982.247-25"
+    assert normalize_cpf(" 529.982.247-25 ") == "529.982.247-25"
+    assert normalize_cpf("") is None
+    for invalid in ("123", "111.111.111-11", "529.982.247-26"):
+        with pytest.raises(ValueError):
+            normalize_cpf(invalid)
+
+
+def test_only_the_import_rejects_invalid_cpfs():
+    assert ClientImport(fullName="A", cpf="52998224725").cpf == "529.982.247-25"
+    with pytest.raises(ValueError):
+        ClientImport(fullName="A", cpf="529.982.247-26")
+    # Cadastro avulso: normaliza o formato sem rejeitar
+    assert ClientCreate(fullName="A", cpf="52998224726").cpf == "529.982.247-26"
+    assert ClientCreate(fullName="A", cpf=" 123 ").cpf == "123"
+    assert ClientCreate(fullName="A", cpf="").cpf is None
+
+
+def test_client_endpoints_keep_accepting_legacy_cpfs(client):
+    headers = {"Authorization": f"Bearer {login(client)['access_token']}"}
+    for cpf, stored in (("123", "123"), ("529.982.247-26", "529.982.247-26"), ("11111111111", "111.111.111-11")):
+        response = client.post("/api/v1/clients", headers=headers, json={"fullName": "Ana", "cpf": cpf})
+        assert response.status_code == 201, response.text
+        assert response.json()["cpf"] == stored
+        # PUT que reenvia o CPF antigo sem mudança
+        response = client.put(f"/api/v1/clients/{response.json()['id']}", headers=headers, json={"fullName": "Ana Maria", "cpf": stored})
+        assert response.status_code == 200, response.text
+        assert response.json()["cpf"] == stored
+
+
+def test_csv_batch_reports_invalid_and_repeated_rows():
+    data = (
+        "﻿fullName;cpf;address.city\n"
+        "Ana;52998224725;Recife\n"
+        "Bruno;123;\n"
+        ";;\n"
+        "Ana Maria;529.982.247-25;\n"
+    ).encode("utf-8")
+    report = ImportReport()
+    batch = next_batch(iter_csv_records(io.BytesIO(data)), report)
+
+    assert [(line, client.full_name) for line, client in batch] == [(5, "Ana Maria")]
+    assert report.total_rows == 3
+    assert [error["line"] for error in report.errors] == [3, 2]
+
+
+def test_upsert_user_clients_creates_updates_and_skips_other_owner():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[models.User.__table__, models.Client.__table__])
+    db = Session(engine, expire_on_commit=False)
+    owner, other = uuid.uuid4(), uuid.uuid4()
+    db.add(models.Client(full_name="Ana", cpf="529.982.247-25", phone="1111", owner_id=owner))
+    db.add(models.Client(full_name="Carla", cpf="111.444.777-35", owner_id=other))
+    db.commit()
+
+    statuses = upsert_user_clients(db, [
+        ClientImport(fullName="Ana Maria", cpf="52998224725"),
+        ClientImport(fullName="Bruno", cpf="987.654.321-00"),
+        ClientImport(fullName="Carla Souza", cpf="11144477735"),
+        ClientImport(fullName="Sem CPF"),
+    ], owner)
+
+    assert statuses == [False, True, None, True]
+    db.expire_all()
+    ana = db.scalars(select(models.Client).where(models.Client.cpf == "529.982.247-25")).one()
+    # Campos ausentes no arquivo não apagam os existentes
+    assert (ana.full_name, ana.phone) == ("Ana Maria", "1111")
+    carla = db.scalars(select(models.Client).where(models.Client.cpf == "111.444.777-35")).one()
+    assert (carla.full_name, carla.owner_id) == ("Carla", other)
+    assert db.scalar(select(func.count()).select_from(models.Client).where(models.Client.owner_id == owner)) == 3
@@ -0,0 +1,44 @@
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.client import search_user_clients
+from app.models import Client
+
+
+@pytest.fixture
+def owner_id(db_engine):
+    owner_id = uuid.uuid4()
+    with Session(db_engine) as db:
+        db.add_all([
+            Client(full_name="José da Silva", email="jose@example.com", cpf="529.982.247-25",
+                   phone="(11) 98765-4321", owner_id=owner_id),
+            Client(full_name="Maria_Souza", email="maria@example.com", owner_id=owner_id),
+            Client(full_name="100% Legal Ltda", owner_id=owner_id),
+            Client(full_name="Mariaxsouza", owner_id=owner_id),
+            # Outro usuário: nunca aparece na busca
+            Client(full_name="José Pereira", email="jose@other.com", cpf="111.444.777-35", owner_id=uuid.uuid4()),
+        ])
+        db.commit()
+    return owner_id
+
+
+def names(db_engine, owner_id, q):
+    with Session(db_engine) as db:
+        return [client.full_name for client in search_user_clients(db, owner_id, q)]
+
+
+@pytest.mark.parametrize("q", ["silva", "JOSE@EXAMPLE", "52998224725", "529.982", "98765-4321", "11987654321"])
+def test_matches_name_email_cpf_and_phone(db_engine, owner_id, q):
+    assert names(db_engine, owner_id, q) == ["José da Silva"]
+
+
+def test_like_metacharacters_are_literal(db_engine, owner_id):
+    assert names(db_engine, owner_id, "%") == ["100% Legal Ltda"]
+    assert names(db_engine, owner_id, "maria_") == ["Maria_Souza"]
+
+
+def test_only_owner_clients(db_engine, owner_id):
+    assert names(db_engine, owner_id, "jos") == ["José da Silva"]
+    assert names(db_engine, owner_id, "11144477735") == []
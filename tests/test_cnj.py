@@ -0,0 +1,33 @@
+import pytest
+
+from app.core.cnj import (
+    InvalidCNJNumberError,
+    compute_check_digits,
+    normalize_cnj,
+    parse_cnj,
+    parse_cnj_batch,
+    parse_court,
+)
+
+
+def test_parse_and_normalize():
+    number = parse_cnj("10005509420228260005")
+    assert (number.sequential, number.year, number.segment, number.tribunal, number.origin) == (1000550, 2022, 8, 26, 5)
+    assert number.court == "TJSP"
+    assert normalize_cnj(" 1000550-94.2022.8.26.0005 ") == "1000550-94.2022.8.26.0005"
+    assert compute_check_digits(1000550, 2022, 8, 26, 5) == 94
+
+
+def test_invalid_numbers():
+    for value in ("1000550-95.2022.8.26.0005", "1000550-94.2022.8.26", ""):
+        with pytest.raises(InvalidCNJNumberError):
+            parse_cnj(value)
+    assert parse_cnj_batch(["1000550-94.2022.8.26.0005", "123", None])[1:] == [None, None]
+
+
+def test_parse_court():
+    assert parse_court("tjsp") == (8, 26)
+    assert parse_court("TRT2") == (5, 2)
+    assert parse_court("STJ") == (3, None)
+    with pytest.raises(InvalidCNJNumberError):
+        parse_court("TJXX")
@@ -0,0 +1,70 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.crud import client as client_crud
+from app.crud import kanban
+
+
+@pytest.fixture
+def db(db_engine):
+    with Session(db_engine, expire_on_commit=False) as session:
+        yield session
+
+
+def count(db, model):
+    return db.scalar(select(func.count()).select_from(model))
+
+
+def test_create_task_card_only_in_owned_column(db):
+    owner, intruder = uuid.uuid4(), uuid.uuid4()
+    column = kanban.create_task_column(db, schemas.TaskColumnCreate(title="A fazer"), owner)
+
+    card = kanban.create_task_card(db, schemas.TaskCardCreate(title="Petição", due_date=datetime(2024, 5, 1)), column.id, owner)
+    assert (card.id, card.column_id, card.title, card.due_date) == (card.id, column.id, "Petição", datetime(2024, 5, 1))
+    second = kanban.create_task_card(db, schemas.TaskCardCreate(title="Recurso"), column.id, owner)
+    assert card.rank < second.rank
+
+    assert kanban.create_task_card(db, schemas.TaskCardCreate(title="Intruso"), column.id, intruder) is None
+    assert kanban.create_task_card(db, schemas.TaskCardCreate(title="Sem coluna"), column.id + 1, owner) is None
+    db.rollback()
+    assert count(db, models.TaskCard) == 2
+
+
+def test_update_and_delete_task_card_check_owner(db):
+    owner, intruder = uuid.uuid4(), uuid.uuid4()
+    column = kanban.create_task_column(db, schemas.TaskColumnCreate(title="A fazer"), owner)
+    card = kanban.create_task_card(db, schemas.TaskCardCreate(title="Petição"), column.id, owner)
+
+    assert kanban.update_task_card(db, card.id, schemas.TaskCardUpdate(title="Outro"), intruder) is None
+    assert kanban.delete_task_card(db, card.id, intruder) is None
+    db.rollback()
+
+    updated = kanban.update_task_card(db, card.id, schemas.TaskCardUpdate(title="Contestação"), owner)
+    assert (updated.id, updated.title, updated.rank) == (card.id, "Contestação", card.rank)
+    assert kanban.delete_task_card(db, card.id, owner).id == card.id
+    assert count(db, models.TaskCard) == 0
+
+
+def test_update_client_returns_none_for_foreign_client(db):
+    owner, intruder = uuid.uuid4(), uuid.uuid4()
+    client = client_crud.create_user_client(db, schemas.ClientCreate(fullName="Ana", phone="1111"), owner)
+    created_at, updated_at = client.created_at, client.updated_at
+
+    assert client_crud.update_client(db, client.id, schemas.ClientUpdate(fullName="Intruso"), intruder) is None
+    assert client_crud.delete_client(db, client.id, intruder) is None
+    db.rollback()
+
+    updated = client_crud.update_client(
+        db, client.id, schemas.ClientUpdate(fullName="Ana Maria", address={"city": "Recife"}), owner,
+    )
+    assert (updated.id, updated.full_name, updated.phone) == (client.id, "Ana Maria", "1111")
+    assert updated.address["city"] == "Recife"
+    assert updated.created_at == created_at and updated.updated_at > updated_at
+
+    db.expire_all()
+    assert db.get(models.Client, client.id).full_name == "Ana Maria"
@@ -0,0 +1,127 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.crud.dashboard import _stored_counters_query, get_dashboard_counters, reconcile_dashboard_counters
+from app.database import Base
+from app.services.dashboard import build_dashboard
+
+TODAY = date(2024, 10, 17)  # quinta-feira
+
+
+def make_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        models.Process.__table__,
+        models.TaskColumn.__table__,
+        models.TaskCard.__table__,
+        models.Intimation.__table__,
+        models.DashboardCounter.__table__,
+    ])
+    with engine.begin() as conn:
+        # JSONB não existe no SQLite: extrajudicial_cases é criada à mão
+        conn.execute(text(
+            "CREATE TABLE extrajudicial_cases (id CHAR(32) PRIMARY KEY, owner_id CHAR(32) NOT NULL, "
+            "case_type VARCHAR NOT NULL, case_name VARCHAR NOT NULL, status VARCHAR, data JSON, "
+            "created_at DATETIME, updated_at DATETIME)"
+        ))
+    return Session(engine, expire_on_commit=False)
+
+
+def seed(db, owner_id):
+    db.add_all([
+        models.Process(number="1", client_name="A", type="Cível", status="Ativo", owner_id=owner_id),
+        models.Process(number="2", client_name="B", type="Cível", status="Ativo", owner_id=owner_id),
+        models.Process(number="3", client_name="C", type="Cível", status="Arquivado", owner_id=owner_id),
+        models.Process(number="4", client_name="D", type="Cível", status="Ativo", owner_id=uuid.uuid4()),
+    ])
+    db.add_all([
+        models.ExtrajudicialCase(case_type="inventario", case_name="A", owner_id=owner_id),
+        models.ExtrajudicialCase(case_type="divorcio", case_name="B", status=None, owner_id=owner_id),
+        models.ExtrajudicialCase(case_type="usucapiao", case_name="C", status="Concluído", owner_id=owner_id),
+    ])
+    column = models.TaskColumn(title="A fazer", rank="i", owner_id=owner_id)
+    db.add(column)
+    db.flush()
+    db.add_all([
+        models.TaskCard(title="Segunda", due_date=datetime(2024, 10, 14, 9), rank="i", column_id=column.id),
+        models.TaskCard(title="Domingo", due_date=datetime(2024, 10, 20, 23), rank="i", column_id=column.id),
+        models.TaskCard(title="Próxima semana", due_date=datetime(2024, 10, 21, 9), rank="i", column_id=column.id),
+        models.TaskCard(title="Sem prazo", rank="i", column_id=column.id),
+    ])
+    db.add_all([
+        models.Intimation(publication_date=datetime(2024, 10, 17, 8), content="x", owner_id=owner_id),
+        models.Intimation(publication_date=datetime(2024, 10, 11, 8), content="x", owner_id=owner_id),
+        models.Intimation(publication_date=datetime(2024, 9, 18, 8), content="x", owner_id=owner_id),
+        models.Intimation(publication_date=datetime(2024, 9, 17, 8), content="x", owner_id=owner_id),
+    ])
+    db.commit()
+
+
+def test_dashboard_windows():
+    db = make_session()
+    owner_id = uuid.uuid4()
+    seed(db, owner_id)
+
+    summary = build_dashboard(get_dashboard_counters(db, owner_id, TODAY), TODAY)
+
+    assert summary["processes_by_status"] == {"Ativo": 2, "Arquivado": 1}
+    assert summary["processes_total"] == 3
+    assert summary["open_extrajudicial_cases"] == 2
+    assert (summary["week_start"], summary["week_end"]) == (date(2024, 10, 14), date(2024, 10, 20))
+    assert summary["cards_due_this_week"] == 2
+    assert summary["intimations_last_7_days"] == 2
+    assert summary["intimations_last_30_days"] == 3
+
+
+def test_reconcile_repairs_drift():
+    db = make_session()
+    owner_id = uuid.uuid4()
+    seed(db, owner_id)
+
+    first = reconcile_dashboard_counters(db, today=TODAY)
+    assert first["users"] == 2
+    assert reconcile_dashboard_counters(db, today=TODAY) == {"users": 0, "repaired": 0}
+
+    # Divergências: contador errado, contador que não deveria existir e um que sumiu
+    status = db.get(models.DashboardCounter, (owner_id, "process_status", "Ativo"))
+    status.count = 7
+    db.add(models.DashboardCounter(user_id=owner_id, metric="process_status", bucket="Suspenso", count=1))
+    db.delete(db.get(models.DashboardCounter, (owner_id, "intimations", "2024-10-17")))
+    db.commit()
+
+    assert reconcile_dashboard_counters(db, user_ids=[owner_id], today=TODAY) == {"users": 1, "repaired": 3}
+    db.expire_all()
+    counters = {
+        (counter.metric, counter.bucket): counter.count
+        for counter in db.query(models.DashboardCounter).filter_by(user_id=owner_id)
+    }
+    assert counters[("process_status", "Ativo")] == 2
+    assert ("process_status", "Suspenso") not in counters
+    assert counters[("intimations", "2024-10-17")] == 1
+
+
+def test_stale_day_buckets_are_deleted_and_never_read():
+    db = make_session()
+    owner_id = uuid.uuid4()
+    seed(db, owner_id)
+    reconcile_dashboard_counters(db, today=TODAY)
+
+    # Dias fora da janela: gravados pelos triggers dias atrás
+    db.add_all([
+        models.DashboardCounter(user_id=owner_id, metric="intimations", bucket="2024-09-01", count=4),
+        models.DashboardCounter(user_id=owner_id, metric="cards_due", bucket="2024-10-01", count=2),
+    ])
+    db.commit()
+
+    read = set(db.execute(_stored_counters_query(owner_id, TODAY)).all())
+    assert ("intimations", "2024-09-01", 4) not in read and ("cards_due", "2024-10-01", 2) not in read
+    assert {("process_status", "Ativo", 2), ("open_cases", "", 2), ("intimations", "2024-10-17", 1)} <= read
+
+    assert reconcile_dashboard_counters(db, today=TODAY) == {"users": 1, "repaired": 2}
+    buckets = {(counter.metric, counter.bucket) for counter in db.query(models.DashboardCounter).filter_by(user_id=owner_id)}
+    assert ("intimations", "2024-09-01") not in buckets and ("cards_due", "2024-10-01") not in buckets
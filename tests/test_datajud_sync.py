@@ -0,0 +1,150 @@
+import asyncio
+import json
+import threading
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.core.cnj import compute_check_digits
+from app.database import Base
+from app.services import datajud_sync
+from app.services.datajud_sync import DataJudClient, DataJudError, sync_user_processes
+
+
+def cnj(sequential, segment=8, tribunal=26):
+    check = compute_check_digits(sequential, 2023, segment, tribunal, 100)
+    return f"{sequential:07d}-{check:02d}.2023.{segment}.{tribunal:02d}.0100"
+
+
+def digits(number):
+    return "".join(char for char in number if char.isdigit())
+
+
+MOVEMENTS = {
+    digits(cnj(1)): [
+        {"nome": "Distribuição", "dataHora": "2024-01-10T10:00:00.000Z"},
+        {"nome": "Juntada", "dataHora": "2024-02-01T09:30:00.000Z",
+         "complementosTabelados": [{"descricao": "tipo_de_documento", "nome": "Petição"}]},
+    ],
+    digits(cnj(2)): [
+        {"nome": "Distribuição", "dataHora": "2024-01-05T08:00:00.000Z"},
+        {"nome": "Sentença", "dataHora": "20240301120000"},
+    ],
+}
+
+
+class FakeDataJud(BaseHTTPRequestHandler):
+    requests_seen = []
+    failures_left = {}
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        number = body["query"]["match"]["numeroProcesso"]
+        self.requests_seen.append((self.path, number, self.headers.get("Authorization")))
+        if self.failures_left.get(number, 0) > 0:
+            self.failures_left[number] -= 1
+            self._reply(503, {"error": "unavailable"})
+        elif self.path != "/api_publica_tjsp/_search":
+            self._reply(404, {"error": "index_not_found"})
+        else:
+            movements = MOVEMENTS.get(number)
+            hits = [{"_source": {"numeroProcesso": number, "movimentos": movements}}] if movements else []
+            self._reply(200, {"hits": {"hits": hits}})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_sync_is_incremental_and_retries():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeDataJud)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = DataJudClient(base_url=f"http://127.0.0.1:{server.server_port}", api_key="test-key", timeout=5)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[models.Process.__table__, models.ProcessUpdate.__table__])
+    owner_id = uuid.uuid4()
+    db = Session(engine, expire_on_commit=False)
+    first = models.Process(number=cnj(1), client_name="A", type="Cível", owner_id=owner_id)
+    db.add_all([
+        first,
+        models.Process(number=cnj(2), client_name="B", type="Cível", owner_id=owner_id),
+        models.Process(number=cnj(3), client_name="C", type="Cível", owner_id=owner_id),
+        models.Process(number=cnj(4, segment=4, tribunal=3), client_name="D", type="Cível", owner_id=owner_id),
+        models.Process(number="583.00.2009.123456-7", client_name="E", type="Cível", owner_id=owner_id),
+    ])
+    db.flush()
+    db.add(models.ProcessUpdate(process_id=first.id, date=datetime(2024, 1, 10, 10, 0), description="Distribuição"))
+    db.commit()
+
+    FakeDataJud.failures_left = {digits(cnj(2)): 2}
+    try:
+        report = asyncio.run(sync_user_processes(db, owner_id, client=client, concurrency=2, backoff=0.01))
+        again = asyncio.run(sync_user_processes(db, owner_id, client=client, concurrency=2, backoff=0.01))
+    finally:
+        server.shutdown()
+        db.close()
+
+    assert report["processes"] == 5 and report["skipped"] == 1
+    assert report["synced"] == 2 and report["not_found"] == 1 and report["failed"] == 1
+    assert report["errors"][0]["number"] == cnj(4, segment=4, tribunal=3)
+    # Processo 1 já tinha a distribuição: só a juntada é nova
+    assert report["inserted"] == 3
+    assert again["inserted"] == 0
+
+    with Session(engine) as check:
+        descriptions = sorted(update.description for update in check.query(models.ProcessUpdate))
+    assert descriptions == ["Distribuição", "Distribuição", "Juntada (tipo_de_documento: Petição)", "Sentença"]
+    assert ("/api_publica_trf3/_search", digits(cnj(4, segment=4, tribunal=3)), "APIKey test-key") in FakeDataJud.requests_seen
+
+
+class ThrottledClient:
+    """Responde 429 com Retry-After nas primeiras chamadas."""
+
+    def __init__(self, retry_after, failures):
+        self.retry_after = retry_after
+        self.failures = failures
+        self.calls = 0
+
+    def fetch_movements(self, alias, number):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise DataJudError("HTTP 429", retryable=True, retry_after=self.retry_after)
+        return []
+
+
+def test_retry_after_is_capped(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(datajud_sync.asyncio, "sleep", fake_sleep)
+    fetch = datajud_sync._fetch_with_retry
+
+    # Dentro do limite (backoff * 2 ** max_retries = 4s): espera o Retry-After
+    client = ThrottledClient(retry_after=4, failures=2)
+    assert asyncio.run(fetch(client, "tjsp", "1", max_retries=2, backoff=1)) == []
+    assert delays == [4, 4] and client.calls == 3
+
+    # Acima do limite: falha na hora, sem esperar nem repetir
+    delays.clear()
+    client = ThrottledClient(retry_after=3600, failures=1)
+    with pytest.raises(DataJudError, match="Retry-After") as excinfo:
+        asyncio.run(fetch(client, "tjsp", "1", max_retries=2, backoff=1))
+    assert not excinfo.value.retryable
+    assert delays == [] and client.calls == 1
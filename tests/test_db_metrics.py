@@ -0,0 +1,64 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+
+from app.core.db_metrics import PoolMetrics, instrumented_pool_class, pool_options
+
+
+def make_engine(tmp_path, base, metrics, **options):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=instrumented_pool_class(base, metrics), **options)
+    event.listen(engine, "connect", metrics.record_connect)
+    return engine
+
+
+def test_queue_pool_counts_checkouts_waits_and_timeouts(tmp_path):
+    metrics = PoolMetrics()
+    engine = make_engine(tmp_path, QueuePool, metrics, pool_size=1, max_overflow=0, pool_timeout=0.5)
+
+    held = engine.connect()
+    held.execute(text("SELECT 1"))
+    snapshot = metrics.snapshot(engine.pool)
+    assert (snapshot["pool_class"], snapshot["checkouts"], snapshot["checked_out"]) == ("InstrumentedQueuePool", 1, 1)
+    assert snapshot["connects"] == 1
+
+    # Pool esgotado: o checkout espera pool_timeout e falha
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    assert metrics.checkout_timeouts == 1
+
+    # A conexão volta ao pool durante a espera do próximo checkout
+    releaser = threading.Timer(0.05, held.close)
+    releaser.start()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        snapshot = metrics.snapshot(engine.pool)
+    releaser.join()
+
+    assert snapshot["checkouts"] == 2 and snapshot["checked_out"] == 1
+    assert snapshot["wait_max_ms"] >= 20
+    assert sum(snapshot["wait_histogram"].values()) == 2
+    assert metrics.snapshot(engine.pool)["checked_out"] == 0
+    engine.dispose()
+
+
+def test_static_pool_counts_checkouts(tmp_path):
+    metrics = PoolMetrics()
+    engine = make_engine(tmp_path, StaticPool, metrics)
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    snapshot = metrics.snapshot(engine.pool)
+    assert (snapshot["pool_class"], snapshot["checkouts"], snapshot["connects"]) == ("InstrumentedStaticPool", 3, 1)
+    assert "checked_out" not in snapshot
+    engine.dispose()
+
+
+def test_pool_options_use_null_pool_behind_pgbouncer():
+    settings = SimpleNamespace(DB_PGBOUNCER_MODE=True)
+    options = pool_options(settings, PoolMetrics())
+    assert options["poolclass"].__name__ == "InstrumentedNullPool"
+    assert issubclass(options["poolclass"], NullPool)
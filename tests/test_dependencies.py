@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import event
+
+from app.core.identity_cache import identity_cache
+from app.core.security import create_access_token, create_refresh_token
+from app.services.token_revocation import token_revocation_store
+from conftest import login
+
+
+@pytest.fixture
+def checkouts(db_engine):
+    """Conexões retiradas do pool do banco de teste."""
+    counter = []
+    event.listen(db_engine, "checkout", lambda *args: counter.append(1))
+    return counter
+
+
+@pytest.fixture(autouse=True)
+def revocation_store():
+    token_revocation_store.__init__()
+    yield token_revocation_store
+    token_revocation_store.__init__()
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_cached_identity_request_does_not_touch_the_pool(client, checkouts):
+    token = login(client)["access_token"]
+    # Primeira requisição: sincroniza o filtro de revogação e aquece o cache
+    assert client.get("/users/me", headers=bearer(token)).status_code == 200
+
+    checkouts.clear()
+    assert client.get("/users/me", headers=bearer(token)).status_code == 200
+    assert checkouts == []
+
+
+def test_cold_identity_opens_one_session(client, checkouts):
+    token = login(client)["access_token"]
+    assert client.get("/users/me", headers=bearer(token)).status_code == 200
+    identity_cache.clear()
+
+    checkouts.clear()
+    assert client.get("/users/me", headers=bearer(token)).status_code == 200
+    assert len(checkouts) == 1
+    assert identity_cache.get("a@example.com") is not None
+
+
+def test_rejects_refresh_tokens_and_unknown_users_as_credentials(client):
+    login(client)
+    refresh_token = create_refresh_token({"sub": "a@example.com"})
+    assert client.get("/users/me", headers=bearer(refresh_token)).status_code == 401
+    assert client.get("/users/me", headers=bearer(create_access_token({"sub": "ghost@example.com"}))).status_code == 401
+    assert client.get("/users/me", headers={"Authorization": "Token abc"}).status_code == 401
@@ -0,0 +1,37 @@
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, choose_encoding
+from app.core.http_cache import ConditionalRequestMiddleware, etag_matches
+
+
+def test_etag_matching_ignores_encoding_suffix_and_weak_prefix():
+    assert etag_matches('"abc-gzip"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc-br"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding(None) is None
+
+
+def test_middlewares_etag_304_and_compression():
+    app = Starlette(routes=[Route("/items", lambda request: JSONResponse({"items": ["x" * 50] * 100}))])
+    app.add_middleware(ConditionalRequestMiddleware)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    client = TestClient(app)
+
+    response = client.get("/items", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert len(response.json()["items"]) == 100
+
+    not_modified = client.get("/items", headers={"If-None-Match": response.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.identity_cache import TTLCache, identity_cache
+from conftest import login
+
+
+def bearer(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+@pytest.fixture
+def statements(db_engine):
+    executed = []
+    event.listen(db_engine, "before_cursor_execute", lambda *args: executed.append(args[2]))
+    return executed
+
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.core.identity_cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(max_size=2, ttl_seconds=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    now[0] += 10
+    assert cache.get("b") is None
+    assert (cache.hits, cache.evictions) == (1, 1)
+
+
+def test_cached_identity_skips_users_query(statements, client):
+    tokens = login(client)
+    assert client.get("/users/me", headers=bearer(tokens)).status_code == 200
+    hits = identity_cache.hits
+
+    statements.clear()
+    response = client.get("/users/me", headers=bearer(tokens))
+
+    assert response.status_code == 200
+    assert identity_cache.hits == hits + 1
+    assert not [sql for sql in statements if "FROM users" in sql]
+
+
+def test_delete_me_invalidates_cached_identity(client):
+    tokens = login(client)
+    assert client.get("/users/me", headers=bearer(tokens)).status_code == 200
+
+    assert client.delete("/users/me", headers=bearer(tokens)).status_code == 204
+
+    assert identity_cache.get("a@example.com") is None
+    assert client.get("/users/me", headers=bearer(tokens)).status_code == 401
+
+
+def test_internal_endpoints_closed_without_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert client.get("/internal/metrics").status_code == 403
+    assert client.get("/internal/metrics", headers={"X-Metrics-Token": ""}).status_code == 403
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    assert client.get("/internal/metrics", headers={"X-Metrics-Token": "wrong"}).status_code == 403
+    response = client.get("/internal/metrics", headers={"X-Metrics-Token": "s3cret"})
+    assert response.status_code == 200
+    assert "auth_cache" in response.json()
@@ -0,0 +1,122 @@
+import random
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import models, schemas
+from app.core.ranking import InvalidRankError, is_valid_rank, rank_between
+from app.crud.kanban import create_task_card, create_task_column, rebalance_ranks, reorder_board
+from app.database import Base
+
+
+def test_rank_between_keeps_order():
+    assert rank_between(None, None) == "i"
+    assert rank_between("i", None) == "j"
+    assert rank_between(None, "i") == "h"
+    assert rank_between("a1", "a2") == "a1i"
+    with pytest.raises(InvalidRankError):
+        rank_between("b", "a")
+    # Só zeros: não há chave menor (antes, o laço não terminava)
+    with pytest.raises(InvalidRankError):
+        rank_between(None, "000000")
+    assert rank_between(None, "000001i") == "000000z"
+    assert "000001i" < rank_between("000001i", "000002i") < "000002i"
+
+    random.seed(7)
+    keys = [rank_between(None, None)]
+    for _ in range(2000):
+        index = random.randint(0, len(keys))
+        before = keys[index - 1] if index > 0 else None
+        after = keys[index] if index < len(keys) else None
+        key = rank_between(before, after)
+        assert (before is None or before < key) and (after is None or key < after)
+        assert is_valid_rank(key)
+        keys.insert(index, key)
+    assert keys == sorted(keys)
+
+
+def make_board():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[models.TaskColumn.__table__, models.TaskCard.__table__])
+    db = Session(engine, expire_on_commit=False)
+    owner_id = uuid.uuid4()
+    todo = create_task_column(db, schemas.TaskColumnCreate(title="A fazer"), owner_id)
+    done = create_task_column(db, schemas.TaskColumnCreate(title="Feito"), owner_id)
+    cards = [create_task_card(db, schemas.TaskCardCreate(title=f"Cartão {n}"), todo.id, owner_id) for n in range(3)]
+    return db, owner_id, todo, done, cards
+
+
+def titles(db, column_id):
+    return [
+        card.title
+        for card in db.query(models.TaskCard).filter_by(column_id=column_id).order_by(models.TaskCard.rank, models.TaskCard.id)
+    ]
+
+
+def test_reorder_moves_columns_and_cards_in_one_transaction():
+    db, owner_id, todo, done, cards = make_board()
+    first, second, third = cards
+
+    result = reorder_board(db, schemas.BoardReorder(
+        columns=[{"id": done.id, "next_id": todo.id}],
+        cards=[
+            {"id": third.id, "column_id": todo.id, "next_id": first.id},
+            {"id": first.id, "column_id": done.id},
+            {"id": second.id, "column_id": done.id, "previous_id": first.id},
+        ],
+    ), owner_id)
+
+    assert [card.id for card in result["cards"]] == [third.id, first.id, second.id]
+    db.expire_all()
+    assert [column.title for column in db.query(models.TaskColumn).order_by(models.TaskColumn.rank)] == ["Feito", "A fazer"]
+    assert titles(db, todo.id) == ["Cartão 2"]
+    assert titles(db, done.id) == ["Cartão 0", "Cartão 1"]
+
+    # Vizinho em outra coluna: nada é gravado
+    with pytest.raises(InvalidRankError):
+        reorder_board(db, schemas.BoardReorder(cards=[
+            {"id": third.id, "column_id": done.id, "previous_id": first.id},
+            {"id": second.id, "column_id": todo.id, "previous_id": first.id},
+        ]), owner_id)
+    db.expire_all()
+    assert titles(db, done.id) == ["Cartão 0", "Cartão 1"]
+
+    assert reorder_board(db, schemas.BoardReorder(cards=[{"id": first.id, "column_id": todo.id}]), uuid.uuid4()) is None
+
+
+def test_rebalance_rewrites_long_and_repeated_keys():
+    db, owner_id, todo, done, cards = make_board()
+    # Acrescentar no fim alonga as chaves (j, k, ..., z, z1, ..., zz1, ...)
+    for n in range(80):
+        create_task_card(db, schemas.TaskCardCreate(title=f"Extra {n:02d}"), done.id, owner_id)
+    # Criações concorrentes podem repetir uma chave
+    db.query(models.TaskCard).filter_by(id=cards[2].id).update({"rank": cards[1].rank})
+    db.commit()
+
+    assert rebalance_ranks(db, max_length=2) == {"columns": 0, "cards": 83}
+    db.expire_all()
+    assert [card.rank for card in db.query(models.TaskCard).filter_by(column_id=todo.id).order_by(models.TaskCard.rank)] == [
+        "000001i", "000002i", "000003i",
+    ]
+    assert titles(db, todo.id) == ["Cartão 0", "Cartão 1", "Cartão 2"]
+    assert titles(db, done.id) == [f"Extra {n:02d}" for n in range(80)]
+    assert rebalance_ranks(db, max_length=2) == {"columns": 0, "cards": 0}
+
+
+def test_rebalance_rewrites_keys_ending_in_zero():
+    db, owner_id, todo, done, cards = make_board()
+    # Chaves gravadas pelo rebalanceamento antigo ("000010")
+    for position, card in enumerate(cards, start=9):
+        db.query(models.TaskCard).filter_by(id=card.id).update({"rank": f"{position:06d}"})
+    db.commit()
+
+    assert rebalance_ranks(db) == {"columns": 0, "cards": 3}
+    db.expire_all()
+    ranks = [card.rank for card in db.query(models.TaskCard).filter_by(column_id=todo.id).order_by(models.TaskCard.rank)]
+    assert ranks == ["000001i", "000002i", "000003i"]
+    assert all(is_valid_rank(rank) for rank in ranks)
+    assert titles(db, todo.id) == ["Cartão 0", "Cartão 1", "Cartão 2"]
+    assert rebalance_ranks(db) == {"columns": 0, "cards": 0}
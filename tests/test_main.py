@@ -7,6 +7,7 @@ from sqlalchemy.orm import sessionmaker
 from main import app
 from app.database import Base
 from app.dependencies import get_db
+from app.core.identity_cache import identity_cache
 
 # --- Configuração do Banco de Dados de Teste ---
 # Usaremos um banco de dados SQLite em memória para os testes serem rápidos e isolados.
@@ -37,6 +38,7 @@ def setup_database():
     """Limpa e recria o banco de dados antes de cada bateria de testes."""
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    identity_cache.clear()
 
 def get_auth_token() -> str:
     """Função auxiliar para criar um usuário e obter um token."""
@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.crud.client import get_user_clients_page
+from app.models import Client
+
+
+def test_cursor_roundtrip():
+    values = [datetime(2024, 5, 1, 12, 30), uuid.uuid4()]
+    cursor = encode_cursor("-created_at", values)
+    assert decode_cursor(cursor, "-created_at", [Client.created_at, Client.id]) == values
+
+
+def test_cursor_rejects_other_sort_and_garbage():
+    cursor = encode_cursor("created_at", [datetime(2024, 5, 1), uuid.uuid4()])
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "full_name", [Client.full_name, Client.id])
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor", "created_at", [Client.created_at, Client.id])
+
+
+@pytest.mark.parametrize("sort", ["full_name", "-full_name"])
+def test_pages_through_clients_with_null_names(db_engine, sort):
+    owner_id = uuid.uuid4()
+    names = ["Bruno", None, "Ana", None, "Carla", None]
+    with Session(db_engine) as db:
+        db.add_all([Client(full_name=name, owner_id=owner_id) for name in names])
+        db.commit()
+
+        seen, cursor = [], None
+        for fields in (None, frozenset({"email"})):
+            seen, cursor = [], None
+            while True:
+                page = get_user_clients_page(db, owner_id, limit=2, cursor=cursor, sort=sort, fields=fields)
+                seen += [client.id for client in page.items]
+                if not page.has_more:
+                    break
+                cursor = page.next_cursor
+            assert len(seen) == len(set(seen)) == len(names)
+
+    with Session(db_engine) as db:
+        ordered = [db.get(Client, client_id).full_name for client_id in seen]
+    expected = [None, None, None, "Ana", "Bruno", "Carla"]
+    assert ordered == (expected if sort == "full_name" else expected[::-1])
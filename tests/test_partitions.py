@@ -0,0 +1,87 @@
+from contextlib import nullcontext
+from datetime import date, datetime
+
+from app.services.partitions import add_months, maintain_table, parse_bounds
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalar(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeConnection:
+    """Responde às consultas de catálogo e registra o DDL executado."""
+
+    def __init__(self, partitions, default_months=(), default_has_rows=False):
+        self.partitions = partitions
+        self.default_months = list(default_months)
+        self.default_has_rows = default_has_rows
+        self.statements = []
+
+    def begin(self):
+        return nullcontext()
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "pg_inherits" in sql:
+            return FakeResult(self.partitions)
+        if sql.startswith("SELECT EXISTS"):
+            return FakeResult([self.default_has_rows])
+        self.statements.append(sql)
+        return FakeResult([])
+
+    def scalars(self, statement):
+        return self.default_months
+
+
+def test_month_arithmetic_and_bounds():
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert parse_bounds("FOR VALUES FROM ('2024-01-01 00:00:00') TO ('2024-02-01 00:00:00')") == (
+        datetime(2024, 1, 1), datetime(2024, 2, 1)
+    )
+    assert parse_bounds("FOR VALUES FROM (MINVALUE) TO ('2023-01-01 00:00:00')") == (None, datetime(2023, 1, 1))
+
+
+def test_maintenance_premakes_months_and_drops_expired():
+    conn = FakeConnection([
+        ("intimations_historic", "FOR VALUES FROM (MINVALUE) TO ('2024-01-01 00:00:00')"),
+        ("intimations_p202401", "FOR VALUES FROM ('2024-01-01 00:00:00') TO ('2024-02-01 00:00:00')"),
+        ("intimations_p202410", "FOR VALUES FROM ('2024-10-01 00:00:00') TO ('2024-11-01 00:00:00')"),
+        ("intimations_default", "DEFAULT"),
+    ])
+    result = maintain_table(conn, "intimations", "publication_date", date(2024, 10, 15), premake_months=2, retention_months=9)
+
+    assert result == {
+        "created": ["intimations_p202411", "intimations_p202412"],
+        "dropped": ["intimations_historic"],
+    }
+    assert "CREATE TABLE intimations_p202411 PARTITION OF intimations FOR VALUES FROM ('2024-11-01') TO ('2024-12-01')" in conn.statements
+    assert "ALTER TABLE intimations DETACH PARTITION intimations_historic" in conn.statements
+
+
+def test_maintenance_moves_rows_out_of_default_partition():
+    conn = FakeConnection(
+        [("process_updates_p202410", "FOR VALUES FROM ('2024-10-01 00:00:00') TO ('2024-11-01 00:00:00')"),
+         ("process_updates_default", "DEFAULT")],
+        default_months=[date(2031, 5, 1)],
+        default_has_rows=True,
+    )
+    result = maintain_table(conn, "process_updates", "date", date(2024, 10, 1), premake_months=0, retention_months=0)
+
+    assert result == {"created": ["process_updates_p203105"], "dropped": []}
+    assert conn.statements[-4:] == [
+        "CREATE TEMPORARY TABLE process_updates_p203105_moved (LIKE process_updates) ON COMMIT DROP",
+        "WITH moved AS (DELETE FROM process_updates_default WHERE date >= :start AND date < :end RETURNING *) "
+        "INSERT INTO process_updates_p203105_moved SELECT * FROM moved",
+        "CREATE TABLE process_updates_p203105 PARTITION OF process_updates "
+        "FOR VALUES FROM ('2031-05-01') TO ('2031-06-01')",
+        # Volta pela tabela particionada: os triggers veem a inserção
+        "INSERT INTO process_updates SELECT * FROM process_updates_p203105_moved",
+    ]
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+import bcrypt
+import pytest
+
+from app import models
+from app.core import security
+from app.core.config import settings
+from conftest import login
+
+
+@pytest.fixture
+def cheap_rounds(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ALGORITHM", "bcrypt")
+
+
+def bcrypt_hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def stored_hash(session_factory, email="old@example.com"):
+    with session_factory() as db:
+        return db.query(models.User).filter(models.User.email == email).one().hashed_password
+
+
+def test_executor_is_recreated_after_shutdown():
+    hashed = security.get_password_hash("pw123456")
+    assert asyncio.run(security.verify_password_async("pw123456", hashed))
+
+    # Fim de um lifespan: o próximo uso (novo lifespan) cria outro executor
+    security.shutdown_password_executor()
+
+    assert asyncio.run(security.verify_password_async("pw123456", hashed))
+
+
+def test_full_password_queue_returns_503(client, monkeypatch):
+    login(client)
+    rejected = security.password_executor_stats()["rejected"]
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_QUEUE", 0)
+
+    response = client.post("/token", data={"username": "a@example.com", "password": "pw123456"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert security.password_executor_stats()["rejected"] == rejected + 1
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_job_ends():
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_hash():
+        started.set()
+        release.wait(5)
+
+    async def scenario():
+        pending = security.password_executor_stats()["pending"]
+        task = asyncio.create_task(security._run_password_task(slow_hash))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        # Cliente desconectou: o job continua no executor e na contagem
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert security.password_executor_stats()["pending"] == pending + 1
+        return pending
+
+    pending = asyncio.run(scenario())
+    release.set()
+    deadline = time.monotonic() + 5
+    while security.password_executor_stats()["pending"] != pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert security.password_executor_stats()["pending"] == pending
+
+
+def test_password_needs_rehash(cheap_rounds):
+    assert not security.password_needs_rehash(bcrypt_hash("pw", 4))
+    assert security.password_needs_rehash(bcrypt_hash("pw", 5))
+    assert security.password_needs_rehash("$argon2id$v=19$m=65536,t=3,p=2$c2FsdA$aGFzaA")
+    assert security.password_needs_rehash("plain-text")
+
+
+@pytest.mark.parametrize("rounds, rewritten", [(5, True), (4, False)])
+def test_login_rewrites_only_outdated_hashes(client, session_factory, cheap_rounds, rounds, rewritten):
+    old_hash = bcrypt_hash("pw123456", rounds)
+    with session_factory() as db:
+        db.add(models.User(email="old@example.com", name="Old", hashed_password=old_hash))
+        db.commit()
+
+    response = client.post("/token", data={"username": "old@example.com", "password": "pw123456"})
+    assert response.status_code == 200, response.text
+
+    new_hash = stored_hash(session_factory)
+    assert (new_hash != old_hash) is rewritten
+    assert new_hash.startswith("$2b$04$")
+    assert security.verify_password("pw123456", new_hash)
+    # Senha errada não regrava nada
+    assert client.post("/token", data={"username": "old@example.com", "password": "wrong"}).status_code == 401
+    assert stored_hash(session_factory) == new_hash
+
+
+def test_calibrate_bcrypt_rounds_stays_within_bounds():
+    assert security.calibrate_bcrypt_rounds(0, min_rounds=4, max_rounds=6)["rounds"] == 4
+    assert security.calibrate_bcrypt_rounds(60_000, min_rounds=4, max_rounds=6)["rounds"] == 6
+
+
+def test_calibrate_reports_the_measured_cost(monkeypatch):
+    # Máquina em que cada round a mais custa mais que o dobro: a
+    # extrapolação sugere 6 rounds, mas só 5 cabem no alvo medido
+    timings = {4: 10.0, 5: 30.0, 6: 90.0}
+    checked = []
+
+    def fake_checkpw(password, hashed):
+        checked.append(int(hashed.split(b"$")[2]))
+        clock.now += timings[checked[-1]] / 1000
+        return True
+
+    class Clock:
+        now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+    monkeypatch.setattr(security.time, "perf_counter", clock)
+    monkeypatch.setattr(security.bcrypt, "checkpw", fake_checkpw)
+
+    result = security.calibrate_bcrypt_rounds(40, min_rounds=4, max_rounds=6)
+
+    assert result == {"rounds": 5, "measured_ms": 30.0}
+    assert set(checked) == {4, 5, 6}
@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.normalization import process_update_hash
+from app.crud.process import ingest_user_process_updates
+from app.database import Base
+
+
+def test_process_update_hash_ignores_spacing_and_timezone():
+    base = process_update_hash(datetime(2024, 5, 1, 13, 0), "Juntada de petição")
+    assert process_update_hash(datetime(2024, 5, 1, 13, 0, 0, 500), "  Juntada  de\npetição ") == base
+    assert process_update_hash(datetime(2024, 5, 1, 10, 0, tzinfo=timezone(timedelta(hours=-3))), "Juntada de petição") == base
+    assert process_update_hash(datetime(2024, 5, 1, 13, 1), "Juntada de petição") != base
+
+
+def test_ingest_is_idempotent_and_checks_ownership():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[models.Process.__table__, models.ProcessUpdate.__table__])
+    owner_id = uuid.uuid4()
+    with Session(engine) as db:
+        mine = models.Process(number="1", client_name="A", type="Cível", owner_id=owner_id)
+        other = models.Process(number="2", client_name="B", type="Cível", owner_id=uuid.uuid4())
+        db.add_all([mine, other])
+        db.commit()
+        mine_id, other_id = mine.id, other.id
+
+        updates = [
+            schemas.ProcessUpdateIngest(process_id=mine_id, date=datetime(2024, 1, day), description=f"Andamento {day}")
+            for day in range(1, 6)
+        ]
+        updates.append(schemas.ProcessUpdateIngest(process_id=other_id, date=datetime(2024, 1, 1), description="x"))
+
+        first = ingest_user_process_updates(db, updates, owner_id, batch_size=2)
+        again = ingest_user_process_updates(db, updates, owner_id, batch_size=2)
+
+        assert db.query(models.ProcessUpdate).count() == 5
+
+    assert first == {"received": 6, "inserted": 5, "skipped": 0, "rejected": 1, "unknown_process_ids": [other_id]}
+    assert again["inserted"] == 0 and again["skipped"] == 5
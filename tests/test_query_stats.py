@@ -0,0 +1,80 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.query_stats import (
+    QueryBudgetExceededError,
+    QueryStatsMiddleware,
+    capture_queries,
+    fingerprint,
+    instrument_engine,
+    query_budget,
+    redact_parameters,
+)
+
+engine = create_engine("sqlite://")
+instrument_engine(engine)
+
+
+def test_fingerprint_groups_same_shape():
+    a = fingerprint("SELECT * FROM cards WHERE id = 1 AND title = 'a'")
+    b = fingerprint("SELECT *  FROM cards\nWHERE id = 42 AND title = 'b''c'")
+    assert a == b == "SELECT * FROM cards WHERE id = ? AND title = ?"
+    assert fingerprint("SELECT 1 WHERE id IN (%(p1)s, %(p2)s, %(p3)s)") == "SELECT ? WHERE id IN (?)"
+    # Casts do PostgreSQL não são parâmetros
+    assert fingerprint("SELECT x::text FROM t WHERE id = :id") == "SELECT x::text FROM t WHERE id = ?"
+
+
+def test_failed_query_does_not_leak_start_time():
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["query_started_at"] == []
+        with capture_queries() as stats:
+            conn.execute(text("SELECT 1"))
+        assert stats.count == 1
+        assert conn.info["query_started_at"] == []
+
+
+def test_redaction_hides_text_values():
+    assert redact_parameters({"cpf": "123.456.789-09", "id": 7, "ok": None}) == {
+        "cpf": "<str len=14>",
+        "id": 7,
+        "ok": None,
+    }
+
+
+def test_capture_counts_repeated_queries():
+    with engine.connect() as conn, capture_queries() as stats:
+        for value in range(6):
+            conn.execute(text("SELECT :v"), {"v": value})
+    assert stats.count == 6
+    assert stats.repeated(5) == [("SELECT ?", 6)]
+
+
+def test_budget_violation_fails_in_strict_mode(monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET_STRICT", True)
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, expose_headers=True)
+
+    @app.get("/ok", dependencies=[Depends(query_budget(2))])
+    def ok():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return {}
+
+    @app.get("/chatty", dependencies=[Depends(query_budget(2))])
+    def chatty():
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+        return {}
+
+    client = TestClient(app)
+    response = client.get("/ok")
+    assert response.headers["x-db-query-count"] == "1"
+    with pytest.raises(QueryBudgetExceededError):
+        client.get("/chatty")
@@ -0,0 +1,177 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.rate_limit import InMemoryRateLimitBackend, RateLimitMiddleware, RedisRateLimitBackend
+from app.core.security import create_access_token
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_refills_over_time():
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(clock=clock)
+
+    for _ in range(3):
+        assert backend.consume("k", 1, capacity=3, refill_per_second=1)[0]
+    allowed, _, retry_after = backend.consume("k", 1, capacity=3, refill_per_second=1)
+    assert not allowed
+    assert retry_after == 1
+
+    clock.now += 1
+    assert backend.consume("k", 1, capacity=3, refill_per_second=1)[0]
+
+
+def test_idle_buckets_are_evicted():
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(clock=clock)
+
+    backend.consume("a", 1, capacity=60, refill_per_second=1)
+    backend.consume("b", 1, capacity=60, refill_per_second=1)
+    assert len(backend) == 2
+
+    clock.now += 61
+    backend.consume("c", 1, capacity=60, refill_per_second=1)
+    assert len(backend) == 1
+
+
+def test_middleware_applies_route_costs():
+    app = FastAPI()
+
+    @app.post("/token")
+    def token():
+        return {"ok": True}
+
+    @app.get("/board/")
+    def board():
+        return []
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=InMemoryRateLimitBackend(),
+        per_minute=10,
+        ip_per_minute=10,
+    )
+    client = TestClient(app)
+
+    # /token custa 5 tokens: o terceiro login estoura o balde de 10
+    assert client.post("/token").status_code == 200
+    assert client.post("/token").status_code == 200
+    response = client.post("/token")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+    # /health e afins nunca são limitados
+    assert client.get("/health").status_code == 404
+
+
+def make_client(backend=None, **options):
+    app = FastAPI()
+
+    @app.get("/board/")
+    def board():
+        return []
+
+    @app.post("/processes/sync")
+    def sync():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, backend=backend if backend is not None else InMemoryRateLimitBackend(), **options)
+    return TestClient(app)
+
+
+def test_user_bucket_is_shared_across_ips():
+    client = make_client(per_minute=2, ip_per_minute=100, proxy_hops=1)
+    auth = {"Authorization": f"Bearer {create_access_token({'sub': 'a@example.com'})}"}
+
+    assert client.get("/board/", headers={**auth, "X-Forwarded-For": "1.1.1.1"}).status_code == 200
+    response = client.get("/board/", headers={**auth, "X-Forwarded-For": "2.2.2.2"})
+    assert response.status_code == 200
+    assert response.headers["x-ratelimit-limit"] == "2"
+    assert client.get("/board/", headers={**auth, "X-Forwarded-For": "3.3.3.3"}).status_code == 429
+    # Sem token (ou com um inválido) só vale o balde do IP
+    assert client.get("/board/", headers={"X-Forwarded-For": "3.3.3.3"}).status_code == 200
+    assert client.get("/board/", headers={"Authorization": "Bearer x", "X-Forwarded-For": "3.3.3.3"}).status_code == 200
+
+
+def test_client_ip_comes_from_the_trusted_proxy_hop():
+    client = make_client(per_minute=100, ip_per_minute=1, proxy_hops=1)
+    assert client.get("/board/", headers={"X-Forwarded-For": "6.6.6.6, 1.1.1.1"}).status_code == 200
+    # Entradas anteriores forjadas pelo cliente não criam um balde novo
+    assert client.get("/board/", headers={"X-Forwarded-For": "7.7.7.7, 1.1.1.1"}).status_code == 429
+    assert client.get("/board/", headers={"X-Forwarded-For": "2.2.2.2"}).status_code == 200
+
+    # Sem proxies confiáveis o cabeçalho é ignorado: vale o IP da conexão
+    client = make_client(per_minute=100, ip_per_minute=1, proxy_hops=0)
+    assert client.get("/board/", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 200
+    assert client.get("/board/", headers={"X-Forwarded-For": "2.2.2.2"}).status_code == 429
+
+
+def test_route_cost_is_clamped_to_capacity():
+    # /processes/sync custa 20, acima da capacidade de 10: vale o balde cheio
+    client = make_client(per_minute=10, ip_per_minute=10)
+    assert client.post("/processes/sync").status_code == 200
+    response = client.post("/processes/sync")
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["retry-after"]) <= 60
+
+
+class BrokenBackend(InMemoryRateLimitBackend):
+    def consume(self, key, cost, capacity, refill_per_second):
+        raise ConnectionError("redis fora do ar")
+
+
+def test_backend_failure_policy():
+    assert make_client(BrokenBackend(), fail_open=True).get("/board/").status_code == 200
+    assert make_client(BrokenBackend(), fail_open=False).get("/board/").status_code == 503
+
+
+class FakeRedis:
+    """Executa o token bucket do script Lua em Python, como o Redis faria."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.calls = []
+
+    def register_script(self, source):
+        assert "HMGET" in source and "PEXPIRE" in source
+
+        async def script(keys, args):
+            capacity, rate, cost, now, ttl_ms = args
+            self.calls.append((keys, ttl_ms))
+            tokens, ts = self.buckets.get(keys[0], (capacity, now))
+            tokens = min(capacity, tokens + max(0, now - ts) * rate)
+            allowed = 0
+            if tokens >= cost:
+                tokens -= cost
+                allowed = 1
+            self.buckets[keys[0]] = (tokens, now)
+            return [allowed, str(tokens).encode()]
+
+        return script
+
+
+def test_redis_backend_runs_the_lua_bucket():
+    fake = FakeRedis()
+    backend = RedisRateLimitBackend("redis://unused", client=fake)
+
+    async def scenario():
+        results = [await backend.aconsume("ip:1.1.1.1", 5, 10, 10 / 60) for _ in range(3)]
+        return results
+
+    results = asyncio.run(scenario())
+    assert [allowed for allowed, _, _ in results] == [True, True, False]
+    assert results[1][1] < 0.01 and results[2][2] > 0
+    assert fake.calls[0] == (["ritum:ratelimit:ip:1.1.1.1"], 60_000)
+
+    client = make_client(backend, per_minute=2, ip_per_minute=2)
+    assert client.get("/board/").status_code == 200
+    assert client.get("/board/").status_code == 200
+    assert client.get("/board/").status_code == 429
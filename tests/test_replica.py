@@ -0,0 +1,46 @@
+from sqlalchemy import create_engine
+
+from app.core import replica
+from app.core.replica import ReplicaRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lag_above_threshold_falls_back_to_primary(monkeypatch):
+    clock = FakeClock()
+    router = ReplicaRouter(max_lag_seconds=5, check_interval=2, clock=clock)
+    engine = create_engine("sqlite://")
+
+    monkeypatch.setattr(replica, "REPLICA_LAG_QUERY", replica.text("SELECT 1.5"))
+    assert router.replica_is_fresh(engine)
+
+    # Medição cacheada até expirar o intervalo
+    monkeypatch.setattr(replica, "REPLICA_LAG_QUERY", replica.text("SELECT 30"))
+    assert router.replica_is_fresh(engine)
+    clock.now += 2
+    assert not router.replica_is_fresh(engine)
+
+
+def test_failed_lag_check_uses_primary():
+    router = ReplicaRouter(max_lag_seconds=5, check_interval=2, clock=FakeClock())
+    # SQLite não tem pg_is_in_recovery(): a medição falha
+    assert not router.replica_is_fresh(create_engine("sqlite://"))
+    assert router.stats()["lag_check_errors"] == 1
+
+
+def test_recent_writer_reads_from_primary():
+    clock = FakeClock()
+    router = ReplicaRouter(max_lag_seconds=5, check_interval=2, clock=clock)
+
+    router.note_write("user-1")
+    assert router.recently_wrote("user-1")
+    assert not router.recently_wrote("user-2")
+
+    clock.now += 5
+    assert not router.recently_wrote("user-1")
@@ -0,0 +1,21 @@
+import pytest
+
+from app import schemas
+from app.core.sparse_fields import InvalidFieldsError, parse_fields, partial_schema
+
+
+def test_parse_fields_accepts_aliases_and_always_includes_id():
+    assert parse_fields(None, schemas.Client) is None
+    assert parse_fields("fullName, cpf,", schemas.Client) == {"id", "full_name", "cpf"}
+    assert parse_fields("full_name", schemas.Client) == {"id", "full_name"}
+    with pytest.raises(InvalidFieldsError):
+        parse_fields("fullName,password", schemas.Client)
+
+
+def test_partial_schema_serializes_only_selected_fields():
+    model = partial_schema(schemas.CaseResponse, frozenset({"id", "case_name"}))
+    item = model.model_validate({"id": "6f1b2c1e-8e43-4a36-9a4f-0d5f1b8c2a11", "caseName": "Inventário"})
+    assert item.model_dump(mode="json", by_alias=True) == {
+        "id": "6f1b2c1e-8e43-4a36-9a4f-0d5f1b8c2a11",
+        "caseName": "Inventário",
+    }
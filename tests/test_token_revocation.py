@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import jwt
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models import RevokedTokenFamily
+from app.services.token_revocation import TokenRevocationStore, token_revocation_store
+from conftest import login
+
+
+@pytest.fixture(autouse=True)
+def revocation_store():
+    # Sincroniza o filtro a cada verificação: revogações aparecem na hora
+    token_revocation_store.__init__(sync_interval=0)
+    yield token_revocation_store
+    token_revocation_store.__init__()
+
+
+def refresh(client, refresh_token):
+    return client.post("/token/refresh", params={"refresh_token": refresh_token})
+
+
+def test_refresh_token_rotates_once(client):
+    tokens = login(client)
+
+    first = refresh(client, tokens["refresh_token"])
+    assert first.status_code == 200, first.text
+    second = refresh(client, first.json()["refresh_token"])
+    assert second.status_code == 200, second.text
+
+
+def test_reuse_revokes_family(client, session_factory):
+    tokens = login(client)
+    rotated = refresh(client, tokens["refresh_token"]).json()
+
+    reused = refresh(client, tokens["refresh_token"])
+    assert reused.status_code == 401
+
+    # O token legítimo mais novo também deixa de valer
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+    # ...assim como o access token da família
+    response = client.get("/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert response.status_code == 401
+
+    with session_factory() as db:
+        family = db.query(RevokedTokenFamily).one()
+    assert family.reason == "refresh_token_reuse"
+    # A família vale pelo prazo inteiro de um refresh token emitido agora
+    assert family.expires_at > datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS - 1)
+
+
+def test_legacy_refresh_token_rotates_once(client):
+    login(client)
+    legacy = jwt.encode(
+        {
+            "sub": "a@example.com",
+            "type": "refresh",
+            "exp": datetime.now(timezone.utc) + timedelta(days=1),
+        },
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+
+    first = refresh(client, legacy)
+    assert first.status_code == 200, first.text
+    assert refresh(client, legacy).status_code == 401
+    # A família derivada do token antigo foi revogada
+    assert refresh(client, first.json()["refresh_token"]).status_code == 401
+
+
+def test_bloom_false_positive_is_confirmed_in_db(session_factory):
+    store = TokenRevocationStore(sync_interval=3600, bloom_capacity=10)
+    with session_factory() as db:
+        store.confirm_family_revoked(db, "sync")  # primeira sincronização
+        # Simula um falso positivo: a família está no filtro, não no banco
+        store._bloom.add("not-revoked")
+
+        assert store.needs_db_check("not-revoked")
+        assert store.confirm_family_revoked(db, "not-revoked") is False
+        assert store.db_confirmations == 1
+
+
+def test_sync_is_incremental_after_a_rebuild(session_factory):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with session_factory() as db:
+        db.add_all([
+            RevokedTokenFamily(family_id=f"fam-{n}", revoked_at=now - timedelta(minutes=n), expires_at=now + timedelta(days=1))
+            for n in range(30)
+        ])
+        db.commit()
+
+        # Mais famílias que a capacidade configurada: o filtro novo cresce
+        store = TokenRevocationStore(sync_interval=0, bloom_capacity=10)
+        assert store.confirm_family_revoked(db, "fam-29")
+        rebuilt = store._bloom
+        assert rebuilt.count == 30 and rebuilt.capacity == 60
+
+        statements = []
+        listen = lambda *args: statements.append(args[2])
+        event.listen(db.get_bind(), "before_cursor_execute", listen)
+        try:
+            # A sobreposição relê as revogações recentes sem contá-las de novo
+            for _ in range(3):
+                store.confirm_family_revoked(db, "other")
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listen)
+
+        assert store._bloom is rebuilt and rebuilt.count == 30
+        assert all("revoked_token_families.revoked_at >=" in statement for statement in statements)